@@ -1,13 +1,18 @@
+import asyncio
 import io
+import json
 import os
 import logging
 import traceback
+from typing import List
 import azure.functions as func
 import requests
 from bs4 import BeautifulSoup
 from utilities.helpers.env_helper import EnvHelper
 from utilities.helpers.azure_blob_storage_client import AzureBlobStorageClient
 from utilities.helpers.embedders.embedder_factory import EmbedderFactory
+from utilities.helpers.url_fetcher import UrlFetcher, canonicalize_url
+from utilities.document_loading.web import WebDocumentLoading
 
 bp_add_url_embeddings = func.Blueprint()
 logger = logging.getLogger(__name__)
@@ -19,13 +24,28 @@ def add_url_embeddings(req: func.HttpRequest) -> func.HttpResponse:
     env_helper: EnvHelper = EnvHelper()
     logger.info("Python HTTP trigger function processed a request.")
 
-    # Get Url from request
+    # Get Url, or the list of URLs in bulk mode, from request
     url = None
+    urls = None
     try:
-        url = req.get_json().get("url")
+        body = req.get_json()
+        url = body.get("url")
+        urls = body.get("urls")
     except Exception:
         url = None
 
+    if urls is not None:
+        if (
+            not urls
+            or not isinstance(urls, list)
+            or not all(isinstance(u, str) for u in urls)
+        ):
+            return func.HttpResponse(
+                "Please pass a list of URLs in the urls field of the request body",
+                status_code=400,
+            )
+        return process_urls(urls, env_helper)
+
     if not url:
         return func.HttpResponse(
             "Please pass a URL on the query string or in the request body",
@@ -57,13 +77,17 @@ def process_url_contents_directly(url: str, env_helper: EnvHelper):
     )
 
 
+def upload_url_content_to_blob(url: str, content: bytes):
+    parsed_data = BeautifulSoup(content, "html.parser")
+    with io.BytesIO(parsed_data.get_text().encode("utf-8")) as stream:
+        blob_client = AzureBlobStorageClient()
+        blob_client.upload_file(stream, url, metadata={"title": url})
+
+
 def download_url_and_upload_to_blob(url: str):
     try:
         response = requests.get(url)
-        parsed_data = BeautifulSoup(response.content, "html.parser")
-        with io.BytesIO(parsed_data.get_text().encode("utf-8")) as stream:
-            blob_client = AzureBlobStorageClient()
-            blob_client.upload_file(stream, url, metadata={"title": url})
+        upload_url_content_to_blob(url, response.content)
         return func.HttpResponse(f"URL {url} added to knowledge base", status_code=200)
 
     except Exception:
@@ -74,3 +98,90 @@ def download_url_and_upload_to_blob(url: str):
             f"Error occurred while adding {url} to the knowledge base.",
             status_code=500,
         )
+
+
+def process_urls(urls: List[str], env_helper: EnvHelper):
+    """
+    Adds a batch of URLs to the knowledge base, deduped by canonical URL, and returns
+    the status of each URL. A URL that fails does not stop the rest of the batch.
+    """
+    results = []
+    results_by_url = {}
+    for url in urls:
+        result = {"url": url}
+        results.append(result)
+        try:
+            canonical_url = canonicalize_url(url)
+        except ValueError:
+            result.update(status="failed", message="Invalid URL")
+            continue
+        result["canonical_url"] = canonical_url
+        if canonical_url in results_by_url:
+            result.update(
+                status="duplicate",
+                message=f"Duplicate of {results_by_url[canonical_url]['url']}",
+            )
+        else:
+            results_by_url[canonical_url] = result
+
+    try:
+        if env_helper.AZURE_SEARCH_USE_INTEGRATED_VECTORIZATION:
+            process_content = upload_url_content_to_blob
+        else:
+            embedder = EmbedderFactory.create(env_helper)
+            web_document_loading = WebDocumentLoading()
+
+            def process_content(url: str, content: bytes):
+                embedder.embed_documents(
+                    url, ".url", web_document_loading.load_content(url, content)
+                )
+
+        asyncio.run(
+            fetch_and_process_urls(
+                UrlFetcher.create(env_helper), results_by_url, process_content
+            )
+        )
+    except Exception:
+        logger.error(f"Error while processing URLs: {traceback.format_exc()}")
+        return func.HttpResponse(
+            "Unexpected error occurred while processing the URLs", status_code=500
+        )
+
+    failed = sum(1 for result in results if result["status"] == "failed")
+    logger.info(f"Processed {len(results)} URLs, {failed} failed")
+    return func.HttpResponse(
+        json.dumps(
+            {
+                "results": results,
+                "succeeded": sum(
+                    1 for result in results if result["status"] == "succeeded"
+                ),
+                "failed": failed,
+            }
+        ),
+        mimetype="application/json",
+        status_code=200,
+    )
+
+
+async def fetch_and_process_urls(
+    url_fetcher: UrlFetcher, results_by_url: dict, process_content
+):
+    """
+    Fetches the URLs concurrently and processes each one as soon as it is fetched,
+    one at a time, while the other URLs are still being fetched.
+    """
+    async for url, content, error in url_fetcher.fetch_all(list(results_by_url)):
+        result = results_by_url[url]
+        if error is not None:
+            logger.warning(f"Could not fetch URL {url}: {error}")
+            result.update(status="failed", message=error)
+            continue
+        try:
+            await asyncio.to_thread(process_content, url, content)
+            result["status"] = "succeeded"
+        except Exception as e:
+            logger.error(
+                f"Error while processing contents of URL {url}: {traceback.format_exc()}"
+            )
+            result.update(status="failed", message=str(e))
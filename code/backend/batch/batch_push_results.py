@@ -4,10 +4,7 @@ import json
 from urllib.parse import urlparse
 import azure.functions as func
 
-from utilities.helpers.azure_blob_storage_client import AzureBlobStorageClient
-from utilities.helpers.env_helper import EnvHelper
-from utilities.helpers.embedders.embedder_factory import EmbedderFactory
-from utilities.search.search import Search
+from utilities.helpers.worker_cache import WorkerCache
 
 bp_batch_push_results = func.Blueprint()
 logger = logging.getLogger(__name__)
@@ -49,19 +46,30 @@ def batch_push_results(msg: func.QueueMessage) -> None:
 
 
 def _process_document_created_event(message_body) -> None:
-    env_helper: EnvHelper = EnvHelper()
+    # The clients and the embedder are reused across the messages this worker handles
+    worker_cache = WorkerCache()
 
-    blob_client = AzureBlobStorageClient()
+    blob_client = worker_cache.get_blob_client()
     file_name = _get_file_name_from_message(message_body)
     file_sas = blob_client.get_blob_sas(file_name)
 
-    embedder = EmbedderFactory.create(env_helper)
+    embedder = worker_cache.get_embedder()
+    logger.info(
+        "Reused cached clients, saving %.2fs of setup: %s",
+        worker_cache.take_setup_seconds_saved(),
+        worker_cache.get_stats(),
+    )
     embedder.embed_file(file_sas, file_name)
 
 
 def _process_document_deleted_event(message_body) -> None:
-    env_helper: EnvHelper = EnvHelper()
-    search_handler = Search.get_search_handler(env_helper)
+    worker_cache = WorkerCache()
+    search_handler = worker_cache.get_search_handler()
+    logger.info(
+        "Reused cached clients, saving %.2fs of setup: %s",
+        worker_cache.take_setup_seconds_saved(),
+        worker_cache.get_stats(),
+    )
 
     blob_url = message_body.get("data", {}).get("url", "")
     search_handler.delete_from_index(blob_url)
@@ -1,6 +1,7 @@
 import os
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 import azure.functions as func
 from utilities.helpers.embedders.integrated_vectorization_embedder import (
     IntegratedVectorizationEmbedder,
@@ -20,27 +21,66 @@ logger.setLevel(level=os.environ.get("LOGLEVEL", "INFO").upper())
 def batch_start_processing(req: func.HttpRequest) -> func.HttpResponse:
     logger.info("Requested to start processing all documents received")
     env_helper: EnvHelper = EnvHelper()
-    # Set up Blob Storage Client
-    azure_blob_storage_client = AzureBlobStorageClient()
-    # Get all files from Blob Storage
-    files_data = azure_blob_storage_client.get_all_files()
-
-    files_data = list(map(lambda x: {"filename": x["filename"]}, files_data))
+    # In delta mode, only files that are new or changed since they were indexed
+    # are processed
+    delta = req.params.get("delta", "false").lower() == "true"
 
     if env_helper.AZURE_SEARCH_USE_INTEGRATED_VECTORIZATION:
-        reprocess_integrated_vectorization(env_helper)
-    else:
-        # Send a message to the queue for each file
-        queue_client = create_queue_client()
-        for fd in files_data:
-            queue_client.send_message(json.dumps(fd).encode("utf-8"))
-
-    return func.HttpResponse(
-        f"Conversion started successfully for {len(files_data)} documents.",
-        status_code=200,
+        # Set up Blob Storage Client
+        azure_blob_storage_client = AzureBlobStorageClient()
+        # Get all files from Blob Storage
+        files_data = azure_blob_storage_client.get_all_files()
+        reprocess_integrated_vectorization(env_helper, reset=not delta)
+        return func.HttpResponse(
+            f"Conversion started successfully for {len(files_data)} documents.",
+            status_code=200,
+        )
+
+    azure_blob_storage_client = AzureBlobStorageClient()
+    file_names, skipped = azure_blob_storage_client.get_files_to_process(
+        only_changed=delta
+    )
+    enqueued, failed = enqueue_files(file_names, env_helper)
+    logger.info(
+        f"Enqueued {enqueued} documents, skipped {skipped} unchanged documents, "
+        f"failed to enqueue {failed} documents"
     )
 
+    message = f"Conversion started successfully for {enqueued} documents."
+    if delta:
+        message += f" Skipped {skipped} unchanged documents."
+    if failed:
+        return func.HttpResponse(
+            f"{message} Failed to start conversion for {failed} documents.",
+            status_code=500,
+        )
+    return func.HttpResponse(message, status_code=200)
+
+
+def enqueue_files(file_names, env_helper: EnvHelper):
+    """
+    Sends a message to the queue for each file, sending up to
+    BATCH_START_PROCESSING_CONCURRENCY messages at once. Returns the number of
+    messages sent, and the number that failed.
+    """
+    queue_client = create_queue_client()
+
+    def send(file_name: str) -> bool:
+        try:
+            queue_client.send_message(
+                json.dumps({"filename": file_name}).encode("utf-8")
+            )
+            return True
+        except Exception:
+            logger.exception(f"Failed to enqueue {file_name}")
+            return False
+
+    max_workers = max(env_helper.BATCH_START_PROCESSING_CONCURRENCY, 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        sent = sum(executor.map(send, file_names))
+    return sent, len(file_names) - sent
+
 
-def reprocess_integrated_vectorization(env_helper: EnvHelper):
+def reprocess_integrated_vectorization(env_helper: EnvHelper, reset: bool = True):
     indexer_embedder = IntegratedVectorizationEmbedder(env_helper)
-    indexer_embedder.reprocess_all()
+    indexer_embedder.reprocess_all(reset=reset)
@@ -1,13 +1,211 @@
+import asyncio
+import atexit
+import concurrent.futures
 import logging
+import threading
+import time
 import asyncpg
 from datetime import datetime, timezone
-from ..helpers.azure_credential_utils import get_azure_credential
+from typing import Dict, Optional, Tuple
+from ..helpers.azure_credential_utils import get_azure_credential_async
 from ..helpers.env_helper import EnvHelper
+from ..helpers.postgres_connection_pool import (
+    POSTGRES_TOKEN_SCOPE,
+    TOKEN_REFRESH_MARGIN_SECONDS,
+)
 
 from .database_client_base import DatabaseClientBase
 
 logger = logging.getLogger(__name__)
 
+POSTGRES_PORT = 5432
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 10
+ACQUIRE_TIMEOUT_SECONDS = 30
+# Prepared statements are cached per connection, so they are reused by every request
+# that borrows the connection after the first one
+STATEMENT_CACHE_SIZE = 100
+# How long closing a pool at shutdown waits for connections still in use
+CLOSE_TIMEOUT_SECONDS = 10
+
+
+class PostgresPool:
+    """
+    Application-lifetime asyncpg pool for the chat history database.
+
+    Flask runs every async view in an event loop of its own, and asyncpg connections
+    can only be used from the loop that opened them, so the pool lives on a background
+    event loop owned by this class. Requests borrow connections from it and their
+    queries are run on that loop, whichever loop the request runs in.
+
+    Connections authenticate with an AAD access token fetched asynchronously through
+    asyncpg's `password` callable, cached until shortly before it expires.
+    """
+
+    _pools: Dict[Tuple[str, str, str], "PostgresPool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(
+        self,
+        user: str,
+        host: str,
+        database: str,
+        managed_identity_client_id: Optional[str] = None,
+    ):
+        self.user = user
+        self.host = host
+        self.database = database
+        self.managed_identity_client_id = managed_identity_client_id
+        self._pool_task = None
+        self._credential = None
+        self._token = None
+        self._token_lock = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="postgres-pool", daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def get(
+        user: str,
+        host: str,
+        database: str,
+        managed_identity_client_id: Optional[str] = None,
+    ) -> "PostgresPool":
+        """Returns the pool of the given database, creating it on first use."""
+        key = (user, host, database)
+        with PostgresPool._pools_lock:
+            pool = PostgresPool._pools.get(key)
+            if pool is None:
+                pool = PostgresPool(user, host, database, managed_identity_client_id)
+                PostgresPool._pools[key] = pool
+            return pool
+
+    @staticmethod
+    def close_pools():
+        """Closes every pool, for application shutdown."""
+        with PostgresPool._pools_lock:
+            pools = list(PostgresPool._pools.values())
+            PostgresPool._pools.clear()
+        for pool in pools:
+            pool.close()
+
+    async def run(self, coroutine):
+        """Runs a coroutine on the pool's event loop and waits for its result."""
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        )
+
+    async def acquire(self) -> "PooledConnection":
+        start_time = time.perf_counter()
+        connection = await self.run(self._acquire())
+        logger.debug(
+            f"Acquired PostgreSQL connection in {time.perf_counter() - start_time:.3f}s"
+        )
+        return PooledConnection(self, connection)
+
+    async def release(self, connection: asyncpg.Connection) -> None:
+        await self.run(self._release(connection))
+
+    def close(self) -> None:
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(
+                CLOSE_TIMEOUT_SECONDS
+            )
+        except concurrent.futures.TimeoutError:
+            logger.warning("Timed out closing the PostgreSQL connection pool")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _get_password(self) -> str:
+        # Called by asyncpg, on the pool's loop, for every new connection
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            if (
+                self._token is None
+                or self._token.expires_on - TOKEN_REFRESH_MARGIN_SECONDS <= time.time()
+            ):
+                if self._credential is None:
+                    self._credential = await get_azure_credential_async(
+                        self.managed_identity_client_id
+                    )
+                self._token = await self._credential.get_token(POSTGRES_TOKEN_SCOPE)
+            return self._token.token
+
+    async def _create_pool(self) -> asyncpg.Pool:
+        start_time = time.perf_counter()
+        pool = await asyncpg.create_pool(
+            user=self.user,
+            host=self.host,
+            database=self.database,
+            password=self._get_password,
+            port=POSTGRES_PORT,
+            ssl=True,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            statement_cache_size=STATEMENT_CACHE_SIZE,
+        )
+        logger.info(
+            f"Created PostgreSQL connection pool in {time.perf_counter() - start_time:.3f}s"
+        )
+        return pool
+
+    async def _acquire(self) -> asyncpg.Connection:
+        if self._pool_task is None:
+            self._pool_task = asyncio.ensure_future(self._create_pool())
+        task = self._pool_task
+        try:
+            pool = await asyncio.shield(task)
+        except Exception:
+            # Let the next request retry creating the pool
+            if self._pool_task is task:
+                self._pool_task = None
+            raise
+        return await pool.acquire(timeout=ACQUIRE_TIMEOUT_SECONDS)
+
+    async def _release(self, connection: asyncpg.Connection) -> None:
+        pool = await self._pool_task
+        await pool.release(connection)
+
+    async def _close(self) -> None:
+        if self._pool_task is not None:
+            try:
+                pool = await self._pool_task
+                await pool.close()
+            except Exception:
+                logger.exception("Failed to close the PostgreSQL connection pool")
+        if self._credential is not None:
+            await self._credential.close()
+
+
+# The pools live as long as the application, so they are closed when it exits
+atexit.register(PostgresPool.close_pools)
+
+
+class PooledConnection:
+    """
+    Connection borrowed from a PostgresPool, running the queries of the conversation
+    client on the pool's event loop.
+    """
+
+    def __init__(self, pool: PostgresPool, connection: asyncpg.Connection):
+        self.pool = pool
+        self.connection = connection
+
+    async def execute(self, query: str, *args):
+        return await self.pool.run(self.connection.execute(query, *args))
+
+    async def fetch(self, query: str, *args):
+        return await self.pool.run(self.connection.fetch(query, *args))
+
+    async def fetchrow(self, query: str, *args):
+        return await self.pool.run(self.connection.fetchrow(query, *args))
+
+    async def release(self) -> None:
+        await self.pool.release(self.connection)
+
 
 class PostgresConversationClient(DatabaseClientBase):
 
@@ -22,26 +220,24 @@ class PostgresConversationClient(DatabaseClientBase):
         self.conn = None
 
     async def connect(self):
+        """Borrows a connection from the application's connection pool."""
         try:
-            credential = get_azure_credential(self.env_helper.MANAGED_IDENTITY_CLIENT_ID)
-            token = credential.get_token(
-                "https://ossrdbms-aad.database.windows.net/.default"
-            ).token
-            self.conn = await asyncpg.connect(
-                user=self.user,
-                host=self.host,
-                database=self.database,
-                password=token,
-                port=5432,
-                ssl=True,
+            pool = PostgresPool.get(
+                self.user,
+                self.host,
+                self.database,
+                self.env_helper.MANAGED_IDENTITY_CLIENT_ID,
             )
+            self.conn = await pool.acquire()
         except Exception as e:
             logger.error("Failed to connect to PostgreSQL: %s", e)
             raise
 
     async def close(self):
+        """Returns the connection to the pool."""
         if self.conn:
-            await self.conn.close()
+            await self.conn.release()
+            self.conn = None
 
     async def ensure(self):
         if not self.conn:
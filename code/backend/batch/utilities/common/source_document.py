@@ -76,16 +76,10 @@ class SourceDocument:
         filename = parsed_url.path
         hash_key = hashlib.sha1(f"{file_url}_{idx}".encode("utf-8")).hexdigest()
         hash_key = f"doc_{hash_key}"
-        sas_placeholder = (
-            "_SAS_TOKEN_PLACEHOLDER_"
-            if parsed_url.netloc
-            and parsed_url.netloc.endswith(".blob.core.windows.net")
-            else ""
-        )
         return cls(
             id=metadata.get("id", hash_key),
             content=content,
-            source=metadata.get("source", f"{file_url}{sas_placeholder}"),
+            source=metadata.get("source", cls.source_from_url(document_url)),
             title=metadata.get("title", filename),
             chunk=metadata.get("chunk", idx),
             offset=metadata.get("offset"),
@@ -93,6 +87,19 @@ class SourceDocument:
             chunk_id=metadata.get("chunk_id"),
         )
 
+    @staticmethod
+    def source_from_url(document_url: Optional[str]) -> str:
+        """Returns the source that chunks of the document at `document_url` are stored with."""
+        parsed_url = urlparse(document_url)
+        file_url = parsed_url.scheme + "://" + parsed_url.netloc + parsed_url.path
+        sas_placeholder = (
+            "_SAS_TOKEN_PLACEHOLDER_"
+            if parsed_url.netloc
+            and parsed_url.netloc.endswith(".blob.core.windows.net")
+            else ""
+        )
+        return f"{file_url}{sas_placeholder}"
+
     def get_filename(self, include_path=False):
         filename = self.source.replace("_SAS_TOKEN_PLACEHOLDER_", "").replace(
             "http://", ""
@@ -14,6 +14,8 @@ class ChunkingSettings:
         self.chunking_strategy = ChunkingStrategy(chunking["strategy"])
         self.chunk_size = chunking["size"]
         self.chunk_overlap = chunking["overlap"]
+        # Dot-separated keys of the value the json strategy chunks, the root if unset
+        self.json_path = chunking.get("json_path")
 
     def __eq__(self, other: object) -> bool:
         if isinstance(self, other.__class__):
@@ -21,6 +23,7 @@ class ChunkingSettings:
                 self.chunking_strategy == other.chunking_strategy
                 and self.chunk_size == other.chunk_size
                 and self.chunk_overlap == other.chunk_overlap
+                and self.json_path == other.json_path
             )
         else:
             return False
@@ -1,5 +1,5 @@
 # Create an abstract class for document loading
-from typing import List
+from typing import Iterable, List
 from abc import ABC, abstractmethod
 from ..common.source_document import SourceDocument
 from .chunking_strategy import ChunkingSettings
@@ -12,5 +12,5 @@ class DocumentChunkingBase(ABC):
     @abstractmethod
     def chunk(
         self, documents: List[SourceDocument], chunking: ChunkingSettings
-    ) -> List[SourceDocument]:
+    ) -> Iterable[SourceDocument]:
         pass
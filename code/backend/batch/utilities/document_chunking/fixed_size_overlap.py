@@ -1,7 +1,7 @@
 from typing import List
 from .document_chunking_base import DocumentChunkingBase
-from langchain.text_splitter import TokenTextSplitter
 from .chunking_strategy import ChunkingSettings
+from .token_chunker import TokenChunker
 from ..common.source_document import SourceDocument
 
 
@@ -12,25 +12,23 @@ class FixedSizeOverlapDocumentChunking(DocumentChunkingBase):
     def chunk(
         self, documents: List[SourceDocument], chunking: ChunkingSettings
     ) -> List[SourceDocument]:
-        full_document_content = "".join(
-            list(map(lambda document: document.content, documents))
-        )
+        token_chunker = TokenChunker(documents)
         document_url = documents[0].source
-        splitter = TokenTextSplitter.from_tiktoken_encoder(
-            chunk_size=chunking.chunk_size, chunk_overlap=chunking.chunk_overlap
+        token_windows = token_chunker.token_windows(
+            chunking.chunk_size, chunking.chunk_overlap
         )
-        chunked_content_list = splitter.split_text(full_document_content)
         # Create document for each chunk
         documents = []
-        chunk_offset = 0
-        for idx, chunked_content in enumerate(chunked_content_list):
+        for idx, (start, end) in enumerate(token_windows):
             documents.append(
                 SourceDocument.from_metadata(
-                    content=chunked_content,
+                    content=token_chunker.content[start:end],
                     document_url=document_url,
-                    metadata={"offset": chunk_offset},
+                    metadata={
+                        "offset": start,
+                        "page_number": token_chunker.page_number(start),
+                    },
                     idx=idx,
                 )
             )
-            chunk_offset += len(chunked_content)
         return documents
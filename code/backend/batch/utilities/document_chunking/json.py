@@ -1,37 +1,190 @@
 import json
-from typing import List
+import re
+from typing import Any, Iterator, List, Tuple
 from .document_chunking_base import DocumentChunkingBase
-from langchain.text_splitter import RecursiveJsonSplitter
 from .chunking_strategy import ChunkingSettings
 from ..common.source_document import SourceDocument
 
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
 
 class JSONDocumentChunking(DocumentChunkingBase):
+    """
+    Splits a JSON document into chunks of at most chunk_size characters of JSON.
+
+    The document is decoded one member at a time, either the members of the top-level
+    object or array, or of the value at the chunking json_path (dot-separated keys),
+    and chunks are yielded as they fill up, so the document is never decoded into one
+    object. The document text itself is still held in memory as a whole. Each chunk
+    keeps the path of its values, and the offset of the member it starts at.
+    """
+
     def __init__(self) -> None:
-        pass
+        self.decoder = json.JSONDecoder()
+        self._last_decoded = None
 
     def chunk(
         self, documents: List[SourceDocument], chunking: ChunkingSettings
-    ) -> List[SourceDocument]:
-        full_document_content = "".join(
-            list(map(lambda document: str(document.content), documents))
-        )
+    ) -> Iterator[SourceDocument]:
+        if len(documents) == 1:
+            full_document_content = str(documents[0].content)
+        else:
+            full_document_content = "".join(
+                list(map(lambda document: str(document.content), documents))
+            )
         document_url = documents[0].source
-        json_data = json.loads(full_document_content)
-        splitter = RecursiveJsonSplitter(max_chunk_size=chunking.chunk_size)
-        chunked_content_list = splitter.split_json(json_data)
-        # Create document for each chunk
-        documents = []
-        chunk_offset = 0
-        for idx, chunked_content in enumerate(chunked_content_list):
-            documents.append(
-                SourceDocument.from_metadata(
-                    content=str(chunked_content),
-                    document_url=document_url,
-                    metadata={"offset": chunk_offset},
-                    idx=idx,
-                )
+        path = chunking.json_path.split(".") if chunking.json_path else []
+        chunks = self._chunk_json(full_document_content, path, chunking.chunk_size)
+        for idx, (chunked_content, chunk_offset) in enumerate(chunks):
+            yield SourceDocument.from_metadata(
+                content=str(chunked_content),
+                document_url=document_url,
+                metadata={"offset": chunk_offset},
+                idx=idx,
             )
 
-            chunk_offset += len(chunked_content)
-        return documents
+    def _skip_whitespace(self, content: str, idx: int) -> int:
+        return WHITESPACE.match(content, idx).end()
+
+    def _expect(self, content: str, idx: int, character: str) -> int:
+        if content[idx : idx + 1] != character:
+            raise ValueError(f"Expected '{character}' at offset {idx} of JSON document")
+        return self._skip_whitespace(content, idx + 1)
+
+    def _iter_members(self, content: str, idx: int) -> Iterator[Tuple[Any, int, int]]:
+        """
+        Yields the (key or index, member start, value start) of each member of the
+        object or array starting at idx. The value is only decoded once the member has
+        been consumed, so a matching member can be entered without decoding it.
+        """
+        is_object = content[idx : idx + 1] == "{"
+        idx = self._expect(content, idx, "{" if is_object else "[")
+        closing = "}" if is_object else "]"
+        index = 0
+        while content[idx : idx + 1] != closing:
+            if index > 0:
+                idx = self._expect(content, idx, ",")
+            key = index
+            member_start = idx
+            if is_object:
+                key, idx = self.decoder.raw_decode(content, idx)
+                idx = self._expect(content, self._skip_whitespace(content, idx), ":")
+            yield key, member_start, idx
+            _, value_end = self._decode_value(content, idx)
+            idx = self._skip_whitespace(content, value_end)
+            index += 1
+
+    def _decode_value(self, content: str, idx: int) -> Tuple[Any, int]:
+        # Remember the last value, which is decoded by both a member's consumer and
+        # _iter_members to find the next member
+        if self._last_decoded is None or self._last_decoded[0] != idx:
+            value, end = self.decoder.raw_decode(content, idx)
+            self._last_decoded = (idx, value, end)
+        return self._last_decoded[1], self._last_decoded[2]
+
+    def _find_path(self, content: str, path: List[str]) -> int:
+        idx = self._skip_whitespace(content, 0)
+        for key in path:
+            if content[idx : idx + 1] != "{":
+                raise ValueError(f"JSON path segment '{key}' is not in an object")
+            for member_key, _, value_start in self._iter_members(content, idx):
+                if member_key == key:
+                    idx = value_start
+                    break
+            else:
+                raise ValueError(f"JSON path segment '{key}' not found")
+        return idx
+
+    def _json_size(self, data) -> int:
+        return len(json.dumps(data))
+
+    def _set_nested(self, data, path: List[Any], value) -> None:
+        for key in path[:-1]:
+            data = data.setdefault(key, {})
+        data[path[-1]] = value
+
+    def _split_member(
+        self, data, current_path: List[Any], chunks: List[dict], max_chunk_size: int
+    ) -> None:
+        # Splits a member the way LangChain's RecursiveJsonSplitter splits a document
+        min_chunk_size = max(max_chunk_size - 200, 50)
+        if isinstance(data, dict):
+            for key, value in data.items():
+                new_path = current_path + [key]
+                chunk_size = self._json_size(chunks[-1])
+                size = self._json_size({key: value})
+                if size < max_chunk_size - chunk_size:
+                    self._set_nested(chunks[-1], new_path, value)
+                else:
+                    if chunk_size >= min_chunk_size:
+                        chunks.append({})
+                    self._split_member(value, new_path, chunks, max_chunk_size)
+        else:
+            self._set_nested(chunks[-1], current_path, data)
+
+    def _chunk_json(
+        self, content: str, path: List[str], max_chunk_size: int
+    ) -> Iterator[Tuple[Any, int]]:
+        self._last_decoded = None
+        idx = self._find_path(content, path)
+        if content[idx : idx + 1] not in ("{", "["):
+            value, _ = self._decode_value(content, idx)
+            if path:
+                chunk = {}
+                self._set_nested(chunk, path, value)
+                value = chunk
+            yield value, idx
+            return
+
+        if content[idx : idx + 1] == "{":
+            chunks = [{}]
+            chunk_offsets = [idx]
+            for key, member_start, value_start in self._iter_members(content, idx):
+                if not chunks[-1]:
+                    chunk_offsets[-1] = member_start
+                value, _ = self._decode_value(content, value_start)
+                chunk_count = len(chunks)
+                self._split_member({key: value}, path, chunks, max_chunk_size)
+                chunk_offsets += [member_start] * (len(chunks) - chunk_count)
+                # Every chunk but the last is complete
+                for chunk, chunk_offset in zip(chunks[:-1], chunk_offsets[:-1]):
+                    if chunk:
+                        yield chunk, chunk_offset
+                chunks = chunks[-1:]
+                chunk_offsets = chunk_offsets[-1:]
+            if chunks[-1]:
+                yield chunks[-1], chunk_offsets[-1]
+            return
+
+        items = []
+        items_offset = idx
+        items_size = 2
+        for _, _, value_start in self._iter_members(content, idx):
+            item, _ = self._decode_value(content, value_start)
+            size = self._json_size(item)
+            if items and items_size + size + 2 > max_chunk_size:
+                yield self._wrap(path, items), items_offset
+                items = []
+                items_size = 2
+            if isinstance(item, dict) and size + 2 > max_chunk_size:
+                # An item too large for a chunk of its own is split like a member,
+                # and each of its parts is kept in an array of one item
+                chunks = [{}]
+                self._split_member(item, [], chunks, max_chunk_size)
+                for chunk in chunks:
+                    if chunk:
+                        yield self._wrap(path, [chunk]), value_start
+                continue
+            if not items:
+                items_offset = value_start
+            items.append(item)
+            items_size += size + 2
+        if items:
+            yield self._wrap(path, items), items_offset
+
+    def _wrap(self, path: List[str], value):
+        if not path:
+            return value
+        chunk = {}
+        self._set_nested(chunk, path, value)
+        return chunk
@@ -1,7 +1,7 @@
 from typing import List
 from .document_chunking_base import DocumentChunkingBase
-from langchain.text_splitter import MarkdownTextSplitter
 from .chunking_strategy import ChunkingSettings
+from .token_chunker import TokenChunker, get_markdown_splitter
 from ..common.source_document import SourceDocument
 
 
@@ -12,26 +12,25 @@ class LayoutDocumentChunking(DocumentChunkingBase):
     def chunk(
         self, documents: List[SourceDocument], chunking: ChunkingSettings
     ) -> List[SourceDocument]:
-        full_document_content = "".join(
-            list(map(lambda document: document.content, documents))
-        )
+        token_chunker = TokenChunker(documents)
         document_url = documents[0].source
-        splitter = MarkdownTextSplitter.from_tiktoken_encoder(
-            chunk_size=chunking.chunk_size, chunk_overlap=chunking.chunk_overlap
-        )
-        chunked_content_list = splitter.split_text(full_document_content)
+        splitter = get_markdown_splitter(chunking.chunk_size, chunking.chunk_overlap)
+        chunked_content_list = splitter.split_text(token_chunker.content)
+        chunk_offsets = token_chunker.text_offsets(chunked_content_list)
         # Create document for each chunk
         documents = []
-        chunk_offset = 0
-        for idx, chunked_content in enumerate(chunked_content_list):
+        for idx, (chunked_content, chunk_offset) in enumerate(
+            zip(chunked_content_list, chunk_offsets)
+        ):
             documents.append(
                 SourceDocument.from_metadata(
                     content=chunked_content,
                     document_url=document_url,
-                    metadata={"offset": chunk_offset},
+                    metadata={
+                        "offset": chunk_offset,
+                        "page_number": token_chunker.page_number(chunk_offset),
+                    },
                     idx=idx,
                 )
             )
-
-            chunk_offset += len(chunked_content)
         return documents
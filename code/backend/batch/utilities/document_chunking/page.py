@@ -1,7 +1,7 @@
 from typing import List
 from .document_chunking_base import DocumentChunkingBase
-from langchain.text_splitter import MarkdownTextSplitter
 from .chunking_strategy import ChunkingSettings
+from .token_chunker import TokenChunker, get_markdown_splitter
 from ..common.source_document import SourceDocument
 
 
@@ -12,20 +12,26 @@ class PageDocumentChunking(DocumentChunkingBase):
     def chunk(
         self, documents: List[SourceDocument], chunking: ChunkingSettings
     ) -> List[SourceDocument]:
+        token_chunker = TokenChunker(documents)
         document_url = documents[0].source
-        splitter = MarkdownTextSplitter.from_tiktoken_encoder(
-            chunk_size=chunking.chunk_size, chunk_overlap=chunking.chunk_overlap
-        )
+        splitter = get_markdown_splitter(chunking.chunk_size, chunking.chunk_overlap)
         documents_chunked = []
-        for idx, document in enumerate(documents):
+        for idx, (document, page_offset) in enumerate(
+            zip(documents, token_chunker.page_offsets)
+        ):
             chunked_content_list = splitter.split_text(document.content)
-            for chunked_content in chunked_content_list:
+            chunk_offsets = token_chunker.text_offsets(
+                chunked_content_list, page_offset
+            )
+            for chunked_content, chunk_offset in zip(
+                chunked_content_list, chunk_offsets
+            ):
                 documents_chunked.append(
                     SourceDocument.from_metadata(
                         content=chunked_content,
                         document_url=document_url,
                         metadata={
-                            "offset": document.offset,
+                            "offset": chunk_offset,
                             "page_number": document.page_number,
                         },
                         idx=idx,
@@ -1,15 +1,104 @@
-from typing import List
+import re
+from typing import Iterator, List, Tuple
 from .document_chunking_base import DocumentChunkingBase
 from .chunking_strategy import ChunkingSettings
+from .token_chunker import get_encoding, get_token_windows
 from ..common.source_document import SourceDocument
 
+# Paragraphs end at blank lines and before the paragraph and header tags emitted by
+# the layout loader
+PARAGRAPH_BOUNDARY = re.compile(r"\n[^\S\n]*\n\s*|(?=<(?:p|h[1-6])>)")
+
 
 class ParagraphDocumentChunking(DocumentChunkingBase):
     def __init__(self) -> None:
         pass
 
-    # TO DO: Implement the following chunking strategies
+    def _paragraphs(self, content: str) -> Iterator[Tuple[int, int]]:
+        start = 0
+        for match in PARAGRAPH_BOUNDARY.finditer(content):
+            if match.end() > start:
+                yield start, match.end()
+                start = match.end()
+        if start < len(content):
+            yield start, len(content)
+
+    def _to_source_document(
+        self, content: str, offset: int, page_number, document_url: str, idx: int
+    ) -> SourceDocument:
+        stripped_content = content.lstrip()
+        return SourceDocument.from_metadata(
+            content=stripped_content.rstrip(),
+            document_url=document_url,
+            metadata={
+                "offset": offset + len(content) - len(stripped_content),
+                "page_number": page_number,
+            },
+            idx=idx,
+        )
+
     def chunk(
         self, documents: List[SourceDocument], chunking: ChunkingSettings
-    ) -> List[SourceDocument]:
-        raise NotImplementedError("Paragraph chunking is not implemented yet")
+    ) -> Iterator[SourceDocument]:
+        """
+        Greedily packs paragraphs into chunks of at most chunk_size tokens, only
+        splitting a paragraph when it alone is larger than chunk_size.
+
+        Chunks are yielded as soon as they are packed, so the chunks of a large
+        document are never all held in memory.
+        """
+        encoding = get_encoding()
+        idx = 0
+        chunk_parts = []
+        chunk_tokens = 0
+        chunk_offset = 0
+        chunk_page_number = None
+        page_offset = 0
+        for document in documents:
+            for start, end in self._paragraphs(document.content):
+                paragraph = document.content[start:end]
+                if not paragraph.strip():
+                    continue
+                tokens = encoding.encode_ordinary(paragraph)
+
+                if chunk_parts and chunk_tokens + len(tokens) > chunking.chunk_size:
+                    yield self._to_source_document(
+                        "".join(chunk_parts),
+                        chunk_offset,
+                        chunk_page_number,
+                        document.source,
+                        idx,
+                    )
+                    idx += 1
+                    chunk_parts = []
+                    chunk_tokens = 0
+
+                if len(tokens) > chunking.chunk_size:
+                    for window_start, window_end in get_token_windows(
+                        encoding, tokens, chunking.chunk_size, chunking.chunk_overlap
+                    ):
+                        yield self._to_source_document(
+                            paragraph[window_start:window_end],
+                            page_offset + start + window_start,
+                            document.page_number,
+                            document.source,
+                            idx,
+                        )
+                        idx += 1
+                    continue
+
+                if not chunk_parts:
+                    chunk_offset = page_offset + start
+                    chunk_page_number = document.page_number
+                chunk_parts.append(paragraph)
+                chunk_tokens += len(tokens)
+            page_offset += len(document.content)
+
+        if chunk_parts:
+            yield self._to_source_document(
+                "".join(chunk_parts),
+                chunk_offset,
+                chunk_page_number,
+                document.source,
+                idx,
+            )
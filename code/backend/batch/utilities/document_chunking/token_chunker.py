@@ -0,0 +1,133 @@
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import tiktoken
+from langchain.text_splitter import MarkdownTextSplitter
+
+from ..common.source_document import SourceDocument
+
+# The encoding LangChain's from_tiktoken_encoder splitters use by default, kept so
+# chunk boundaries do not change
+CHUNKING_ENCODING_NAME = "gpt2"
+
+_UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = CHUNKING_ENCODING_NAME) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(encoding_name)
+
+
+@lru_cache(maxsize=32)
+def get_markdown_splitter(
+    chunk_size: int,
+    chunk_overlap: int,
+    encoding_name: str = CHUNKING_ENCODING_NAME,
+) -> MarkdownTextSplitter:
+    """
+    Returns a process-wide markdown splitter measuring length in tokens of the cached
+    encoder, instead of building a new one for every document.
+    """
+    encoding = get_encoding(encoding_name)
+    return MarkdownTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=lambda text: len(encoding.encode_ordinary(text)),
+    )
+
+
+def get_token_windows(
+    encoding: tiktoken.Encoding,
+    tokens: List[int],
+    chunk_size: int,
+    chunk_overlap: int,
+) -> List[Tuple[int, int]]:
+    """
+    Returns the (start, end) character ranges, in the text the tokens encode, of
+    windows of chunk_size tokens, each overlapping the previous by chunk_overlap.
+    """
+    if chunk_overlap > chunk_size:
+        raise ValueError(
+            f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+            f"({chunk_size}), should be smaller."
+        )
+    token_windows = []
+    step = max(chunk_size - chunk_overlap, 1)
+    for start in range(0, len(tokens), step):
+        end = min(start + chunk_size, len(tokens))
+        token_windows.append((start, end))
+        if end == len(tokens):
+            break
+
+    # Map the window boundaries to character offsets by counting the characters
+    # starting in the bytes of the tokens between consecutive boundaries. A
+    # character split across windows goes to the window it starts in.
+    char_offsets = {0: 0}
+    previous = 0
+    for boundary in sorted({index for window in token_windows for index in window}):
+        token_bytes = encoding.decode_bytes(tokens[previous:boundary])
+        char_offsets[boundary] = char_offsets[previous] + len(
+            token_bytes.translate(None, _UTF8_CONTINUATION_BYTES)
+        )
+        previous = boundary
+    return [(char_offsets[start], char_offsets[end]) for start, end in token_windows]
+
+
+class TokenChunker:
+    """
+    Chunks the content of a document's pages while keeping track of the exact
+    character offset and page number of every chunk.
+    """
+
+    def __init__(
+        self,
+        documents: List[SourceDocument],
+        encoding_name: str = CHUNKING_ENCODING_NAME,
+    ):
+        self.encoding_name = encoding_name
+        self.content = "".join(document.content for document in documents)
+        self.page_offsets = []
+        self.page_numbers = []
+        offset = 0
+        for document in documents:
+            self.page_offsets.append(offset)
+            self.page_numbers.append(document.page_number)
+            offset += len(document.content)
+
+    def page_number(self, offset: int) -> Optional[int]:
+        if not self.page_offsets:
+            return None
+        return self.page_numbers[max(bisect_right(self.page_offsets, offset) - 1, 0)]
+
+    def token_windows(
+        self, chunk_size: int, chunk_overlap: int
+    ) -> List[Tuple[int, int]]:
+        """
+        Tokenizes the content once and returns the (start, end) character ranges of
+        windows of chunk_size tokens, each overlapping the previous by chunk_overlap.
+        """
+        encoding = get_encoding(self.encoding_name)
+        return get_token_windows(
+            encoding, encoding.encode_ordinary(self.content), chunk_size, chunk_overlap
+        )
+
+    def text_offsets(self, chunks: List[str], start: int = 0) -> List[int]:
+        """
+        Returns the character offset of each chunk, where chunks are split in order
+        from the content starting at start and may overlap. A chunk that cannot be
+        found gets the offset of the chunk before it.
+        """
+        offsets = []
+        position = start
+        previous_chunk = None
+        for chunk in chunks:
+            # Consecutive chunks may start at the same offset, unless they are repeats
+            found = self.content.find(
+                chunk, position + 1 if chunk == previous_chunk else position
+            )
+            if found != -1:
+                position = found
+            offsets.append(position)
+            previous_chunk = chunk
+        return offsets
@@ -0,0 +1,188 @@
+import logging
+from collections import Counter
+from io import BytesIO
+from typing import List, Tuple
+from pypdf import PdfReader
+from .document_loading_base import DocumentLoadingBase
+from .download import download_document
+from .layout import LayoutDocumentLoading
+from ..helpers.azure_form_recognizer_helper import AzureFormRecognizerClient
+from ..helpers.document_analysis_cache import DocumentAnalysisCache
+from ..helpers.env_helper import EnvHelper
+from ..common.source_document import SourceDocument
+
+logger = logging.getLogger(__name__)
+
+# Lines in a font this much larger than the body text are marked as headings
+HEADING_FONT_SIZE_RATIO = 1.2
+HEADING_MAX_LENGTH = 200
+# Text layers with more unreadable characters than this are analyzed instead
+MAX_UNREADABLE_RATIO = 0.1
+
+
+class AutoDocumentLoading(DocumentLoadingBase):
+    """
+    Loads born-digital PDFs from their text layer, and only sends the pages without a
+    usable one, like scans, to Document Intelligence.
+
+    A page is analyzed when it draws an image and has fewer than
+    PDF_TEXT_LAYER_MIN_CHARACTERS characters of text, or when its text is mostly
+    unreadable. Documents that cannot be read as PDFs, or where every page needs
+    analysis, are loaded with the layout strategy.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def _has_images(self, resources, depth: int = 0) -> bool:
+        xobjects = resources.get_object().get("/XObject") if resources else None
+        if not xobjects:
+            return False
+        for xobject in xobjects.get_object().values():
+            xobject = xobject.get_object()
+            subtype = xobject.get("/Subtype")
+            if subtype == "/Image":
+                return True
+            # Images can be nested in form XObjects
+            if (
+                subtype == "/Form"
+                and depth < 3
+                and self._has_images(xobject.get("/Resources"), depth + 1)
+            ):
+                return True
+        return False
+
+    def _extract_lines(self, page) -> List[Tuple[str, float]]:
+        """Returns the text of each line of the page, with its largest font size."""
+        lines = [["", 0.0]]
+
+        def visit_text(text, cm, tm, font_dict, font_size):
+            scale = abs(tm[3] * cm[3])
+            size = font_size * scale if scale else font_size
+            for i, part in enumerate(text.split("\n")):
+                if i > 0:
+                    lines.append(["", 0.0])
+                lines[-1][0] += part
+                if part.strip():
+                    lines[-1][1] = max(lines[-1][1], size)
+
+        page.extract_text(visitor_text=visit_text)
+        return [(text.strip(), size) for text, size in lines]
+
+    def _needs_analysis(self, text: str, has_images: bool, min_characters: int) -> bool:
+        characters = [character for character in text if not character.isspace()]
+        if has_images and len(characters) < min_characters:
+            return True
+        unreadable = sum(
+            1
+            for character in characters
+            if character == "\ufffd" or not character.isprintable()
+        )
+        return unreadable > len(characters) * MAX_UNREADABLE_RATIO
+
+    def _body_font_size(self, pages_lines: List[List[Tuple[str, float]]]) -> float:
+        font_sizes = Counter()
+        for lines in pages_lines:
+            for text, size in lines:
+                font_sizes[round(size, 1)] += len(text)
+        return font_sizes.most_common(1)[0][0] if font_sizes else 0.0
+
+    def _lines_to_html(
+        self, lines: List[Tuple[str, float]], body_font_size: float
+    ) -> str:
+        """
+        Marks up the lines of a page like the layout model does: larger lines become
+        headings, and lines between blank lines and headings become paragraphs.
+        """
+        parts = []
+        paragraph = []
+
+        def close_paragraph():
+            if paragraph:
+                parts.append("<p>" + "\n".join(paragraph) + "</p>\n")
+                paragraph.clear()
+
+        for text, size in lines:
+            if not text:
+                close_paragraph()
+            elif (
+                body_font_size
+                and size >= body_font_size * HEADING_FONT_SIZE_RATIO
+                and len(text) <= HEADING_MAX_LENGTH
+            ):
+                close_paragraph()
+                parts.append(f"<h2>{text}</h2>\n")
+            else:
+                paragraph.append(text)
+        close_paragraph()
+        return "".join(parts)
+
+    def _analyze_pages(self, document_url: str, page_numbers: List[int]) -> dict:
+        azure_form_recognizer_client = AzureFormRecognizerClient()
+        document_analysis_cache = DocumentAnalysisCache.get_instance(EnvHelper())
+        analyzed_pages = document_analysis_cache.get_or_analyze(
+            document_url,
+            f"prebuilt-layout/pages={','.join(map(str, page_numbers))}",
+            lambda: [
+                {"page_number": page_number, "page_text": page_text}
+                for page_number, page_text in azure_form_recognizer_client.analyze_pages(
+                    document_url, page_numbers
+                ).items()
+            ],
+        )
+        return {page["page_number"]: page["page_text"] for page in analyzed_pages}
+
+    def load(self, document_url: str) -> List[SourceDocument]:
+        env_helper: EnvHelper = EnvHelper()
+        try:
+            reader = PdfReader(BytesIO(download_document(document_url)))
+            pages_lines = [self._extract_lines(page) for page in reader.pages]
+            pages_have_images = [
+                self._has_images(page.get("/Resources")) for page in reader.pages
+            ]
+        except Exception:
+            logger.warning(
+                "Could not read the text layer of the document, analyzing all of it"
+            )
+            return LayoutDocumentLoading().load(document_url)
+
+        pages_to_analyze = [
+            page_number
+            for page_number, (lines, has_images) in enumerate(
+                zip(pages_lines, pages_have_images), start=1
+            )
+            if self._needs_analysis(
+                "".join(text for text, _ in lines),
+                has_images,
+                env_helper.PDF_TEXT_LAYER_MIN_CHARACTERS,
+            )
+        ]
+        if len(pages_to_analyze) == len(pages_lines):
+            return LayoutDocumentLoading().load(document_url)
+        logger.info(
+            f"Loading {len(pages_lines) - len(pages_to_analyze)} of {len(pages_lines)} "
+            "pages from the text layer"
+        )
+        analyzed_pages = (
+            self._analyze_pages(document_url, pages_to_analyze)
+            if pages_to_analyze
+            else {}
+        )
+
+        body_font_size = self._body_font_size(pages_lines)
+        documents = []
+        offset = 0
+        for page_number, lines in enumerate(pages_lines, start=1):
+            page_text = analyzed_pages.get(page_number)
+            if page_text is None:
+                page_text = self._lines_to_html(lines, body_font_size) + " "
+            documents.append(
+                SourceDocument(
+                    content=page_text,
+                    source=document_url,
+                    offset=offset,
+                    page_number=page_number - 1,
+                )
+            )
+            offset += len(page_text)
+        return documents
@@ -0,0 +1,47 @@
+import codecs
+from urllib.parse import urlparse
+
+import chardet
+import requests
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobClient
+
+# Connections are pooled across every document loaded by the process
+_session = requests.Session()
+
+
+def download_document(document_url: str) -> bytes:
+    """
+    Downloads a document with a pooled connection, through the blob client for blob
+    SAS URLs so downloads are retried like every other storage call.
+    """
+    if urlparse(document_url).netloc.endswith(".blob.core.windows.net"):
+        blob_client = BlobClient.from_blob_url(
+            document_url,
+            transport=RequestsTransport(session=_session, session_owner=False),
+        )
+        return blob_client.download_blob().readall()
+    response = _session.get(document_url)
+    response.raise_for_status()
+    return response.content
+
+
+def decode_document(data: bytes) -> str:
+    """
+    Decodes a document by its byte order mark, as UTF-8, or else as the encoding
+    detected from the start of the document.
+    """
+    for bom, encoding in (
+        (codecs.BOM_UTF8, "utf-8-sig"),
+        (codecs.BOM_UTF32_LE, "utf-32"),
+        (codecs.BOM_UTF32_BE, "utf-32"),
+        (codecs.BOM_UTF16_LE, "utf-16"),
+        (codecs.BOM_UTF16_BE, "utf-16"),
+    ):
+        if data.startswith(bom):
+            return data.decode(encoding)
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        encoding = chardet.detect(data[:65536])["encoding"] or "utf-8"
+        return data.decode(encoding, errors="replace")
@@ -0,0 +1,102 @@
+import re
+from typing import List
+import lxml.html
+from lxml import etree
+from .document_loading_base import DocumentLoadingBase
+from .download import decode_document, download_document
+from ..common.source_document import SourceDocument
+
+# Elements that hold no document content
+BOILERPLATE_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "iframe",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "button",
+    "select",
+]
+# Elements whose text is put on its own line
+BLOCK_TAGS = {
+    "address",
+    "article",
+    "blockquote",
+    "br",
+    "dd",
+    "div",
+    "dl",
+    "dt",
+    "figcaption",
+    "figure",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "li",
+    "main",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "td",
+    "th",
+    "tr",
+    "ul",
+}
+HORIZONTAL_WHITESPACE = re.compile(r"[^\S\n]+")
+BLANK_LINES = re.compile(r"\n\s*\n\s*")
+
+
+class HtmlDocumentLoading(DocumentLoadingBase):
+    def __init__(self) -> None:
+        super().__init__()
+
+    def _extract_text(self, html_content: str) -> str:
+        try:
+            try:
+                tree = lxml.html.document_fromstring(html_content)
+            except ValueError:
+                # Strings with an XML encoding declaration have to be parsed as bytes
+                tree = lxml.html.document_fromstring(html_content.encode("utf-8"))
+        except etree.ParserError:
+            # Empty and comment-only documents have no element to parse
+            return ""
+        etree.strip_elements(tree, *BOILERPLATE_TAGS, with_tail=False)
+        etree.strip_elements(tree, etree.Comment, with_tail=False)
+        for element in tree.iter(*BLOCK_TAGS):
+            # Separate the element from the text before it, which is the tail of its
+            # previous sibling or, for a first child, its parent's leading text
+            previous = element.getprevious()
+            if previous is not None:
+                if not (previous.tail or "").endswith("\n"):
+                    previous.tail = (previous.tail or "") + "\n"
+            elif element.getparent() is not None:
+                parent = element.getparent()
+                if not (parent.text or "").endswith("\n"):
+                    parent.text = (parent.text or "") + "\n"
+            element.tail = "\n" + element.tail if element.tail else "\n"
+        body = tree.find("body")
+        text = (body if body is not None else tree).text_content()
+        text = HORIZONTAL_WHITESPACE.sub(" ", text)
+        text = "\n".join(line.strip() for line in text.split("\n"))
+        return BLANK_LINES.sub("\n\n", text).strip()
+
+    def load(self, document_url: str) -> List[SourceDocument]:
+        content = self._extract_text(decode_document(download_document(document_url)))
+        return [
+            SourceDocument(
+                content=content,
+                source=document_url,
+                offset=0,
+                page_number=0,
+            )
+        ]
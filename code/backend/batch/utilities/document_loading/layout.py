@@ -1,6 +1,8 @@
 from typing import List
 from .document_loading_base import DocumentLoadingBase
 from ..helpers.azure_form_recognizer_helper import AzureFormRecognizerClient
+from ..helpers.document_analysis_cache import DocumentAnalysisCache
+from ..helpers.env_helper import EnvHelper
 from ..common.source_document import SourceDocument
 
 
@@ -10,8 +12,13 @@ class LayoutDocumentLoading(DocumentLoadingBase):
 
     def load(self, document_url: str) -> List[SourceDocument]:
         azure_form_recognizer_client = AzureFormRecognizerClient()
-        pages_content = azure_form_recognizer_client.begin_analyze_document_from_url(
-            document_url, use_layout=True
+        document_analysis_cache = DocumentAnalysisCache.get_instance(EnvHelper())
+        pages_content = document_analysis_cache.get_or_analyze(
+            document_url,
+            "prebuilt-layout",
+            lambda: azure_form_recognizer_client.begin_analyze_document_from_url(
+                document_url, use_layout=True
+            ),
         )
         documents = [
             SourceDocument(
@@ -3,6 +3,9 @@ from .layout import LayoutDocumentLoading
 from .read import ReadDocumentLoading
 from .web import WebDocumentLoading
 from .word_document import WordDocumentLoading
+from .text import TextDocumentLoading
+from .html import HtmlDocumentLoading
+from .auto import AutoDocumentLoading
 
 
 class LoadingStrategy(Enum):
@@ -10,6 +13,9 @@ class LoadingStrategy(Enum):
     READ = "read"
     WEB = "web"
     DOCX = "docx"
+    TEXT = "text"
+    HTML = "html"
+    AUTO = "auto"
 
 
 def get_document_loader(loader_strategy: str):
@@ -21,5 +27,11 @@ def get_document_loader(loader_strategy: str):
         return WebDocumentLoading()
     elif loader_strategy == LoadingStrategy.DOCX.value:
         return WordDocumentLoading()
+    elif loader_strategy == LoadingStrategy.TEXT.value:
+        return TextDocumentLoading()
+    elif loader_strategy == LoadingStrategy.HTML.value:
+        return HtmlDocumentLoading()
+    elif loader_strategy == LoadingStrategy.AUTO.value:
+        return AutoDocumentLoading()
     else:
         raise Exception(f"Unknown loader strategy: {loader_strategy}")
@@ -0,0 +1,20 @@
+from typing import List
+from .document_loading_base import DocumentLoadingBase
+from .download import decode_document, download_document
+from ..common.source_document import SourceDocument
+
+
+class TextDocumentLoading(DocumentLoadingBase):
+    def __init__(self) -> None:
+        super().__init__()
+
+    def load(self, document_url: str) -> List[SourceDocument]:
+        content = decode_document(download_document(document_url))
+        return [
+            SourceDocument(
+                content=content,
+                source=document_url,
+                offset=0,
+                page_number=0,
+            )
+        ]
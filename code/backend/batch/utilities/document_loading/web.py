@@ -1,30 +1,41 @@
 from typing import List
 import re
+from bs4 import BeautifulSoup
 from langchain_community.document_loaders import WebBaseLoader
 from .document_loading_base import DocumentLoadingBase
 from ..common.source_document import SourceDocument
 
 
+# Remove half non-ascii character from start/end of doc content
+NON_ASCII_PATTERN = re.compile(
+    r"[\x00-\x1f\x7f\u0080-\u00a0\u2000-\u3000\ufff0-\uffff]"
+)
+
+
 class WebDocumentLoading(DocumentLoadingBase):
     def __init__(self) -> None:
         super().__init__()
 
     def load(self, document_url: str) -> List[SourceDocument]:
         documents = WebBaseLoader(document_url).load()
-        for document in documents:
-            document.page_content = re.sub("\n{3,}", "\n\n", document.page_content)
-            # Remove half non-ascii character from start/end of doc content
-            pattern = re.compile(
-                r"[\x00-\x1f\x7f\u0080-\u00a0\u2000-\u3000\ufff0-\uffff]"
-            )
-            document.page_content = re.sub(pattern, "", document.page_content)
-            if document.page_content == "":
-                documents.remove(document)
-        source_documents: List[SourceDocument] = [
-            SourceDocument(
-                content=document.page_content,
-                source=document.metadata["source"],
-            )
+        return self._to_source_documents(
+            (document.page_content, document.metadata["source"])
             for document in documents
-        ]
+        )
+
+    def load_content(self, document_url: str, content: bytes) -> List[SourceDocument]:
+        """
+        Loads a page that has already been fetched, extracting its text the way
+        WebBaseLoader does.
+        """
+        text = BeautifulSoup(content, "html.parser").get_text()
+        return self._to_source_documents([(text, document_url)])
+
+    def _to_source_documents(self, pages) -> List[SourceDocument]:
+        source_documents: List[SourceDocument] = []
+        for text, source in pages:
+            text = re.sub("\n{3,}", "\n\n", text)
+            text = NON_ASCII_PATTERN.sub("", text)
+            if text != "":
+                source_documents.append(SourceDocument(content=text, source=source))
         return source_documents
@@ -1,10 +1,15 @@
-from typing import List
-from io import BytesIO
+import html
+from tempfile import SpooledTemporaryFile
+from typing import IO, Iterator, List
 from docx import Document
+from docx.table import Table
 import requests
 from .document_loading_base import DocumentLoadingBase
 from ..common.source_document import SourceDocument
 
+# Documents larger than this are spooled to disk while they are downloaded
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
 
 class WordDocumentLoading(DocumentLoadingBase):
     def __init__(self) -> None:
@@ -18,9 +23,12 @@ class WordDocumentLoading(DocumentLoadingBase):
             "Heading 6": "h6",
         }
 
-    def _download_document(self, document_url: str) -> BytesIO:
-        response = requests.get(document_url)
-        file = BytesIO(response.content)
+    def _download_document(self, document_url: str) -> IO[bytes]:
+        file = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        with requests.get(document_url, stream=True) as response:
+            for block in response.iter_content(chunk_size=1024 * 1024):
+                file.write(block)
+        file.seek(0)
         return file
 
     def _get_opening_tag(self, heading_level: int) -> str:
@@ -29,17 +37,61 @@ class WordDocumentLoading(DocumentLoadingBase):
     def _get_closing_tag(self, heading_level: int) -> str:
         return f"</{self.doc_headings_to_markdown_tags.get(f'{heading_level}', 'p')}>"
 
+    def _table_to_html(self, table: Table) -> str:
+        table_html = ["<table>"]
+        for row in table.rows:
+            table_html.append("<tr>")
+            # Merged cells are repeated for every grid column they span
+            row_cells = []
+            for cell in row.cells:
+                if row_cells and row_cells[-1][0]._tc is cell._tc:
+                    row_cells[-1][1] += 1
+                else:
+                    row_cells.append([cell, 1])
+            for cell, column_span in row_cells:
+                cell_spans = f" colSpan={column_span}" if column_span > 1 else ""
+                table_html.append(f"<td{cell_spans}>{html.escape(cell.text)}</td>")
+            table_html.append("</tr>")
+        table_html.append("</table>")
+        return "".join(table_html)
+
+    def _iter_sections(self, document_url: str) -> Iterator[str]:
+        """
+        Yields the content of the document one section at a time, starting a new section
+        at every heading. Paragraphs and tables are read in document order.
+        """
+        section = []
+        with self._download_document(document_url) as file:
+            document = Document(file)
+            for block in document.iter_inner_content():
+                if isinstance(block, Table):
+                    section.append(f"{self._table_to_html(block)}\n")
+                    continue
+                style_name = block.style.name
+                if style_name in self.doc_headings_to_markdown_tags and section:
+                    yield "".join(section)
+                    section = []
+                section.append(
+                    f"{self._get_opening_tag(style_name)}{block.text}{self._get_closing_tag(style_name)}\n"
+                )
+        if section:
+            yield "".join(section)
+
     def load(self, document_url: str) -> List[SourceDocument]:
-        output = ""
-        document = Document(self._download_document(document_url))
-        for paragraph in document.paragraphs:
-            output += f"{self._get_opening_tag(paragraph.style.name)}{paragraph.text}{self._get_closing_tag(paragraph.style.name)}\n"
-        documents = [
-            SourceDocument(
-                content=output,
-                source=document_url,
-                offset=0,
-                page_number=0,
+        documents = []
+        offset = 0
+        for section in self._iter_sections(document_url):
+            documents.append(
+                SourceDocument(
+                    content=section,
+                    source=document_url,
+                    offset=offset,
+                    page_number=0,
+                )
+            )
+            offset += len(section)
+        if not documents:
+            documents.append(
+                SourceDocument(content="", source=document_url, offset=0, page_number=0)
             )
-        ]
         return documents
@@ -1,7 +1,11 @@
+import logging
 import mimetypes
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceModifiedError, ResourceNotFoundError
 from azure.storage.blob import (
+    BlobProperties,
     BlobServiceClient,
     generate_blob_sas,
     generate_container_sas,
@@ -14,6 +18,12 @@ import chardet
 from .env_helper import EnvHelper
 from .azure_credential_utils import get_azure_credential
 
+logger = logging.getLogger(__name__)
+
+# Metadata recording the version of a blob's content that was last indexed
+INDEXED_CONTENT_MD5_METADATA = "indexed_content_md5"
+INDEXED_AT_METADATA = "indexed_at"
+
 
 def connection_string(account_name: str, account_key: str):
     return f"DefaultEndpointsProtocol=https;AccountName={account_name};AccountKey={account_key};EndpointSuffix=core.windows.net"
@@ -143,6 +153,18 @@ class AzureBlobStorageClient:
         )
         return blob_client.download_blob().readall()
 
+    def get_file_etag(
+        self, file_name, container_name: Optional[str] = None
+    ) -> Optional[str]:
+        """Returns the ETag of the blob, or None when it does not exist."""
+        blob_client = self.blob_service_client.get_blob_client(
+            container=container_name or self.container_name, blob=file_name
+        )
+        try:
+            return blob_client.get_blob_properties().etag
+        except ResourceNotFoundError:
+            return None
+
     def delete_file(self, file_name):
         """
         Deletes a file from the Azure Blob Storage container.
@@ -228,6 +250,75 @@ class AzureBlobStorageClient:
 
         return files
 
+    def is_unchanged_since_indexed(self, blob) -> bool:
+        """
+        Returns whether the blob has been indexed, and its content MD5 matches the one
+        recorded when it was indexed. Blobs without an MD5 are always processed again,
+        as nothing else identifies the indexed version of their content.
+        """
+        metadata = blob.metadata or {}
+        if metadata.get("embeddings_added", "false") != "true":
+            return False
+        content_md5 = blob.content_settings.content_md5
+        if not content_md5 or INDEXED_CONTENT_MD5_METADATA not in metadata:
+            return False
+        return bytes(content_md5).hex() == metadata[INDEXED_CONTENT_MD5_METADATA]
+
+    def get_files_to_process(self, only_changed: bool) -> Tuple[List[str], int]:
+        """
+        Returns the names of the files to process, and how many were skipped because
+        they have not changed since they were indexed when only_changed is set.
+        """
+        container_client = self.blob_service_client.get_container_client(
+            self.container_name
+        )
+        file_names = []
+        skipped = 0
+        for blob in container_client.list_blobs(include="metadata"):
+            if blob.name.startswith("converted/"):
+                continue
+            if only_changed and self.is_unchanged_since_indexed(blob):
+                skipped += 1
+            else:
+                file_names.append(blob.name)
+        return file_names, skipped
+
+    def get_blob_properties(self, file_name) -> BlobProperties:
+        blob_client = self.blob_service_client.get_blob_client(
+            container=self.container_name, blob=file_name
+        )
+        return blob_client.get_blob_properties()
+
+    def mark_embeddings_added(self, file_name, properties: BlobProperties):
+        """
+        Marks the blob as indexed, recording the version of its content described by
+        properties, which must be read before the blob is loaded. The blob is left
+        unmarked if it has been modified since, so its new content is indexed by the
+        next delta run.
+        """
+        blob_client = self.blob_service_client.get_blob_client(
+            container=self.container_name, blob=file_name
+        )
+        blob_metadata = dict(properties.metadata or {})
+        blob_metadata["embeddings_added"] = "true"
+        blob_metadata[INDEXED_AT_METADATA] = datetime.now(timezone.utc).isoformat()
+        content_md5 = properties.content_settings.content_md5
+        if content_md5:
+            blob_metadata[INDEXED_CONTENT_MD5_METADATA] = bytes(content_md5).hex()
+        else:
+            blob_metadata.pop(INDEXED_CONTENT_MD5_METADATA, None)
+        conditions = (
+            {"etag": properties.etag, "match_condition": MatchConditions.IfNotModified}
+            if properties.etag
+            else {}
+        )
+        try:
+            blob_client.set_blob_metadata(metadata=blob_metadata, **conditions)
+        except ResourceModifiedError:
+            logger.warning(
+                f"Blob {file_name} was modified while it was indexed, not marking it"
+            )
+
     def upsert_blob_metadata(self, file_name, metadata):
         blob_client = self.blob_service_client.get_blob_client(
             container=self.container_name, blob=file_name
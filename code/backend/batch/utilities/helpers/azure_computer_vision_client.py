@@ -40,6 +40,20 @@ class AzureComputerVisionClient:
         response_json = self.__get_json_body(response)
         return self.__get_vectors(response_json)
 
+    def vectorize_image_bytes(self, image: bytes) -> list[float]:
+        """Vectorizes an image sent in the request, instead of fetched by URL."""
+        logger.info(
+            f"Making call to computer vision to vectorize image of {len(image)} bytes"
+        )
+        response = self.__make_request(
+            self.__VECTORIZE_IMAGE_PATH,
+            data=image,
+        )
+        self.__validate_response(response)
+
+        response_json = self.__get_json_body(response)
+        return self.__get_vectors(response_json)
+
     def vectorize_text(self, text: str) -> list[float]:
         logger.debug(f"Making call to computer vision to vectorize text: {text}")
         response = self.__make_request(
@@ -51,9 +65,11 @@ class AzureComputerVisionClient:
         response_json = self.__get_json_body(response)
         return self.__get_vectors(response_json)
 
-    def __make_request(self, path: str, body) -> Response:
+    def __make_request(self, path: str, body=None, data: bytes = None) -> Response:
         try:
             headers = {}
+            if data is not None:
+                headers["Content-Type"] = "application/octet-stream"
             if self.use_keys:
                 headers["Ocp-Apim-Subscription-Key"] = self.key
             else:
@@ -69,6 +85,7 @@ class AzureComputerVisionClient:
                     "model-version": self.model_version,
                 },
                 json=body,
+                data=data,
                 headers=headers,
                 timeout=self.timeout,
             )
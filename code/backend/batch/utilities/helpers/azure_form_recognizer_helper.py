@@ -1,5 +1,10 @@
 import logging
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError
 from azure.ai.formrecognizer import DocumentAnalysisClient
 from .azure_credential_utils import get_azure_credential
 import html
@@ -8,11 +13,26 @@ from .env_helper import EnvHelper
 
 logger = logging.getLogger(__name__)
 
+# Inner error code the service returns when requested pages are past the end of the
+# document, e.g. "The parameter pages is invalid: The page range is out of bounds."
+PAGE_RANGE_ERROR_CODE = "InvalidParameter"
+
+
+def _is_page_range_error(error: HttpResponseError) -> bool:
+    if error.status_code != 400 or error.error is None:
+        return False
+    inner_error = error.error.innererror or {}
+    return inner_error.get("code") == PAGE_RANGE_ERROR_CODE and "pages" in (
+        inner_error.get("message") or ""
+    )
+
 
 class AzureFormRecognizerClient:
     def __init__(self) -> None:
         env_helper: EnvHelper = EnvHelper()
 
+        self.page_range_size = env_helper.AZURE_FORM_RECOGNIZER_PAGE_RANGE_SIZE
+        self.max_concurrency = max(env_helper.AZURE_FORM_RECOGNIZER_MAX_CONCURRENCY, 1)
         self.AZURE_FORM_RECOGNIZER_ENDPOINT: str = (
             env_helper.AZURE_FORM_RECOGNIZER_ENDPOINT
         )
@@ -70,6 +90,214 @@ class AzureFormRecognizerClient:
         table_html += "</table>"
         return table_html
 
+    def _table_segments(self, page_start: int, page_end: int, tables_on_page):
+        """
+        Returns the sorted (start, end, table_id) ranges of the page covered by tables.
+
+        Where table spans overlap the later table wins, as each table overwrites the
+        characters of the tables before it.
+        """
+        spans = [
+            (max(span.offset, page_start), min(span.offset + span.length, page_end), i)
+            for i, table in enumerate(tables_on_page)
+            for span in table.spans
+        ]
+        spans = [span for span in spans if span[0] < span[1]]
+        boundaries = sorted({position for span in spans for position in span[:2]})
+
+        segments = []
+        for start, end in zip(boundaries, boundaries[1:]):
+            owners = [i for s, e, i in spans if s <= start and end <= e]
+            if not owners:
+                continue
+            table_id = max(owners)
+            if segments and segments[-1][1] == start and segments[-1][2] == table_id:
+                segments[-1] = (segments[-1][0], end, table_id)
+            else:
+                segments.append((start, end, table_id))
+        return segments
+
+    def _text_to_html(
+        self, content: str, start: int, end: int, roles_start, roles_end, role_positions
+    ):
+        parts = []
+        for i in range(
+            bisect_left(role_positions, start), bisect_left(role_positions, end)
+        ):
+            position = role_positions[i]
+            parts.append(content[start:position])
+            start = position
+            html_role = self.form_recognizer_role_to_html.get(roles_start.get(position))
+            if html_role is not None:
+                parts.append(f"<{html_role}>")
+            html_role = self.form_recognizer_role_to_html.get(roles_end.get(position))
+            if html_role is not None:
+                parts.append(f"</{html_role}>")
+        parts.append(content[start:end])
+        return "".join(parts)
+
+    def _page_to_html(
+        self,
+        content: str,
+        page_offset: int,
+        page_length: int,
+        tables_on_page,
+        roles_start,
+        roles_end,
+        role_positions,
+    ):
+        """
+        Builds the page text in one pass over the page, replacing table spans with the
+        table html and marking the paragraphs with html headers, if using layout.
+        """
+        page_end = page_offset + page_length
+        parts = []
+        added_tables = set()
+        position = page_offset
+        for start, end, table_id in self._table_segments(
+            page_offset, page_end, tables_on_page
+        ):
+            parts.append(
+                self._text_to_html(
+                    content, position, start, roles_start, roles_end, role_positions
+                )
+            )
+            if table_id not in added_tables:
+                parts.append(self._table_to_html(tables_on_page[table_id]))
+                added_tables.add(table_id)
+            position = end
+        parts.append(
+            self._text_to_html(
+                content, position, page_end, roles_start, roles_end, role_positions
+            )
+        )
+        return "".join(parts)
+
+    def _format_page_ranges(self, page_numbers: List[int]) -> str:
+        """Formats sorted page numbers the way the service expects, e.g. 1-3,7"""
+        page_ranges = []
+        for page_number in page_numbers:
+            if page_ranges and page_ranges[-1][1] == page_number - 1:
+                page_ranges[-1][1] = page_number
+            else:
+                page_ranges.append([page_number, page_number])
+        return ",".join(
+            f"{start}-{end}" if end > start else f"{start}"
+            for start, end in page_ranges
+        )
+
+    def _analyze_pages(
+        self,
+        model_id: str,
+        source_url: str,
+        page_numbers: Optional[List[int]] = None,
+    ) -> List[str]:
+        """
+        Analyzes the document, or only the given (1-based, sorted) page numbers, and
+        returns the html text of each analyzed page.
+        """
+        if page_numbers is None:
+            poller = self.document_analysis_client.begin_analyze_document_from_url(
+                model_id, document_url=source_url
+            )
+        else:
+            poller = self.document_analysis_client.begin_analyze_document_from_url(
+                model_id,
+                document_url=source_url,
+                pages=self._format_page_ranges(page_numbers),
+            )
+        form_recognizer_results = poller.result()
+
+        # (if using layout) mark all the positions of headers
+        roles_start = {}
+        roles_end = {}
+        for paragraph in form_recognizer_results.paragraphs:
+            # if paragraph.role!=None:
+            para_start = paragraph.spans[0].offset
+            para_end = paragraph.spans[0].offset + paragraph.spans[0].length
+            roles_start[para_start] = (
+                paragraph.role if paragraph.role is not None else "paragraph"
+            )
+            roles_end[para_end] = (
+                paragraph.role if paragraph.role is not None else "paragraph"
+            )
+        role_positions = sorted(roles_start.keys() | roles_end.keys())
+
+        tables_by_page = defaultdict(list)
+        for table in form_recognizer_results.tables:
+            tables_by_page[table.bounding_regions[0].page_number].append(table)
+
+        page_texts = []
+        for page_num, page in enumerate(form_recognizer_results.pages):
+            page_text = self._page_to_html(
+                form_recognizer_results.content,
+                page.spans[0].offset,
+                page.spans[0].length,
+                tables_by_page[
+                    page_numbers[page_num] if page_numbers else page_num + 1
+                ],
+                roles_start,
+                roles_end,
+                role_positions,
+            )
+            page_texts.append(page_text + " ")
+        return page_texts
+
+    def _analyze_page_ranges(self, model_id: str, source_url: str) -> List[str]:
+        """
+        Analyzes the document in ranges of page_range_size pages, running up to
+        max_concurrency ranges at once, until a range comes back short.
+
+        The page count is not known upfront, so each round speculatively submits the
+        next max_concurrency ranges. Ranges past the end of the document are rejected
+        by the service with an invalid pages error, which ends the analysis; any other
+        error is raised.
+        """
+        page_texts = []
+        first_page = 1
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while True:
+                first_pages = [
+                    first_page + i * self.page_range_size
+                    for i in range(self.max_concurrency)
+                ]
+                futures = [
+                    executor.submit(
+                        self._analyze_pages,
+                        model_id,
+                        source_url,
+                        list(range(start, start + self.page_range_size)),
+                    )
+                    for start in first_pages
+                ]
+                for start, future in zip(first_pages, futures):
+                    try:
+                        range_texts = future.result()
+                    except HttpResponseError as e:
+                        if start > 1 and _is_page_range_error(e):
+                            logger.info(f"Page {start} is past the end of the document")
+                            return page_texts
+                        raise
+                    page_texts.extend(range_texts)
+                    if len(range_texts) < self.page_range_size:
+                        return page_texts
+                first_page = first_pages[-1] + self.page_range_size
+
+    def analyze_pages(
+        self, source_url: str, page_numbers: List[int], use_layout: bool = True
+    ) -> Dict[int, str]:
+        """
+        Analyzes only the given (1-based) pages of the document, and returns the html
+        text of each page by page number.
+        """
+        model_id = "prebuilt-layout" if use_layout else "prebuilt-read"
+        page_numbers = sorted(set(page_numbers))
+        if not page_numbers:
+            return {}
+        logger.info(f"Analyzing {len(page_numbers)} pages with {model_id}")
+        page_texts = self._analyze_pages(model_id, source_url, page_numbers)
+        return dict(zip(page_numbers, page_texts))
+
     def begin_analyze_document_from_url(
         self, source_url: str, use_layout: bool = True, paragraph_separator: str = ""
     ):
@@ -80,68 +308,12 @@ class AzureFormRecognizerClient:
         try:
             logger.info("Method begin_analyze_document_from_url started")
             logger.info(f"Model ID selected: {model_id}")
-            poller = self.document_analysis_client.begin_analyze_document_from_url(
-                model_id, document_url=source_url
-            )
-            form_recognizer_results = poller.result()
-
-            # (if using layout) mark all the positions of headers
-            roles_start = {}
-            roles_end = {}
-            for paragraph in form_recognizer_results.paragraphs:
-                # if paragraph.role!=None:
-                para_start = paragraph.spans[0].offset
-                para_end = paragraph.spans[0].offset + paragraph.spans[0].length
-                roles_start[para_start] = (
-                    paragraph.role if paragraph.role is not None else "paragraph"
-                )
-                roles_end[para_end] = (
-                    paragraph.role if paragraph.role is not None else "paragraph"
-                )
-
-            for page_num, page in enumerate(form_recognizer_results.pages):
-                tables_on_page = [
-                    table
-                    for table in form_recognizer_results.tables
-                    if table.bounding_regions[0].page_number == page_num + 1
-                ]
+            if self.page_range_size > 0:
+                page_texts = self._analyze_page_ranges(model_id, source_url)
+            else:
+                page_texts = self._analyze_pages(model_id, source_url)
 
-                # (if using layout) mark all positions of the table spans in the page
-                page_offset = page.spans[0].offset
-                page_length = page.spans[0].length
-                table_chars = [-1] * page_length
-                for table_id, table in enumerate(tables_on_page):
-                    for span in table.spans:
-                        # replace all table spans with "table_id" in table_chars array
-                        for i in range(span.length):
-                            idx = span.offset - page_offset + i
-                            if idx >= 0 and idx < page_length:
-                                table_chars[idx] = table_id
-
-                # build page text by replacing charcters in table spans with table html and replace the characters corresponding to headers with html headers, if using layout
-                page_text = ""
-                added_tables = set()
-                for idx, table_id in enumerate(table_chars):
-                    if table_id == -1:
-                        position = page_offset + idx
-                        if position in roles_start.keys():
-                            role = roles_start[position]
-                            html_role = self.form_recognizer_role_to_html.get(role)
-                            if html_role is not None:
-                                page_text += f"<{html_role}>"
-                        if position in roles_end.keys():
-                            role = roles_end[position]
-                            html_role = self.form_recognizer_role_to_html.get(role)
-                            if html_role is not None:
-                                page_text += f"</{html_role}>"
-
-                        page_text += form_recognizer_results.content[page_offset + idx]
-
-                    elif table_id not in added_tables:
-                        page_text += self._table_to_html(tables_on_page[table_id])
-                        added_tables.add(table_id)
-
-                page_text += " "
+            for page_num, page_text in enumerate(page_texts):
                 page_map.append(
                     {"page_number": page_num, "offset": offset, "page_text": page_text}
                 )
@@ -1,58 +1,161 @@
+import atexit
 import logging
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
 import psycopg2
-from psycopg2.extras import execute_values, RealDictCursor
+from psycopg2.extras import RealDictCursor
 from .azure_credential_utils import get_azure_credential
 from .llm_helper import LLMHelper
 from .env_helper import EnvHelper
+from .postgres_connection_pool import (
+    POSTGRES_TOKEN_SCOPE,
+    AccessTokenCache,
+    PostgresConnectionPool,
+)
 
 logger = logging.getLogger(__name__)
 
+# Columns of the vector_store table, with how each is encoded in binary COPY format
+VECTOR_STORE_COLUMNS = [
+    ("id", "text"),
+    ("title", "text"),
+    ("chunk", "integer"),
+    ("chunk_id", "text"),
+    ("offset", "integer"),
+    ("page_number", "integer"),
+    ("content", "text"),
+    ("source", "text"),
+    ("metadata", "text"),
+    ("content_vector", "vector"),
+]
+COPY_BUFFER_SIZE = 1 << 20
+
+
+def _encode_copy_value(value, column_type: str) -> bytes:
+    if value is None:
+        return struct.pack("!i", -1)
+    if column_type == "integer":
+        data = struct.pack("!i", int(value))
+    elif column_type == "bigint":
+        data = struct.pack("!q", int(value))
+    elif column_type == "vector":
+        # pgvector's binary format: dimensions, an unused field, then float4 values
+        vector = array("f", value)
+        if sys.byteorder == "little":
+            vector.byteswap()
+        data = struct.pack("!hh", len(vector), 0) + vector.tobytes()
+    else:
+        data = str(value).encode("utf-8")
+    return struct.pack("!i", len(data)) + data
+
+
+def copy_binary_rows(rows: Iterable[tuple], column_types: List[str]) -> Iterator[bytes]:
+    """Encodes rows in the PostgreSQL binary COPY format, one row at a time."""
+    yield b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+    field_count = struct.pack("!h", len(column_types))
+    for row in rows:
+        yield field_count + b"".join(
+            _encode_copy_value(value, column_type)
+            for value, column_type in zip(row, column_types)
+        )
+    yield struct.pack("!h", -1)
+
+
+class CopyStream:
+    """
+    File-like object for `COPY ... FROM STDIN`, reading from an iterator of chunks so
+    that the rows are encoded as PostgreSQL reads them instead of all at once.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+        self.buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
 
 class AzurePostgresHelper:
+    _vector_store_id_key_checked = False
+    # Connection pools shared by every helper in the process, by server, user and database
+    _pools: Dict[Tuple[str, str, str], PostgresConnectionPool] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self):
         self.llm_helper = LLMHelper()
         self.env_helper = EnvHelper()
-        self.conn = None
 
-    def _create_search_client(self):
+    def _create_search_client(self, access_token_cache: AccessTokenCache):
         """
-        Establishes a connection to Azure PostgreSQL using AAD authentication.
+        Opens a new connection to Azure PostgreSQL using AAD authentication.
         """
         try:
             user = self.env_helper.POSTGRESQL_USER
             host = self.env_helper.POSTGRESQL_HOST
             dbname = self.env_helper.POSTGRESQL_DATABASE
 
-            # Acquire the access token
-            credential = get_azure_credential(self.env_helper.MANAGED_IDENTITY_CLIENT_ID)
-            access_token = credential.get_token(
-                "https://ossrdbms-aad.database.windows.net/.default"
-            )
-
-            # Use the token in the connection string
+            # Use the cached access token in the connection string
             conn_string = (
-                f"host={host} user={user} dbname={dbname} password={access_token.token} sslmode=require"
+                f"host={host} user={user} dbname={dbname} password={access_token_cache.get_token()} sslmode=require"
             )
-            self.conn = psycopg2.connect(conn_string)
+            conn = psycopg2.connect(conn_string)
             logger.info("Connected to Azure PostgreSQL successfully.")
-            return self.conn
+            return conn
         except Exception as e:
             logger.error(f"Error establishing a connection to PostgreSQL: {e}")
             raise
 
-    def get_search_client(self):
+    def get_search_client(self) -> PostgresConnectionPool:
         """
-        Provides a reusable database connection.
+        Provides the process-wide connection pool of the configured database, creating
+        it on first use. Connections are opened lazily as queries need them.
         """
-        if self.conn is None or self.conn.closed != 0:  # Ensure the connection is open
-            self.conn = self._create_search_client()
-        return self.conn
+        key = (
+            self.env_helper.POSTGRESQL_HOST,
+            self.env_helper.POSTGRESQL_USER,
+            self.env_helper.POSTGRESQL_DATABASE,
+        )
+        with AzurePostgresHelper._pools_lock:
+            pool = AzurePostgresHelper._pools.get(key)
+            if pool is None:
+                access_token_cache = AccessTokenCache(
+                    get_azure_credential(self.env_helper.MANAGED_IDENTITY_CLIENT_ID),
+                    POSTGRES_TOKEN_SCOPE,
+                )
+                pool = PostgresConnectionPool(
+                    lambda: self._create_search_client(access_token_cache)
+                )
+                AzurePostgresHelper._pools[key] = pool
+            return pool
+
+    @staticmethod
+    def close_pools():
+        """Closes the idle connections of every pool and forgets the pools."""
+        with AzurePostgresHelper._pools_lock:
+            pools = list(AzurePostgresHelper._pools.values())
+            AzurePostgresHelper._pools.clear()
+        for pool in pools:
+            pool.close()
 
     def get_vector_store(self, embedding_array):
         """
         Fetches search indexes from PostgreSQL based on an embedding vector.
         """
-        conn = self.get_search_client()
+        pool = self.get_search_client()
+        conn = pool.getconn()
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(
@@ -69,55 +172,135 @@ class AzurePostgresHelper:
                 )
                 search_results = cur.fetchall()
                 logger.info(f"Retrieved {len(search_results)} search results.")
+                logger.info(f"PostgreSQL connection pool stats: {pool.stats()}")
                 return search_results
         except Exception as e:
             logger.error(f"Error executing search query: {e}")
             raise
         finally:
-            conn.close()
+            pool.putconn(conn)
+
+    def _ensure_vector_store_id_key(self, cur):
+        """
+        Adds the unique key on id that upserts rely on to a vector_store table created
+        without one, once per process, first removing the duplicate rows that earlier
+        re-ingestion left behind.
+        """
+        if AzurePostgresHelper._vector_store_id_key_checked:
+            return
+        cur.execute(
+            """
+            SELECT 1
+            FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = 'vector_store'::regclass
+                AND i.indisunique AND i.indnatts = 1 AND a.attname = 'id'
+            """
+        )
+        if cur.fetchone() is None:
+            logger.warning(
+                "vector_store has no unique key on id, removing duplicate rows and adding one."
+            )
+            cur.execute(
+                """
+                DELETE FROM vector_store a
+                USING vector_store b
+                WHERE a.id = b.id AND a.ctid < b.ctid
+                """
+            )
+            logger.info(f"Removed {cur.rowcount} duplicate rows from vector_store.")
+            cur.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS vector_store_id_key ON vector_store (id)"
+            )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS vector_store_source_idx ON vector_store (source)"
+            )
 
     def create_vector_store(self, documents_to_upload):
         """
-        Inserts documents into the `vector_store` table in batch mode.
+        Upserts documents into the `vector_store` table by id, and deletes the rows of
+        their sources that are no longer among them.
+
+        The documents are streamed with a binary COPY into a staging table, then merged
+        into `vector_store` in the same transaction. Rows whose values did not change
+        are left untouched, so re-ingesting a document does not rewrite its vectors.
         """
-        conn = self.get_search_client()
+        columns = [name for name, _ in VECTOR_STORE_COLUMNS]
+        column_list = ", ".join(f'"{name}"' for name in columns)
+        staging_column_list = ", ".join(f's."{name}"' for name in columns)
+        updates = ", ".join(
+            f'"{name}" = EXCLUDED."{name}"' for name in columns if name != "id"
+        )
+        pool = self.get_search_client()
+        conn = pool.getconn()
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                data_to_insert = [
-                    (
-                        d["id"],
-                        d["title"],
-                        d["chunk"],
-                        d["chunk_id"],
-                        d["offset"],
-                        d["page_number"],
-                        d["content"],
-                        d["source"],
-                        d["metadata"],
-                        d["content_vector"],
-                    )
-                    for d in documents_to_upload
-                ]
-
-                # Batch insert using execute_values for efficiency
-                query = """
-                    INSERT INTO vector_store (
-                        id, title, chunk, chunk_id, "offset", page_number,
-                        content, source, metadata, content_vector
-                    ) VALUES %s
-                """
-                execute_values(cur, query, data_to_insert)
-                logger.info(
-                    f"Inserted {len(documents_to_upload)} documents successfully."
+            with conn.cursor() as cur:
+                self._ensure_vector_store_id_key(cur)
+                start_time = time.perf_counter()
+                cur.execute(
+                    """
+                    CREATE TEMP TABLE vector_store_staging
+                    (LIKE vector_store) ON COMMIT DROP
+                    """
                 )
+                cur.execute(
+                    "ALTER TABLE vector_store_staging ADD COLUMN ordinal bigint"
+                )
+                rows = (
+                    tuple(d[name] for name in columns) + (ordinal,)
+                    for ordinal, d in enumerate(documents_to_upload)
+                )
+                column_types = [column_type for _, column_type in VECTOR_STORE_COLUMNS]
+                cur.copy_expert(
+                    f"COPY vector_store_staging ({column_list}, ordinal) "
+                    "FROM STDIN (FORMAT binary)",
+                    CopyStream(copy_binary_rows(rows, column_types + ["bigint"])),
+                    size=COPY_BUFFER_SIZE,
+                )
+                cur.execute("ANALYZE vector_store_staging")
+                copy_seconds = time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                # Documents sharing an id overwrite each other, so the last one wins
+                cur.execute(
+                    f"""
+                    INSERT INTO vector_store ({column_list})
+                    SELECT DISTINCT ON (s.id) {staging_column_list}
+                    FROM vector_store_staging s
+                    ORDER BY s.id, s.ordinal DESC
+                    ON CONFLICT (id) DO UPDATE SET {updates}
+                    WHERE ({", ".join(f'vector_store."{name}"' for name in columns)})
+                        IS DISTINCT FROM
+                        ({", ".join(f'EXCLUDED."{name}"' for name in columns)})
+                    """
+                )
+                upserted = cur.rowcount
+                cur.execute(
+                    """
+                    DELETE FROM vector_store v
+                    WHERE v.source IN (SELECT DISTINCT source FROM vector_store_staging)
+                        AND NOT EXISTS (
+                            SELECT 1 FROM vector_store_staging s WHERE s.id = v.id
+                        )
+                    """
+                )
+                deleted = cur.rowcount
+                merge_seconds = time.perf_counter() - start_time
 
             conn.commit()  # Commit the transaction
+            AzurePostgresHelper._vector_store_id_key_checked = True
+            logger.info(f"PostgreSQL connection pool stats: {pool.stats()}")
+            logger.info(
+                f"Upserted {len(documents_to_upload)} documents successfully: "
+                f"{upserted} inserted or changed, {deleted} stale rows deleted, "
+                f"copy {copy_seconds:.2f}s, merge {merge_seconds:.2f}s."
+            )
         except Exception as e:
             logger.error(f"Error during index creation: {e}")
             conn.rollback()  # Roll back transaction on error
             raise
         finally:
-            conn.close()
+            pool.putconn(conn)
 
     def get_files(self):
         """
@@ -127,7 +310,8 @@ class AzurePostgresHelper:
             list[dict] or None: A list of dictionaries (each with a single key 'title')
             or None if no titles are found or an error occurs.
         """
-        conn = self.get_search_client()
+        pool = self.get_search_client()
+        conn = pool.getconn()
         try:
             # Using a cursor to execute the query
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
@@ -149,7 +333,7 @@ class AzurePostgresHelper:
             logger.error(f"Unexpected error while fetching titles: {e}")
             raise
         finally:
-            conn.close()
+            pool.putconn(conn)
 
     def delete_documents(self, ids_to_delete):
         """
@@ -161,7 +345,8 @@ class AzurePostgresHelper:
         Returns:
             int: The number of deleted rows.
         """
-        conn = self.get_search_client()
+        pool = self.get_search_client()
+        conn = pool.getconn()
         try:
             if not ids_to_delete:
                 logger.warning("No IDs provided for deletion.")
@@ -196,14 +381,41 @@ class AzurePostgresHelper:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            pool.putconn(conn)
+
+    def delete_documents_by_source(self, source):
+        """
+        Deletes every document of a source from the PostgreSQL database.
+
+        Args:
+            source (str): The source whose documents are deleted.
+
+        Returns:
+            int: The number of deleted rows.
+        """
+        pool = self.get_search_client()
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM vector_store WHERE source = %s", (source,))
+                conn.commit()
+                deleted_rows = cursor.rowcount
+                logger.info(f"Deleted {deleted_rows} documents of source {source}.")
+                return deleted_rows
+        except Exception as e:
+            logger.error(f"Error while deleting documents of source {source}: {e}")
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
 
     def perform_search(self, title):
         """
         Fetches search results from PostgreSQL based on the title.
         """
-        # Establish connection to PostgreSQL
-        conn = self.get_search_client()
+        # Acquire a pooled connection to PostgreSQL
+        pool = self.get_search_client()
+        conn = pool.getconn()
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 # Execute query to fetch title, content, and metadata
@@ -222,14 +434,15 @@ class AzurePostgresHelper:
             logger.error(f"Error executing search query: {e}")
             raise
         finally:
-            conn.close()
+            pool.putconn(conn)
 
     def get_unique_files(self):
         """
         Fetches unique titles from PostgreSQL.
         """
-        # Establish connection to PostgreSQL
-        conn = self.get_search_client()
+        # Acquire a pooled connection to PostgreSQL
+        pool = self.get_search_client()
+        conn = pool.getconn()
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 # Execute query to fetch distinct titles
@@ -246,14 +459,15 @@ class AzurePostgresHelper:
             logger.error(f"Error executing search query: {e}")
             raise
         finally:
-            conn.close()
+            pool.putconn(conn)
 
     def search_by_blob_url(self, blob_url):
         """
         Fetches unique titles from PostgreSQL based on a given blob URL.
         """
-        # Establish connection to PostgreSQL
-        conn = self.get_search_client()
+        # Acquire a pooled connection to PostgreSQL
+        pool = self.get_search_client()
+        conn = pool.getconn()
         try:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 # Execute parameterized query to fetch results
@@ -272,4 +486,8 @@ class AzurePostgresHelper:
             logger.error(f"Error executing search query: {e}")
             raise
         finally:
-            conn.close()
+            pool.putconn(conn)
+
+
+# The pools live as long as the process, so they are closed when it exits
+atexit.register(AzurePostgresHelper.close_pools)
@@ -28,6 +28,7 @@ from azure.search.documents.indexes.models import (
 from ..helpers.azure_computer_vision_client import AzureComputerVisionClient
 from .llm_helper import LLMHelper
 from .env_helper import EnvHelper
+from .search_index_cache import SearchIndexCache
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +89,9 @@ class AzureSearchHelper:
         return AzureSearchHelper._image_search_dimension
 
     def create_index(self):
+        if not self._index_not_exists(self.env_helper.AZURE_SEARCH_INDEX):
+            return
+
         fields = [
             SimpleField(
                 name=self.env_helper.AZURE_SEARCH_FIELDS_ID,
@@ -214,16 +218,23 @@ class AzureSearchHelper:
             ),
         )
 
-        if self._index_not_exists(self.env_helper.AZURE_SEARCH_INDEX):
-            logger.info(
-                f"Creating or updating index {self.env_helper.AZURE_SEARCH_INDEX}"
-            )
-            self.search_index_client.create_index(index)
+        logger.info(f"Creating or updating index {self.env_helper.AZURE_SEARCH_INDEX}")
+        self.search_index_client.create_index(index)
+        SearchIndexCache.set(
+            self.env_helper.AZURE_SEARCH_SERVICE,
+            self.env_helper.AZURE_SEARCH_INDEX,
+            True,
+            self.env_helper.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL,
+        )
 
     def _index_not_exists(self, index_name: str) -> bool:
-        return index_name not in [
-            name for name in self.search_index_client.list_index_names()
-        ]
+        return not SearchIndexCache.exists(
+            self.env_helper.AZURE_SEARCH_SERVICE,
+            index_name,
+            self.env_helper.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL,
+            lambda: index_name
+            in [name for name in self.search_index_client.list_index_names()],
+        )
 
     def get_conversation_logger(self):
         fields = [
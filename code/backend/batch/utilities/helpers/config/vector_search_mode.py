@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class VectorSearchMode(Enum):
+    ANN = "ann"
+    EXHAUSTIVE = "exhaustive"
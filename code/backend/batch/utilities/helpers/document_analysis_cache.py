@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from azure.storage.blob import BlobClient
+
+from .embedding_cache import (
+    AzureBlobEmbeddingCacheBackend,
+    EmbeddingCacheBackend,
+    EmbeddingCacheBackendType,
+    SqliteEmbeddingCacheBackend,
+)
+from .env_helper import EnvHelper
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentAnalysisCache:
+    """
+    Cache of the page maps returned by Document Intelligence, keyed by the analysis
+    model and the content MD5 (or ETag) of the source blob.
+
+    Re-chunking a document that has not changed skips the analysis entirely, and any
+    change to the blob changes its key, so stale entries are never read.
+
+    Loaders share one instance per process through get_instance, so the backend, and
+    with it the SQLite connection, is only opened once.
+    """
+
+    _instance: Optional["DocumentAnalysisCache"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, backend: Optional[EmbeddingCacheBackend], bypass: bool = False):
+        self.backend = backend
+        self.bypass = bypass
+
+    @staticmethod
+    def create(env_helper: EnvHelper) -> "DocumentAnalysisCache":
+        backend_type = EmbeddingCacheBackendType(
+            env_helper.DOCUMENT_ANALYSIS_CACHE_BACKEND
+        )
+        if backend_type == EmbeddingCacheBackendType.SQLITE:
+            backend = SqliteEmbeddingCacheBackend(
+                env_helper.DOCUMENT_ANALYSIS_CACHE_PATH,
+                env_helper.DOCUMENT_ANALYSIS_CACHE_MAX_ENTRIES,
+            )
+        elif backend_type == EmbeddingCacheBackendType.BLOB:
+            backend = AzureBlobEmbeddingCacheBackend(
+                env_helper.DOCUMENT_ANALYSIS_CACHE_CONTAINER_NAME
+            )
+        else:
+            backend = None
+        return DocumentAnalysisCache(backend, env_helper.DOCUMENT_ANALYSIS_CACHE_BYPASS)
+
+    @classmethod
+    def get_instance(cls, env_helper: EnvHelper) -> "DocumentAnalysisCache":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls.create(env_helper)
+            return cls._instance
+
+    @classmethod
+    def clear_instance(cls) -> None:
+        with cls._lock:
+            cls._instance = None
+
+    def get_blob_version(self, document_url: str) -> Optional[str]:
+        """
+        Returns the content MD5 of the blob, or its URL and ETag when the blob has no
+        MD5. Returns None when the document is not a readable blob.
+        """
+        try:
+            properties = BlobClient.from_blob_url(document_url).get_blob_properties()
+        except Exception:
+            logger.warning(
+                "Could not read the blob properties, the analysis will not be cached"
+            )
+            return None
+
+        content_md5 = properties.content_settings.content_md5
+        if content_md5:
+            return f"md5-{bytes(content_md5).hex()}"
+        blob_url = document_url.split("?", 1)[0]
+        etag_hash = hashlib.sha256(f"{blob_url}|{properties.etag}".encode("utf-8"))
+        return f"etag-{etag_hash.hexdigest()}"
+
+    def get_or_analyze(
+        self, document_url: str, model_id: str, analyze: Callable[[], List[dict]]
+    ) -> List[dict]:
+        if self.backend is None:
+            return analyze()
+
+        version = self.get_blob_version(document_url)
+        if version is None:
+            return analyze()
+        key = f"{model_id}/{version}"
+
+        if not self.bypass:
+            try:
+                entries = self.backend.get_many([key])
+            except Exception:
+                logger.exception("Failed to read from the document analysis cache")
+                entries = {}
+            if key in entries:
+                logger.info(f"Using cached {model_id} analysis for the document")
+                return json.loads(entries[key])
+
+        page_map = analyze()
+        try:
+            self.backend.set_many({key: json.dumps(page_map).encode("utf-8")})
+        except Exception:
+            logger.exception("Failed to write to the document analysis cache")
+        return page_map
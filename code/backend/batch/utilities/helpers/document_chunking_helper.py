@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterable, List
 
 from ..common.source_document import SourceDocument
 from ..document_chunking.chunking_strategy import ChunkingSettings, ChunkingStrategy
@@ -13,7 +13,7 @@ class DocumentChunking:
 
     def chunk(
         self, documents: List[SourceDocument], chunking: ChunkingSettings
-    ) -> List[SourceDocument]:
+    ) -> Iterable[SourceDocument]:
         chunker = get_document_chunker(chunking.chunking_strategy.value)
         if chunker is None:
             raise Exception(
@@ -1,7 +1,20 @@
 from abc import ABC, abstractmethod
+from typing import List
+
+from ...common.source_document import SourceDocument
 
 
 class EmbedderBase(ABC):
     @abstractmethod
     def embed_file(self, source_url: str, file_name: str = None):
         pass
+
+    @abstractmethod
+    def embed_documents(
+        self, source_url: str, file_name: str, documents: List[SourceDocument]
+    ):
+        """
+        Embeds documents that have already been loaded from source_url, chunking them
+        with the settings of the file_name's document type.
+        """
+        pass
@@ -1,3 +1,4 @@
+from typing import Optional
 from ..env_helper import EnvHelper
 from ..config.database_type import DatabaseType
 from ..azure_blob_storage_client import AzureBlobStorageClient
@@ -10,11 +11,13 @@ from .integrated_vectorization_embedder import (
 
 class EmbedderFactory:
     @staticmethod
-    def create(env_helper: EnvHelper):
+    def create(
+        env_helper: EnvHelper, blob_client: Optional[AzureBlobStorageClient] = None
+    ):
         if env_helper.DATABASE_TYPE == DatabaseType.POSTGRESQL.value:
-            return PostgresEmbedder(AzureBlobStorageClient(), env_helper)
+            return PostgresEmbedder(blob_client or AzureBlobStorageClient(), env_helper)
         else:
             if env_helper.AZURE_SEARCH_USE_INTEGRATED_VECTORIZATION:
-                return IntegratedVectorizationEmbedder(env_helper)
+                return IntegratedVectorizationEmbedder(env_helper, blob_client)
             else:
-                return PushEmbedder(AzureBlobStorageClient(), env_helper)
+                return PushEmbedder(blob_client or AzureBlobStorageClient(), env_helper)
@@ -1,20 +1,34 @@
+from typing import List, Optional
+from azure.core.exceptions import ResourceNotFoundError
 from .embedder_base import EmbedderBase
+from ..azure_blob_storage_client import AzureBlobStorageClient
 from ..env_helper import EnvHelper
 from ..llm_helper import LLMHelper
 from ...integrated_vectorization.azure_search_index import AzureSearchIndex
 from ...integrated_vectorization.azure_search_indexer import AzureSearchIndexer
 from ...integrated_vectorization.azure_search_datasource import AzureSearchDatasource
 from ...integrated_vectorization.azure_search_skillset import AzureSearchSkillset
+from ...integrated_vectorization.provisioning_fingerprints import (
+    RESET_ON_CHANGE,
+    ProvisioningFingerprints,
+    fingerprint,
+)
 from ..config.config_helper import ConfigHelper
+from ...common.source_document import SourceDocument
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class IntegratedVectorizationEmbedder(EmbedderBase):
-    def __init__(self, env_helper: EnvHelper):
+    def __init__(
+        self,
+        env_helper: EnvHelper,
+        blob_client: Optional[AzureBlobStorageClient] = None,
+    ):
         self.env_helper = env_helper
         self.llm_helper: LLMHelper = LLMHelper()
+        self.blob_client = blob_client
         logger.info("Initialized IntegratedVectorizationEmbedder.")
 
     def embed_file(self, source_url: str, file_name: str = None):
@@ -23,37 +37,123 @@ class IntegratedVectorizationEmbedder(EmbedderBase):
         )
         self.process_using_integrated_vectorization(source_url=source_url)
 
-    def process_using_integrated_vectorization(self, source_url: str):
+    def embed_documents(
+        self, source_url: str, file_name: str, documents: List[SourceDocument]
+    ):
+        """
+        Uploads the text of documents already loaded from source_url to the documents
+        container, then runs the indexer, which chunks and embeds it like any other
+        blob. Callers adding many documents at once should upload them all and run the
+        indexer once instead.
+        """
+        logger.info(f"Uploading {len(documents)} loaded documents from: {source_url}")
+        if self.blob_client is None:
+            self.blob_client = AzureBlobStorageClient()
+        content = "\n\n".join(document.content for document in documents)
+        self.blob_client.upload_file(
+            content.encode("utf-8"),
+            source_url,
+            content_type="text/plain; charset=utf-8",
+            metadata={"title": source_url},
+        )
+        self.process_using_integrated_vectorization(source_url=source_url)
+
+    def process_using_integrated_vectorization(
+        self, source_url: str, force_provisioning: bool = False
+    ):
+        """
+        Provisions the datasource, index, skillset and indexer, only updating those
+        whose definition changed since they were last provisioned, then runs the
+        indexer. The indexer only picks up new and changed documents, unless a change
+        to the index, skillset or indexer requires every document to be indexed again.
+
+        If force_provisioning is True, or the indexer turns out not to exist, every
+        resource is provisioned whatever the stored fingerprints say, as they may have
+        been deleted or edited outside of this code.
+        """
         logger.info(f"Starting integrated vectorization for source_url: {source_url}.")
         config = ConfigHelper.get_active_config_or_default()
         try:
             search_datasource = AzureSearchDatasource(self.env_helper)
-            search_datasource.create_or_update_datasource()
             search_index = AzureSearchIndex(self.env_helper, self.llm_helper)
-            search_index.create_or_update_index()
             search_skillset = AzureSearchSkillset(
                 self.env_helper, config.integrated_vectorization_config
             )
-            search_skillset_result = search_skillset.create_skillset()
             search_indexer = AzureSearchIndexer(self.env_helper)
-            indexer_result = search_indexer.create_or_update_indexer(
-                self.env_helper.AZURE_SEARCH_INDEXER_NAME,
-                skillset_name=search_skillset_result.name,
+            indexer_name = self.env_helper.AZURE_SEARCH_INDEXER_NAME
+            skillset = search_skillset.get_skillset()
+            definitions = {
+                "datasource": search_datasource.get_datasource(),
+                "index": search_index.get_index(),
+                "skillset": skillset,
+                "indexer": search_indexer.get_indexer(
+                    indexer_name, skillset_name=skillset.name
+                ),
+            }
+            desired = {
+                name: fingerprint(definition)
+                for name, definition in definitions.items()
+            }
+            changed = ProvisioningFingerprints.get_changed(
+                desired, force=force_provisioning
             )
+
+            indexer_result = None
+            if "datasource" in changed:
+                search_datasource.create_or_update_datasource(definitions["datasource"])
+            if "index" in changed:
+                search_index.create_or_update_index(definitions["index"])
+            if "skillset" in changed:
+                search_skillset.create_skillset(definitions["skillset"])
+            if "indexer" in changed:
+                indexer_result = search_indexer.create_or_update_indexer(
+                    indexer_name,
+                    skillset_name=skillset.name,
+                    indexer=definitions["indexer"],
+                    run=False,
+                )
+            if changed:
+                logger.info(f"Provisioned changed resources: {sorted(changed)}.")
+                ProvisioningFingerprints.set_provisioned(
+                    {name: desired[name] for name in changed}
+                )
+
+            # Resources provisioned for the first time have no documents to redo
+            reset = any(changed.get(name) is not None for name in RESET_ON_CHANGE)
+            try:
+                search_indexer.run_indexer(indexer_name, reset=reset)
+            except ResourceNotFoundError:
+                if force_provisioning:
+                    raise
+                logger.warning(
+                    f"Indexer {indexer_name} not found, provisioning every resource again."
+                )
+                ProvisioningFingerprints.clear()
+                return self.process_using_integrated_vectorization(
+                    source_url, force_provisioning=True
+                )
             logger.info("Integrated vectorization process completed successfully.")
             return indexer_result
         except Exception as e:
             logger.error(f"Error processing {source_url}: {e}")
             raise e
 
-    def reprocess_all(self):
+    def reprocess_all(self, reset: bool = True):
+        """
+        Runs the indexer over every document if reset is True, otherwise only over the
+        new and changed ones, provisioning everything if the indexer does not exist.
+        """
         logger.info("Starting reprocess_all operation.")
         search_indexer = AzureSearchIndexer(self.env_helper)
         if search_indexer.indexer_exists(self.env_helper.AZURE_SEARCH_INDEXER_NAME):
             logger.info(
                 f"Running indexer: {self.env_helper.AZURE_SEARCH_INDEXER_NAME}."
             )
-            search_indexer.run_indexer(self.env_helper.AZURE_SEARCH_INDEXER_NAME)
+            search_indexer.run_indexer(
+                self.env_helper.AZURE_SEARCH_INDEXER_NAME, reset=reset
+            )
         else:
             logger.info("Indexer does not exist. Starting full processing.")
-            self.process_using_integrated_vectorization(source_url="all")
+            self.process_using_integrated_vectorization(
+                source_url="all", force_provisioning=True
+            )
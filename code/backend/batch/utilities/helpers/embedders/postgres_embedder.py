@@ -1,6 +1,6 @@
 import json
 import logging
-from typing import List
+from typing import List, Optional
 
 from ...helpers.llm_helper import LLMHelper
 from ...helpers.env_helper import EnvHelper
@@ -37,18 +37,38 @@ class PostgresEmbedder(EmbedderBase):
         logger.info(f"Embedding file: {file_name} from source: {source_url}")
         file_extension = file_name.split(".")[-1].lower()
         embedding_config = self.embedding_configs.get(file_extension)
+        # Read before loading, so a blob overwritten meanwhile is not marked indexed
+        properties = (
+            self.blob_client.get_blob_properties(file_name)
+            if file_extension != "url"
+            else None
+        )
         self.__embed(
             source_url=source_url,
             file_extension=file_extension,
             embedding_config=embedding_config,
         )
-        if file_extension != "url":
-            self.blob_client.upsert_blob_metadata(
-                file_name, {"embeddings_added": "true"}
-            )
+        if properties is not None:
+            self.blob_client.mark_embeddings_added(file_name, properties)
+
+    def embed_documents(
+        self, source_url: str, file_name: str, documents: List[SourceDocument]
+    ):
+        logger.info(f"Embedding {len(documents)} loaded documents from: {source_url}")
+        file_extension = file_name.split(".")[-1].lower()
+        self.__embed(
+            source_url=source_url,
+            file_extension=file_extension,
+            embedding_config=self.embedding_configs.get(file_extension),
+            documents=documents,
+        )
 
     def __embed(
-        self, source_url: str, file_extension: str, embedding_config: EmbeddingConfig
+        self,
+        source_url: str,
+        file_extension: str,
+        embedding_config: EmbeddingConfig,
+        documents: Optional[List[SourceDocument]] = None,
     ):
         logger.info(f"Starting embedding process for source: {source_url}")
         documents_to_upload: List[SourceDocument] = []
@@ -64,17 +84,23 @@ class PostgresEmbedder(EmbedderBase):
                 "Advanced image processing is not supported in PostgresEmbedder."
             )
         else:
-            logger.info(f"Loading documents from source: {source_url}")
-            documents: List[SourceDocument] = self.document_loading.load(
-                source_url, embedding_config.loading
-            )
-            documents = self.document_chunking.chunk(
-                documents, embedding_config.chunking
+            if documents is None:
+                logger.info(f"Loading documents from source: {source_url}")
+                documents = self.document_loading.load(
+                    source_url, embedding_config.loading
+                )
+            documents = list(
+                self.document_chunking.chunk(documents, embedding_config.chunking)
             )
             logger.info("Chunked into document chunks.")
 
-            for document in documents:
-                documents_to_upload.append(self.__convert_to_search_document(document))
+            embeddings = self.llm_helper.embed_batch(
+                [document.content for document in documents]
+            )
+            for document, embedding in zip(documents, embeddings):
+                documents_to_upload.append(
+                    self.__convert_to_search_document(document, embedding)
+                )
 
         if documents_to_upload:
             logger.info(
@@ -83,10 +109,15 @@ class PostgresEmbedder(EmbedderBase):
             self.azure_postgres_helper.create_vector_store(documents_to_upload)
         else:
             logger.warning("No documents to upload.")
+            # Remove the rows left over from a previous version of the document
+            self.azure_postgres_helper.delete_documents_by_source(
+                SourceDocument.source_from_url(source_url)
+            )
 
-    def __convert_to_search_document(self, document: SourceDocument):
-        logger.info(f"Generating embeddings for document ID: {document.id}")
-        embedded_content = self.llm_helper.generate_embeddings(document.content)
+    def __convert_to_search_document(
+        self, document: SourceDocument, embedded_content: List[float]
+    ):
+        logger.info(f"Converting document ID {document.id} to vector store format")
         metadata = {
             "id": document.id,
             "source": document.source,
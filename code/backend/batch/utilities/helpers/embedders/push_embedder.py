@@ -1,12 +1,17 @@
 import hashlib
 import json
 import logging
-from typing import List
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urlparse
-import urllib.request
+from azure.search.documents import SearchClient
 from ...helpers.llm_helper import LLMHelper
 from ...helpers.env_helper import EnvHelper
 from ..azure_computer_vision_client import AzureComputerVisionClient
+from ..image_analysis_cache import ImageAnalysisCache
+from ..image_preprocessor import ImagePreprocessor
 
 from ..azure_blob_storage_client import AzureBlobStorageClient
 
@@ -18,11 +23,20 @@ from ..azure_search_helper import AzureSearchHelper
 from ..document_loading_helper import DocumentLoading
 from ..document_chunking_helper import DocumentChunking
 from ...common.source_document import SourceDocument
-import base64
-from mimetypes import guess_type
 
 logger = logging.getLogger(__name__)
 
+CAPTION_SYSTEM_MESSAGE = """You are an assistant that generates rich descriptions of images.
+You need to be accurate in the information you extract and detailed in the descriptons you generate.
+Do not abbreviate anything and do not shorten sentances. Explain the image completely.
+If you are provided with an image of a flow chart, describe the flow chart in detail.
+If the image is mostly text, use OCR to extract the text as it is displayed in the image."""
+CAPTION_USER_MESSAGE = "Describe this image in detail. Limit the response to 500 words."
+# Part of the key of cached captions, so that changing the prompt captions images again
+CAPTION_PROMPT_VERSION = hashlib.sha256(
+    (CAPTION_SYSTEM_MESSAGE + CAPTION_USER_MESSAGE).encode("utf-8")
+).hexdigest()[:16]
+
 
 class PushEmbedder(EmbedderBase):
     def __init__(self, blob_client: AzureBlobStorageClient, env_helper: EnvHelper):
@@ -31,6 +45,14 @@ class PushEmbedder(EmbedderBase):
         self.llm_helper = LLMHelper()
         self.azure_search_helper = AzureSearchHelper()
         self.azure_computer_vision_client = AzureComputerVisionClient(env_helper)
+        self.image_preprocessor = ImagePreprocessor.create(env_helper)
+        self.image_analysis_cache = ImageAnalysisCache.create(env_helper)
+        # Shared by every image this embedder processes, which bounds the remote
+        # image calls made at once when many images are ingested together
+        self.image_executor = ThreadPoolExecutor(
+            max_workers=max(env_helper.ADVANCED_IMAGE_PROCESSING_CONCURRENCY, 1),
+            thread_name_prefix="image",
+        )
         self.document_loading = DocumentLoading()
         self.document_chunking = DocumentChunking()
         self.blob_client = blob_client
@@ -46,103 +68,304 @@ class PushEmbedder(EmbedderBase):
         logger.info(f"Embedding file: {file_name} from URL: {source_url}")
         file_extension = file_name.split(".")[-1].lower()
         embedding_config = self.embedding_configs.get(file_extension)
+        # Read before loading, so a blob overwritten meanwhile is not marked indexed
+        properties = (
+            self.blob_client.get_blob_properties(file_name)
+            if file_extension != "url"
+            else None
+        )
         self.__embed(
             source_url=source_url,
             file_extension=file_extension,
             embedding_config=embedding_config,
         )
-        if file_extension != "url":
+        if properties is not None:
             logger.info(f"Upserting blob metadata for file: {file_name}")
-            self.blob_client.upsert_blob_metadata(
-                file_name, {"embeddings_added": "true"}
-            )
+            self.blob_client.mark_embeddings_added(file_name, properties)
+
+    def embed_documents(
+        self, source_url: str, file_name: str, documents: List[SourceDocument]
+    ):
+        logger.info(f"Embedding {len(documents)} loaded documents from: {source_url}")
+        file_extension = file_name.split(".")[-1].lower()
+        self.__embed(
+            source_url=source_url,
+            file_extension=file_extension,
+            embedding_config=self.embedding_configs.get(file_extension),
+            documents=documents,
+        )
 
     def __embed(
-        self, source_url: str, file_extension: str, embedding_config: EmbeddingConfig
+        self,
+        source_url: str,
+        file_extension: str,
+        embedding_config: EmbeddingConfig,
+        documents: Optional[List[SourceDocument]] = None,
     ):
         logger.info(f"Processing embedding for file extension: {file_extension}")
-        documents_to_upload: List[SourceDocument] = []
+        stale_document_ids: List[str] = []
+        search_client = self.azure_search_helper.get_search_client()
         if (
             embedding_config.use_advanced_image_processing
             and file_extension
             in self.config.get_advanced_image_processing_image_types()
         ):
             logger.info(f"Using advanced image processing for: {source_url}")
-            caption = self.__generate_image_caption(source_url)
-            caption_vector = self.llm_helper.generate_embeddings(caption)
-
-            image_vector = self.azure_computer_vision_client.vectorize_image(source_url)
-            documents_to_upload.append(
-                self.__create_image_document(
-                    source_url, image_vector, caption, caption_vector
-                )
+            uploaded = self.__upload_documents(
+                search_client, [self.__process_image(source_url)]
             )
         else:
-            logger.info(f"Loading documents from source: {source_url}")
-            documents: List[SourceDocument] = self.document_loading.load(
-                source_url, embedding_config.loading
-            )
+            timings = {}
+            start_time = time.perf_counter()
+            if documents is None:
+                logger.info(f"Loading documents from source: {source_url}")
+                documents = self.document_loading.load(
+                    source_url, embedding_config.loading
+                )
+            timings["load"] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
             documents = self.document_chunking.chunk(
                 documents, embedding_config.chunking
             )
+            incremental = self.env_helper.AZURE_SEARCH_INCREMENTAL_INDEXING
+            if incremental:
+                indexed_hashes = self.__get_indexed_hashes(
+                    search_client, SourceDocument.source_from_url(source_url)
+                )
+                document_ids = set()
+                documents = self.__filter_changed_documents(
+                    documents, indexed_hashes, document_ids
+                )
+            timings["chunk"] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            uploaded = self.__embed_and_upload(search_client, documents, timings)
+            timings["embed_and_upload"] = time.perf_counter() - start_time
+            if incremental:
+                stale_document_ids = [
+                    document_id
+                    for document_id in indexed_hashes
+                    if document_id not in document_ids
+                ]
+                logger.info(
+                    f"{uploaded} of {len(document_ids)} chunks changed, {len(stale_document_ids)} stale chunks"
+                )
+            logger.info(
+                f"Embedding pipeline timings (seconds) for {source_url}: {timings}"
+            )
 
-            for document in documents:
-                documents_to_upload.append(self.__convert_to_search_document(document))
+        if not uploaded:
+            logger.warning("No documents to upload.")
 
-        # Upload documents (which are chunks) to search index in batches
-        if documents_to_upload:
-            logger.info("Uploading documents in batches")
+        # Remove chunks left over from a previous, longer version of the document
+        if stale_document_ids:
+            logger.info(f"Deleting {len(stale_document_ids)} stale documents")
             batch_size = self.env_helper.AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE
-            search_client = self.azure_search_helper.get_search_client()
-            for i in range(0, len(documents_to_upload), batch_size):
-                batch = documents_to_upload[i : i + batch_size]
-                response = search_client.upload_documents(batch)
+            for i in range(0, len(stale_document_ids), batch_size):
+                batch = [
+                    {self.env_helper.AZURE_SEARCH_FIELDS_ID: document_id}
+                    for document_id in stale_document_ids[i : i + batch_size]
+                ]
+                response = search_client.delete_documents(batch)
                 if not all(r.succeeded for r in response if response):
-                    logger.error("Failed to upload documents to search index")
-                    raise RuntimeError(f"Upload failed for some documents: {response}")
-        else:
-            logger.warning("No documents to upload.")
+                    logger.error("Failed to delete documents from search index")
+                    raise RuntimeError(f"Delete failed for some documents: {response}")
 
-    def __local_image_to_data_url(self, image_path):
-        """Convert a local image file or URL to a data URL."""
-        mime_type, _ = guess_type(image_path)
-        if mime_type is None:
-            mime_type = 'application/octet-stream'
-
-        # Check if the image_path is a URL or a local file path
-        parsed_url = urlparse(image_path)
-        if parsed_url.scheme in ('http', 'https'):
-            # Download the image from the URL
-            logger.info(f"Downloading image from URL: {image_path}")
-            with urllib.request.urlopen(image_path) as response:
-                image_data = response.read()
-            base64_encoded_data = base64.b64encode(image_data).decode('utf-8')
-        else:
-            # Read from local file
-            with open(image_path, "rb") as image_file:
-                base64_encoded_data = base64.b64encode(image_file.read()).decode('utf-8')
+    def __embed_and_upload(
+        self,
+        search_client: SearchClient,
+        documents: Iterable[SourceDocument],
+        timings: dict,
+    ) -> int:
+        """
+        Embeds chunks on a pool of workers and uploads them while embedding continues.
 
-        return f"data:{mime_type};base64,{base64_encoded_data}"
+        At most EMBEDDING_PIPELINE_QUEUE_DEPTH embedding batches are in flight at once,
+        so chunks are only pulled from the chunker as fast as they can be embedded.
+        Returns the number of uploaded documents.
+        """
+        embedding_batch_size = self.env_helper.AZURE_OPENAI_EMBEDDING_BATCH_SIZE
+        upload_batch_size = self.env_helper.AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE
+        queue_depth = max(self.env_helper.EMBEDDING_PIPELINE_QUEUE_DEPTH, 1)
+        timings.setdefault("embed", 0.0)
+        timings.setdefault("upload", 0.0)
 
-    def __generate_image_caption(self, source_url):
-        logger.info(f"Generating image caption for URL: {source_url}")
+        uploaded = 0
+        pending = set()
+        documents_to_upload = []
+        chunks = iter(documents)
+        with ThreadPoolExecutor(
+            max_workers=max(self.env_helper.EMBEDDING_PIPELINE_CONCURRENCY, 1)
+        ) as executor:
+            try:
+                while True:
+                    batch = list(islice(chunks, embedding_batch_size))
+                    if batch:
+                        pending.add(executor.submit(self.__embed_documents, batch))
+                    if batch and len(pending) < queue_depth:
+                        continue
+
+                    if pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            search_documents, elapsed = future.result()
+                            documents_to_upload.extend(search_documents)
+                            timings["embed"] += elapsed
+
+                    # Only upload full batches until every chunk has been embedded
+                    final = not batch and not pending
+                    while documents_to_upload and (
+                        final or len(documents_to_upload) >= upload_batch_size
+                    ):
+                        start_time = time.perf_counter()
+                        uploaded += self.__upload_documents(
+                            search_client, documents_to_upload[:upload_batch_size]
+                        )
+                        documents_to_upload = documents_to_upload[upload_batch_size:]
+                        timings["upload"] += time.perf_counter() - start_time
+                    if final:
+                        break
+            except Exception:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        return uploaded
+
+    def __embed_documents(
+        self, documents: List[SourceDocument]
+    ) -> Tuple[List[dict], float]:
+        start_time = time.perf_counter()
+        embeddings = self.llm_helper.embed_batch(
+            [document.content for document in documents]
+        )
+        search_documents = [
+            self.__convert_to_search_document(document, embedding)
+            for document, embedding in zip(documents, embeddings)
+        ]
+        return search_documents, time.perf_counter() - start_time
+
+    def __upload_documents(self, search_client: SearchClient, documents: List[dict]):
+        # Upload documents (which are chunks) to search index in batches
+        batch_size = self.env_helper.AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i : i + batch_size]
+            response = search_client.upload_documents(batch)
+            if not all(r.succeeded for r in response if response):
+                logger.error("Failed to upload documents to search index")
+                raise RuntimeError(f"Upload failed for some documents: {response}")
+        return len(documents)
+
+    def __get_indexed_hashes(
+        self, search_client: SearchClient, source: str
+    ) -> Dict[str, str]:
+        """
+        Returns the hash of every chunk already indexed for a source, by chunk ID.
+
+        Search documents are compared on every field but the vector; the embedding
+        deployment is part of the metadata, so changing it embeds every chunk again.
+        """
+        fields = self.__get_compared_fields()
+        source = source.replace("'", "''")
+        results = search_client.search(
+            "*",
+            filter=f"{self.env_helper.AZURE_SEARCH_SOURCE_COLUMN} eq '{source}'",
+            select=fields,
+        )
+        return {
+            result[self.env_helper.AZURE_SEARCH_FIELDS_ID]: self.__hash_search_document(
+                result, fields
+            )
+            for result in results
+        }
+
+    def __filter_changed_documents(
+        self,
+        documents: Iterable[SourceDocument],
+        indexed_hashes: Dict[str, str],
+        document_ids: Set[str],
+    ) -> Iterator[SourceDocument]:
+        """
+        Yields the chunks that are new or whose search document changed, as they are
+        chunked, and adds the ID of every chunk to `document_ids`.
+        """
+        fields = self.__get_compared_fields()
+        for document in documents:
+            document_ids.add(document.id)
+            if indexed_hashes.get(document.id) != self.__hash_search_document(
+                self.__convert_to_search_document(document, None), fields
+            ):
+                yield document
+
+    def __get_compared_fields(self) -> List[str]:
+        return [
+            self.env_helper.AZURE_SEARCH_FIELDS_ID,
+            self.env_helper.AZURE_SEARCH_CONTENT_COLUMN,
+            self.env_helper.AZURE_SEARCH_FIELDS_METADATA,
+            self.env_helper.AZURE_SEARCH_TITLE_COLUMN,
+            self.env_helper.AZURE_SEARCH_SOURCE_COLUMN,
+            self.env_helper.AZURE_SEARCH_CHUNK_COLUMN,
+            self.env_helper.AZURE_SEARCH_OFFSET_COLUMN,
+        ]
+
+    def __hash_search_document(self, search_document: dict, fields: List[str]) -> str:
+        values = [search_document.get(field) for field in fields]
+        return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()
+
+    def __process_image(self, source_url: str) -> dict:
+        """
+        Fetches the image once and downscales it, then captions it and embeds the
+        caption while the image itself is vectorized. Captions, image vectors and
+        caption embeddings are cached by image content, so duplicate images are not
+        analyzed again.
+        """
+        timings = {}
+        start_time = time.perf_counter()
+        image, mime_type = self.image_preprocessor.prepare(
+            source_url, self.image_preprocessor.fetch(source_url)
+        )
+        timings["fetch"] = time.perf_counter() - start_time
+        image_hash = ImageAnalysisCache.hash_image(image)
+
+        def caption_and_embed() -> Tuple[str, List[float]]:
+            caption = self.image_analysis_cache.get_or_caption(
+                image_hash,
+                f"{self.env_helper.AZURE_OPENAI_VISION_MODEL}-{CAPTION_PROMPT_VERSION}",
+                lambda: self.__generate_image_caption(
+                    ImagePreprocessor.to_data_url(image, mime_type)
+                ),
+            )
+            return caption, self.llm_helper.embed_batch([caption])[0]
+
+        def vectorize() -> List[float]:
+            return self.image_analysis_cache.get_or_vectorize(
+                image_hash,
+                self.azure_computer_vision_client.model_version,
+                lambda: self.azure_computer_vision_client.vectorize_image_bytes(image),
+            )
+
+        start_time = time.perf_counter()
+        caption_future = self.image_executor.submit(caption_and_embed)
+        image_vector_future = self.image_executor.submit(vectorize)
+        caption, caption_vector = caption_future.result()
+        image_vector = image_vector_future.result()
+        timings["caption_and_vectorize"] = time.perf_counter() - start_time
+        logger.info(f"Image pipeline timings (seconds) for {source_url}: {timings}")
+        logger.info(f"Image analysis cache stats: {self.image_analysis_cache.stats()}")
+        return self.__create_image_document(
+            source_url, image_vector, caption, caption_vector
+        )
+
+    def __generate_image_caption(self, image_url: str):
+        logger.info("Generating image caption")
         model = self.env_helper.AZURE_OPENAI_VISION_MODEL
-        caption_system_message = """You are an assistant that generates rich descriptions of images.
-You need to be accurate in the information you extract and detailed in the descriptons you generate.
-Do not abbreviate anything and do not shorten sentances. Explain the image completely.
-If you are provided with an image of a flow chart, describe the flow chart in detail.
-If the image is mostly text, use OCR to extract the text as it is displayed in the image."""
 
         messages = [
-            {"role": "system", "content": caption_system_message},
+            {"role": "system", "content": CAPTION_SYSTEM_MESSAGE},
             {
                 "role": "user",
                 "content": [
-                    {
-                        "text": "Describe this image in detail. Limit the response to 500 words.",
-                        "type": "text",
-                    },
-                    {"image_url": {"url": self.__local_image_to_data_url(source_url)}, "type": "image_url"},
+                    {"text": CAPTION_USER_MESSAGE, "type": "text"},
+                    {"image_url": {"url": image_url}, "type": "image_url"},
                 ],
             },
         ]
@@ -152,9 +375,10 @@ If the image is mostly text, use OCR to extract the text as it is displayed in t
         logger.info("Caption generation completed")
         return caption
 
-    def __convert_to_search_document(self, document: SourceDocument):
+    def __convert_to_search_document(
+        self, document: SourceDocument, embedded_content: Optional[List[float]]
+    ):
         logger.info(f"Converting document ID {document.id} to search document format")
-        embedded_content = self.llm_helper.generate_embeddings(document.content)
         metadata = {
             self.env_helper.AZURE_SEARCH_FIELDS_ID: document.id,
             self.env_helper.AZURE_SEARCH_SOURCE_COLUMN: document.source,
@@ -163,6 +387,7 @@ If the image is mostly text, use OCR to extract the text as it is displayed in t
             self.env_helper.AZURE_SEARCH_OFFSET_COLUMN: document.offset,
             "page_number": document.page_number,
             "chunk_id": document.chunk_id,
+            "embedding_model": self.env_helper.AZURE_OPENAI_EMBEDDING_MODEL,
         }
         return {
             self.env_helper.AZURE_SEARCH_FIELDS_ID: document.id,
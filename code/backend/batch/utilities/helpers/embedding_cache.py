@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from array import array
+from enum import Enum
+from typing import Dict, List, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from .azure_blob_storage_client import AzureBlobStorageClient
+from .env_helper import EnvHelper
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCacheBackendType(Enum):
+    SQLITE = "sqlite"
+    BLOB = "blob"
+    NONE = "none"
+
+
+class EmbeddingCacheBackend(ABC):
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        pass
+
+    @abstractmethod
+    def set_many(self, entries: Dict[str, bytes]) -> None:
+        pass
+
+
+class SqliteEmbeddingCacheBackend(EmbeddingCacheBackend):
+    """
+    Stores cache entries in a local SQLite database.
+
+    Entries are evicted least recently used first once the database holds more than
+    max_entries rows.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_last_used ON cache (last_used)"
+            )
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        entries: Dict[str, bytes] = {}
+        with self._lock, self._connection:
+            # Stay well below SQLite's limit on the number of bound parameters
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                entries.update(rows)
+                self._connection.execute(
+                    f"UPDATE cache SET last_used = ? WHERE key IN ({placeholders})",
+                    [time.time(), *batch],
+                )
+        return entries
+
+    def set_many(self, entries: Dict[str, bytes]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, last_used) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in entries.items()],
+            )
+            self._connection.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+
+class AzureBlobEmbeddingCacheBackend(EmbeddingCacheBackend):
+    """
+    Stores each cache entry as a blob so the cache can be shared by all workers.
+
+    Eviction is left to a lifecycle management policy on the cache container.
+    """
+
+    def __init__(self, container_name: str):
+        self.blob_client = AzureBlobStorageClient(container_name=container_name)
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        entries: Dict[str, bytes] = {}
+        for key in keys:
+            try:
+                entries[key] = self.blob_client.download_file(key)
+            except ResourceNotFoundError:
+                continue
+        return entries
+
+    def set_many(self, entries: Dict[str, bytes]) -> None:
+        for key, value in entries.items():
+            self.blob_client.upload_file(
+                value, key, content_type="application/octet-stream"
+            )
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of embeddings, keyed by embedding deployment and the hash
+    of the normalized input text.
+    """
+
+    def __init__(self, backend: EmbeddingCacheBackend, deployment: str):
+        self.backend = backend
+        self.deployment = deployment
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create_backend(env_helper: EnvHelper) -> Optional[EmbeddingCacheBackend]:
+        backend_type = EmbeddingCacheBackendType(env_helper.EMBEDDING_CACHE_BACKEND)
+        if backend_type == EmbeddingCacheBackendType.SQLITE:
+            return SqliteEmbeddingCacheBackend(
+                env_helper.EMBEDDING_CACHE_PATH, env_helper.EMBEDDING_CACHE_MAX_ENTRIES
+            )
+        elif backend_type == EmbeddingCacheBackendType.BLOB:
+            return AzureBlobEmbeddingCacheBackend(
+                env_helper.EMBEDDING_CACHE_CONTAINER_NAME
+            )
+        return None
+
+    @staticmethod
+    def create(env_helper: EnvHelper) -> Optional["EmbeddingCache"]:
+        backend = EmbeddingCache.create_backend(env_helper)
+        if backend is None:
+            return None
+        return EmbeddingCache(backend, env_helper.AZURE_OPENAI_EMBEDDING_MODEL)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+    def key(self, text: str) -> str:
+        text_hash = hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"{self.deployment}/{text_hash}"
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [self.key(text) for text in texts]
+        try:
+            entries = self.backend.get_many(list(set(keys)))
+        except Exception:
+            logger.exception("Failed to read from the embedding cache")
+            entries = {}
+
+        embeddings: List[Optional[List[float]]] = []
+        for key in keys:
+            if key in entries:
+                embeddings.append(array("f", entries[key]).tolist())
+            else:
+                embeddings.append(None)
+        hits = sum(1 for embedding in embeddings if embedding is not None)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(embeddings) - hits
+        return embeddings
+
+    def set_many(self, texts: List[str], embeddings: List[List[float]]) -> None:
+        entries = {
+            self.key(text): array("f", embedding).tobytes()
+            for text, embedding in zip(texts, embeddings)
+        }
+        try:
+            self.backend.set_many(entries)
+        except Exception:
+            logger.exception("Failed to write to the embedding cache")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
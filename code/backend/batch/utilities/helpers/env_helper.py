@@ -1,6 +1,7 @@
 import json
 import os
 import logging
+import tempfile
 import threading
 from dotenv import load_dotenv
 from azure.identity import get_bearer_token_provider
@@ -10,6 +11,7 @@ from azure.keyvault.secrets import SecretClient
 from ..orchestrator.orchestration_strategy import OrchestrationStrategy
 from ..helpers.config.conversation_flow import ConversationFlow
 from ..helpers.config.database_type import DatabaseType
+from ..helpers.config.vector_search_mode import VectorSearchMode
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +70,25 @@ class EnvHelper:
             "AZURE_SEARCH_CONTENT_VECTOR_COLUMN", "content_vector"
         )
         self.AZURE_SEARCH_DIMENSIONS = os.getenv("AZURE_SEARCH_DIMENSIONS", "1536")
+        # Vector retrieval: "ann" searches the HNSW graph, "exhaustive" scores every
+        # vector. The HNSW parameters apply when the integrated vectorization index
+        # is created, as m and efConstruction cannot change on an existing index
+        self.AZURE_SEARCH_VECTOR_SEARCH_MODE = VectorSearchMode(
+            os.getenv(
+                "AZURE_SEARCH_VECTOR_SEARCH_MODE", VectorSearchMode.ANN.value
+            ).lower()
+        )
+        self.AZURE_SEARCH_HNSW_M = self.get_env_var_int("AZURE_SEARCH_HNSW_M", 4)
+        self.AZURE_SEARCH_HNSW_EF_CONSTRUCTION = self.get_env_var_int(
+            "AZURE_SEARCH_HNSW_EF_CONSTRUCTION", 400
+        )
+        self.AZURE_SEARCH_HNSW_EF_SEARCH = self.get_env_var_int(
+            "AZURE_SEARCH_HNSW_EF_SEARCH", 500
+        )
+        # Seconds the existence of the search index is cached for
+        self.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL = self.get_env_var_float(
+            "AZURE_SEARCH_INDEX_METADATA_CACHE_TTL", 300.0
+        )
         self.AZURE_SEARCH_FILENAME_COLUMN = os.getenv(
             "AZURE_SEARCH_FILENAME_COLUMN", "filepath"
         )
@@ -94,6 +115,26 @@ class EnvHelper:
         self.AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE = os.getenv(
             "AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE", 100
         )
+        self.AZURE_SEARCH_INCREMENTAL_INDEXING = self.get_env_var_bool(
+            "AZURE_SEARCH_INCREMENTAL_INDEXING", "True"
+        )
+        # Number of embedding workers and embedding batches in flight during ingestion
+        self.EMBEDDING_PIPELINE_CONCURRENCY = self.get_env_var_int(
+            "EMBEDDING_PIPELINE_CONCURRENCY", 4
+        )
+        self.EMBEDDING_PIPELINE_QUEUE_DEPTH = self.get_env_var_int(
+            "EMBEDDING_PIPELINE_QUEUE_DEPTH", 8
+        )
+        # Concurrent fetching of the URLs of a bulk AddURLEmbeddings request
+        self.URL_INGESTION_MAX_CONCURRENCY = self.get_env_var_int(
+            "URL_INGESTION_MAX_CONCURRENCY", 16
+        )
+        self.URL_INGESTION_MAX_CONCURRENCY_PER_HOST = self.get_env_var_int(
+            "URL_INGESTION_MAX_CONCURRENCY_PER_HOST", 4
+        )
+        self.URL_INGESTION_TIMEOUT = self.get_env_var_float(
+            "URL_INGESTION_TIMEOUT", 30.0
+        )
         # Integrated Vectorization
         self.AZURE_SEARCH_DATASOURCE_NAME = os.getenv(
             "AZURE_SEARCH_DATASOURCE_NAME", ""
@@ -214,6 +255,47 @@ class EnvHelper:
             self.AZURE_OPENAI_EMBEDDING_MODEL = os.getenv(
                 "AZURE_OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002"
             )
+        # Limits used to pack inputs into a single embeddings request
+        self.AZURE_OPENAI_EMBEDDING_BATCH_SIZE = self.get_env_var_int(
+            "AZURE_OPENAI_EMBEDDING_BATCH_SIZE", 16
+        )
+        self.AZURE_OPENAI_EMBEDDING_BATCH_MAX_TOKENS = self.get_env_var_int(
+            "AZURE_OPENAI_EMBEDDING_BATCH_MAX_TOKENS", 100000
+        )
+        # Embedding cache used during ingestion
+        self.EMBEDDING_CACHE_BACKEND = os.getenv("EMBEDDING_CACHE_BACKEND", "sqlite")
+        self.EMBEDDING_CACHE_PATH = os.getenv(
+            "EMBEDDING_CACHE_PATH",
+            os.path.join(tempfile.gettempdir(), "embedding_cache.sqlite3"),
+        )
+        self.EMBEDDING_CACHE_MAX_ENTRIES = self.get_env_var_int(
+            "EMBEDDING_CACHE_MAX_ENTRIES", 50000
+        )
+        self.EMBEDDING_CACHE_CONTAINER_NAME = os.getenv(
+            "EMBEDDING_CACHE_CONTAINER_NAME", "embedding-cache"
+        )
+        # Cache of Document Intelligence analysis results used during ingestion
+        self.DOCUMENT_ANALYSIS_CACHE_BACKEND = os.getenv(
+            "DOCUMENT_ANALYSIS_CACHE_BACKEND", "sqlite"
+        )
+        self.DOCUMENT_ANALYSIS_CACHE_PATH = os.getenv(
+            "DOCUMENT_ANALYSIS_CACHE_PATH",
+            os.path.join(tempfile.gettempdir(), "document_analysis_cache.sqlite3"),
+        )
+        self.DOCUMENT_ANALYSIS_CACHE_MAX_ENTRIES = self.get_env_var_int(
+            "DOCUMENT_ANALYSIS_CACHE_MAX_ENTRIES", 1000
+        )
+        self.DOCUMENT_ANALYSIS_CACHE_CONTAINER_NAME = os.getenv(
+            "DOCUMENT_ANALYSIS_CACHE_CONTAINER_NAME", "document-analysis-cache"
+        )
+        self.DOCUMENT_ANALYSIS_CACHE_BYPASS = self.get_env_var_bool(
+            "DOCUMENT_ANALYSIS_CACHE_BYPASS", "False"
+        )
+        # PDF pages with an image and fewer characters of text than this are sent to
+        # Document Intelligence by the auto loading strategy
+        self.PDF_TEXT_LAYER_MIN_CHARACTERS = self.get_env_var_int(
+            "PDF_TEXT_LAYER_MIN_CHARACTERS", 200
+        )
 
         self.SHOULD_STREAM = (
             True if self.AZURE_OPENAI_STREAM.lower() == "true" else False
@@ -225,6 +307,15 @@ class EnvHelper:
         self.ADVANCED_IMAGE_PROCESSING_MAX_IMAGES = self.get_env_var_int(
             "ADVANCED_IMAGE_PROCESSING_MAX_IMAGES", 1
         )
+        # Images are downscaled to fit this many pixels on their longest side before
+        # being captioned and vectorized, and at most this many remote image calls are
+        # made at once by a worker
+        self.ADVANCED_IMAGE_PROCESSING_MAX_DIMENSION = self.get_env_var_int(
+            "ADVANCED_IMAGE_PROCESSING_MAX_DIMENSION", 1024
+        )
+        self.ADVANCED_IMAGE_PROCESSING_CONCURRENCY = self.get_env_var_int(
+            "ADVANCED_IMAGE_PROCESSING_CONCURRENCY", 8
+        )
         self.AZURE_COMPUTER_VISION_ENDPOINT = os.getenv(
             "AZURE_COMPUTER_VISION_ENDPOINT"
         )
@@ -277,6 +368,17 @@ class EnvHelper:
         self.DOCUMENT_PROCESSING_QUEUE_NAME = os.getenv(
             "DOCUMENT_PROCESSING_QUEUE_NAME", "doc-processing"
         )
+        # Number of queue messages BatchStartProcessing sends at once
+        self.BATCH_START_PROCESSING_CONCURRENCY = self.get_env_var_int(
+            "BATCH_START_PROCESSING_CONCURRENCY", 32
+        )
+        # Reuse of the clients and embedder across queue-triggered invocations
+        self.WORKER_CACHE_ENABLED = self.get_env_var_bool(
+            "WORKER_CACHE_ENABLED", "True"
+        )
+        self.WORKER_CACHE_CONFIG_CHECK_INTERVAL = self.get_env_var_float(
+            "WORKER_CACHE_CONFIG_CHECK_INTERVAL", 30.0
+        )
         # Azure Blob Storage
         azure_blob_storage_info = self.get_info_from_env("AZURE_BLOB_STORAGE_INFO", "")
         if azure_blob_storage_info:
@@ -322,6 +424,13 @@ class EnvHelper:
             self.AZURE_FORM_RECOGNIZER_KEY = self.secretHelper.get_secret(
                 "AZURE_FORM_RECOGNIZER_KEY"
             )
+        # Analyze large documents in concurrent page ranges, 0 analyzes them whole
+        self.AZURE_FORM_RECOGNIZER_PAGE_RANGE_SIZE = self.get_env_var_int(
+            "AZURE_FORM_RECOGNIZER_PAGE_RANGE_SIZE", 0
+        )
+        self.AZURE_FORM_RECOGNIZER_MAX_CONCURRENCY = self.get_env_var_int(
+            "AZURE_FORM_RECOGNIZER_MAX_CONCURRENCY", 4
+        )
 
         # Azure App Insights
         # APPLICATIONINSIGHTS_ENABLED will be True when the application runs in App Service
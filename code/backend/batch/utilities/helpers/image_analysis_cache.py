@@ -0,0 +1,81 @@
+import hashlib
+import logging
+import threading
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from .embedding_cache import EmbeddingCache, EmbeddingCacheBackend
+from .env_helper import EnvHelper
+
+logger = logging.getLogger(__name__)
+
+
+class ImageAnalysisCache:
+    """
+    Cache of image captions and image vectors, keyed by the model that produced them
+    and the hash of the image content, so an image is only analyzed once whatever
+    blob it is uploaded as.
+
+    Entries are stored in the backend of the embedding cache, next to the cached
+    embeddings, so with the blob backend they are shared by every ingestion worker.
+    """
+
+    def __init__(self, backend: Optional[EmbeddingCacheBackend]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create(env_helper: EnvHelper) -> "ImageAnalysisCache":
+        return ImageAnalysisCache(EmbeddingCache.create_backend(env_helper))
+
+    @staticmethod
+    def hash_image(image: bytes) -> str:
+        return hashlib.sha256(image).hexdigest()
+
+    def get_or_caption(
+        self, image_hash: str, model: str, caption: Callable[[], str]
+    ) -> str:
+        value = self.__get_or_compute(
+            f"image-caption/{model}/{image_hash}",
+            lambda: caption().encode("utf-8"),
+        )
+        return value.decode("utf-8")
+
+    def get_or_vectorize(
+        self, image_hash: str, model: str, vectorize: Callable[[], List[float]]
+    ) -> List[float]:
+        value = self.__get_or_compute(
+            f"image-vector/{model}/{image_hash}",
+            lambda: array("f", vectorize()).tobytes(),
+        )
+        return array("f", value).tolist()
+
+    def __get_or_compute(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        if self.backend is None:
+            return compute()
+
+        try:
+            entries = self.backend.get_many([key])
+        except Exception:
+            logger.exception("Failed to read from the image analysis cache")
+            entries = {}
+        with self._lock:
+            if key in entries:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if key in entries:
+            logger.info(f"Using cached {key.split('/')[0]} for the image")
+            return entries[key]
+
+        value = compute()
+        try:
+            self.backend.set_many({key: value})
+        except Exception:
+            logger.exception("Failed to write to the image analysis cache")
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,83 @@
+import base64
+import io
+import logging
+from mimetypes import guess_type
+from typing import Tuple
+from urllib.parse import urlparse
+
+import requests
+from PIL import Image, UnidentifiedImageError
+
+from .env_helper import EnvHelper
+
+logger = logging.getLogger(__name__)
+
+FETCH_TIMEOUT = 30
+JPEG_QUALITY = 85
+
+
+class ImagePreprocessor:
+    """
+    Fetches an image once and prepares it for the remote image calls, downscaling it
+    to fit max_dimension pixels on its longest side. The vision model scales images
+    down anyway, so larger images only cost bandwidth and prompt tokens.
+    """
+
+    def __init__(self, max_dimension: int, timeout: float = FETCH_TIMEOUT):
+        self.max_dimension = max_dimension
+        self.timeout = timeout
+
+    @staticmethod
+    def create(env_helper: EnvHelper) -> "ImagePreprocessor":
+        return ImagePreprocessor(env_helper.ADVANCED_IMAGE_PROCESSING_MAX_DIMENSION)
+
+    def fetch(self, image_path: str) -> bytes:
+        """Returns the content of an image URL or local image file."""
+        if urlparse(image_path).scheme in ("http", "https"):
+            logger.info(f"Downloading image from URL: {image_path}")
+            response = requests.get(image_path, timeout=self.timeout)
+            response.raise_for_status()
+            return response.content
+        with open(image_path, "rb") as image_file:
+            return image_file.read()
+
+    def prepare(self, image_path: str, image: bytes) -> Tuple[bytes, str]:
+        """
+        Returns the image and its MIME type, re-encoded at a capped resolution if it
+        is larger than max_dimension. Images that cannot be decoded are returned as
+        they are, with the MIME type guessed from their path.
+        """
+        mime_type = (
+            guess_type(urlparse(image_path).path)[0] or "application/octet-stream"
+        )
+        try:
+            with Image.open(io.BytesIO(image)) as decoded:
+                if self.max_dimension <= 0 or max(decoded.size) <= self.max_dimension:
+                    return image, mime_type
+                original_size = decoded.size
+                decoded.thumbnail(
+                    (self.max_dimension, self.max_dimension), Image.Resampling.LANCZOS
+                )
+                size = decoded.size
+                output = io.BytesIO()
+                if decoded.mode in ("RGBA", "LA", "P"):
+                    decoded.save(output, format="PNG", optimize=True)
+                    mime_type = "image/png"
+                else:
+                    decoded.convert("RGB").save(
+                        output, format="JPEG", quality=JPEG_QUALITY
+                    )
+                    mime_type = "image/jpeg"
+        except (UnidentifiedImageError, OSError):
+            logger.warning(f"Could not decode image {image_path}, using it as is")
+            return image, mime_type
+
+        logger.info(
+            f"Downscaled image {image_path} from {original_size} to {size}, "
+            f"{len(image)} to {output.tell()} bytes"
+        )
+        return output.getvalue(), mime_type
+
+    @staticmethod
+    def to_data_url(image: bytes, mime_type: str) -> str:
+        return f"data:{mime_type};base64,{base64.b64encode(image).decode('utf-8')}"
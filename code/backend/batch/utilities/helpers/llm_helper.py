@@ -1,6 +1,9 @@
 import logging
-from openai import AzureOpenAI
-from typing import List, Union, cast
+import threading
+from functools import lru_cache
+from openai import APIStatusError, AzureOpenAI
+from typing import List, Optional, Union, cast
+import tiktoken
 from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
@@ -9,10 +12,18 @@ from semantic_kernel.connectors.ai.open_ai.prompt_execution_settings.azure_chat_
 )
 from azure.ai.ml import MLClient
 from .azure_credential_utils import get_azure_credential
+from .embedding_cache import EmbeddingCache
 from .env_helper import EnvHelper
 
 logger = logging.getLogger(__name__)
 
+_EMBEDDING_ENCODER_NAME = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(encoding_name)
+
 
 class LLMHelper:
     def __init__(self):
@@ -41,6 +52,13 @@ class LLMHelper:
             else None
         )
         self.embedding_model = self.env_helper.AZURE_OPENAI_EMBEDDING_MODEL
+        self.embedding_batch_size = self.env_helper.AZURE_OPENAI_EMBEDDING_BATCH_SIZE
+        self.embedding_batch_max_tokens = (
+            self.env_helper.AZURE_OPENAI_EMBEDDING_BATCH_MAX_TOKENS
+        )
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        self._embedding_cache_created = False
+        self._embedding_cache_lock = threading.Lock()
 
         logger.info("Initializing LLMHelper completed")
 
@@ -115,6 +133,86 @@ class LLMHelper:
             .embedding
         )
 
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generates embeddings for many texts using as few requests as possible.
+
+        Texts already in the embedding cache are not sent again. The rest are packed
+        into requests bounded by the configured input count and token budget.
+        Embeddings are returned in the same order as the input texts.
+        """
+        embedding_cache = self.get_embedding_cache()
+        if embedding_cache:
+            embeddings = embedding_cache.get_many(texts)
+        else:
+            embeddings = [None] * len(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            batches = self.__pack_embedding_batches(missing_texts)
+            logger.info(
+                f"Embedding {len(missing_texts)} of {len(texts)} texts in {len(batches)} request(s)"
+            )
+            generated: List[List[float]] = []
+            for batch in batches:
+                generated.extend(self.__embed_with_split(batch))
+            for i, embedding in zip(missing, generated):
+                embeddings[i] = embedding
+            if embedding_cache:
+                embedding_cache.set_many(missing_texts, generated)
+
+        if embedding_cache:
+            logger.info(f"Embedding cache stats: {embedding_cache.stats()}")
+        return embeddings
+
+    def get_embedding_cache(self) -> Optional[EmbeddingCache]:
+        # Created on first use, under a lock as embedding batches run on many threads
+        with self._embedding_cache_lock:
+            if not self._embedding_cache_created:
+                self._embedding_cache = EmbeddingCache.create(self.env_helper)
+                self._embedding_cache_created = True
+            return self._embedding_cache
+
+    def __pack_embedding_batches(self, texts: List[str]) -> List[List[str]]:
+        encoding = _get_encoding(_EMBEDDING_ENCODER_NAME)
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = len(encoding.encode(text, disallowed_special=()))
+            if batch and (
+                len(batch) >= self.embedding_batch_size
+                or batch_tokens + tokens > self.embedding_batch_max_tokens
+            ):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def __embed_with_split(self, batch: List[str]) -> List[List[float]]:
+        try:
+            response = self.openai_client.embeddings.create(
+                input=batch, model=self.embedding_model
+            )
+        except APIStatusError as e:
+            # The service rejects the whole request when it is too large, so retry
+            # each half separately until the offending input is isolated.
+            if len(batch) == 1 or e.status_code not in (400, 413):
+                raise
+            logger.warning(
+                f"Embedding request of {len(batch)} inputs failed with status {e.status_code}, splitting batch"
+            )
+            middle = len(batch) // 2
+            return self.__embed_with_split(batch[:middle]) + self.__embed_with_split(
+                batch[middle:]
+            )
+        return [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+
     def get_chat_completion_with_functions(
         self, messages: list[dict], functions: list[dict], function_call: str = "auto"
     ):
@@ -132,7 +230,7 @@ class LLMHelper:
             model=model or self.llm_model,
             messages=messages,
             max_tokens=self.llm_max_tokens,
-            **kwargs
+            **kwargs,
         )
 
     def get_sk_chat_completion_service(self, service_id: str):
@@ -0,0 +1,224 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, connection
+
+logger = logging.getLogger(__name__)
+
+POSTGRES_TOKEN_SCOPE = "https://ossrdbms-aad.database.windows.net/.default"
+# Tokens are refreshed this long before they expire, so a connection is never opened
+# with a token that expires during authentication
+TOKEN_REFRESH_MARGIN_SECONDS = 5 * 60
+POOL_MAX_SIZE = 10
+ACQUIRE_TIMEOUT_SECONDS = 30
+# Connections idle for less than this are handed out without a round trip
+HEALTH_CHECK_AFTER_SECONDS = 30
+# Connections are replaced after this long, so the pool follows server failovers
+MAX_LIFETIME_SECONDS = 60 * 60
+
+
+class AccessTokenCache:
+    """
+    Caches an AAD access token, fetching a new one from the credential only when the
+    cached token is about to expire.
+    """
+
+    def __init__(
+        self,
+        credential,
+        scope: str = POSTGRES_TOKEN_SCOPE,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN_SECONDS,
+    ):
+        self.credential = credential
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self._token = None
+        self._lock = threading.Lock()
+
+    def get_token(self) -> str:
+        with self._lock:
+            if (
+                self._token is None
+                or self._token.expires_on - self.refresh_margin <= time.time()
+            ):
+                self._token = self.credential.get_token(self.scope)
+                self.refreshes += 1
+            return self._token.token
+
+
+class PostgresConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections, shared by everything in the process that
+    talks to the same server, so a query reuses an open connection instead of paying
+    for token acquisition, TLS and authentication every time.
+
+    Connections are handed out most recently used first. One idle for longer than
+    HEALTH_CHECK_AFTER_SECONDS is checked with `SELECT 1` before it is handed out, and
+    connections that are closed, broken or older than MAX_LIFETIME_SECONDS are
+    replaced.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], connection],
+        max_size: int = POOL_MAX_SIZE,
+        timeout: float = ACQUIRE_TIMEOUT_SECONDS,
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: List[Tuple[connection, float]] = []
+        self._created_at: Dict[connection, float] = {}
+        self._acquired_at: Dict[connection, float] = {}
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self.acquires = 0
+        self.acquire_seconds = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.health_check_failures = 0
+
+    def getconn(self) -> connection:
+        """
+        Returns an open connection, waiting up to timeout seconds for one to be
+        released when max_size connections are in use.
+        """
+        start_time = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"No PostgreSQL connection available after {self.timeout}s"
+                        )
+                    self._condition.wait(remaining)
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                else:
+                    conn, released_at = None, None
+                    self._size += 1
+            if conn is None:
+                conn = self._open()
+                break
+            if self._is_usable(conn, released_at):
+                break
+            self._discard(conn)
+
+        acquired_at = time.perf_counter()
+        with self._condition:
+            self._acquired_at[conn] = acquired_at
+            self.acquires += 1
+            self.acquire_seconds += acquired_at - start_time
+        return conn
+
+    def putconn(self, conn: connection) -> None:
+        """
+        Returns a connection to the pool, rolling back any transaction left open.
+        """
+        released_at = time.perf_counter()
+        reusable = (
+            conn.closed == 0
+            and time.monotonic() - self._created_at.get(conn, 0) < MAX_LIFETIME_SECONDS
+        )
+        if reusable and conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                reusable = False
+
+        with self._condition:
+            query_seconds = released_at - self._acquired_at.pop(conn, released_at)
+            self.queries += 1
+            self.query_seconds += query_seconds
+            reusable = reusable and not self._closed
+            if reusable:
+                self._idle.append((conn, time.monotonic()))
+                self._condition.notify()
+        logger.debug(f"PostgreSQL connection used for {query_seconds:.3f}s")
+        if not reusable:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[connection]:
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def close(self) -> None:
+        """Closes the idle connections; connections in use are closed on release."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "connects": self.connects,
+                "connect_seconds": self.connect_seconds,
+                "acquires": self.acquires,
+                "acquire_seconds": self.acquire_seconds,
+                "queries": self.queries,
+                "query_seconds": self.query_seconds,
+                "health_check_failures": self.health_check_failures,
+            }
+
+    def _open(self) -> connection:
+        start_time = time.perf_counter()
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        connect_seconds = time.perf_counter() - start_time
+        with self._condition:
+            self._created_at[conn] = time.monotonic()
+            self.connects += 1
+            self.connect_seconds += connect_seconds
+        logger.debug(f"Opened PostgreSQL connection in {connect_seconds:.3f}s")
+        return conn
+
+    def _is_usable(self, conn: connection, released_at: float) -> bool:
+        if conn.closed != 0:
+            return False
+        if time.monotonic() - released_at < HEALTH_CHECK_AFTER_SECONDS:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            logger.warning(
+                "Discarding PostgreSQL connection that failed its health check"
+            )
+            with self._condition:
+                self.health_check_failures += 1
+            return False
+
+    def _discard(self, conn: connection) -> None:
+        with self._condition:
+            self._created_at.pop(conn, None)
+            self._size -= 1
+            self._condition.notify()
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# Missing indexes are checked again sooner, so an index created by another process,
+# like the function app on first ingestion, is picked up quickly
+MISSING_INDEX_TTL = 30.0
+
+
+class SearchIndexCache:
+    """
+    Process-wide cache of whether each search index exists, by search service and
+    index name, so that hot paths do not list the indexes of the service on every
+    call.
+
+    Entries expire after the TTL given when they are checked. Code that creates or
+    deletes an index records it here, so the change is seen without waiting.
+    """
+
+    _entries: Dict[Tuple[str, str], Tuple[bool, float]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(service: str, index_name: str) -> Optional[bool]:
+        with SearchIndexCache._lock:
+            entry = SearchIndexCache._entries.get((service, index_name))
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    @staticmethod
+    def set(service: str, index_name: str, exists: bool, ttl: float) -> None:
+        if not exists:
+            ttl = min(ttl, MISSING_INDEX_TTL)
+        with SearchIndexCache._lock:
+            SearchIndexCache._entries[(service, index_name)] = (
+                exists,
+                time.monotonic() + ttl,
+            )
+
+    @staticmethod
+    def invalidate(service: str, index_name: str) -> None:
+        with SearchIndexCache._lock:
+            SearchIndexCache._entries.pop((service, index_name), None)
+
+    @staticmethod
+    def clear() -> None:
+        with SearchIndexCache._lock:
+            SearchIndexCache._entries.clear()
+
+    @staticmethod
+    def exists(
+        service: str, index_name: str, ttl: float, check: Callable[[], bool]
+    ) -> bool:
+        """Returns whether the index exists, calling check when it is not cached."""
+        exists = SearchIndexCache.get(service, index_name)
+        if exists is None:
+            exists = check()
+            SearchIndexCache.set(service, index_name, exists, ttl)
+        return exists
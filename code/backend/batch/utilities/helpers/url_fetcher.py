@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+
+from .env_helper import EnvHelper
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns the canonical form of an http(s) URL, used to dedupe URLs: the scheme and
+    host are lowercased, and the default port and the fragment are dropped.
+
+    Raises a ValueError for anything but an absolute http(s) URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        raise ValueError(f"Invalid URL: {url}")
+    host = f"[{parts.hostname}]" if ":" in parts.hostname else parts.hostname
+    netloc = (
+        parts.netloc.rpartition("@")[0] + "@" + host if "@" in parts.netloc else host
+    )
+    if parts.port is not None and parts.port != DEFAULT_PORTS[scheme]:
+        netloc += f":{parts.port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+class UrlFetcher:
+    """
+    Fetches URLs concurrently over a pooled async HTTP client, running at most
+    max_concurrency requests at once and max_concurrency_per_host against each host.
+    """
+
+    def __init__(
+        self, max_concurrency: int, max_concurrency_per_host: int, timeout: float
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_concurrency_per_host = max(max_concurrency_per_host, 1)
+        self.timeout = timeout
+
+    @staticmethod
+    def create(env_helper: EnvHelper) -> "UrlFetcher":
+        return UrlFetcher(
+            env_helper.URL_INGESTION_MAX_CONCURRENCY,
+            env_helper.URL_INGESTION_MAX_CONCURRENCY_PER_HOST,
+            env_helper.URL_INGESTION_TIMEOUT,
+        )
+
+    async def fetch_all(
+        self, urls: List[str]
+    ) -> AsyncIterator[Tuple[str, Optional[bytes], Optional[str]]]:
+        """
+        Yields (url, content, error) for each URL as soon as it has been fetched, where
+        error describes why the URL could not be fetched, and content is then None.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        host_semaphores = defaultdict(
+            lambda: asyncio.Semaphore(self.max_concurrency_per_host)
+        )
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+        )
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(self.timeout),
+            follow_redirects=True,
+            headers={"User-Agent": "chat-with-your-data-solution-accelerator/1.0.0"},
+        ) as client:
+
+            async def fetch(url: str):
+                async with host_semaphores[urlsplit(url).hostname], semaphore:
+                    try:
+                        response = await client.get(url)
+                        response.raise_for_status()
+                        return url, response.content, None
+                    except httpx.HTTPStatusError as e:
+                        return url, None, f"HTTP {e.response.status_code}"
+                    except httpx.HTTPError as e:
+                        return url, None, f"{type(e).__name__}: {e}"
+
+            tasks = [asyncio.create_task(fetch(url)) for url in urls]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
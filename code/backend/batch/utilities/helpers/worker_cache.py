@@ -0,0 +1,171 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from .azure_blob_storage_client import AzureBlobStorageClient
+from .config.config_helper import (
+    CONFIG_CONTAINER_NAME,
+    CONFIG_FILE_NAME,
+    ConfigHelper,
+)
+from .embedders.embedder_base import EmbedderBase
+from .embedders.embedder_factory import EmbedderFactory
+from .env_helper import EnvHelper
+from ..search.search import Search
+from ..search.search_handler_base import SearchHandlerBase
+
+logger = logging.getLogger(__name__)
+
+# User delegation keys are requested for a day, so the objects holding one are
+# rebuilt well before it expires
+MAX_AGE_SECONDS = 12 * 60 * 60
+
+
+class WorkerCache:
+    """
+    Registry of the clients and embedder used to process queue messages, built once
+    per worker and reused across invocations instead of being set up for every
+    message.
+
+    Everything is rebuilt when the active config changes, which is checked at most
+    every WORKER_CACHE_CONFIG_CHECK_INTERVAL seconds by comparing the ETag of the
+    config blob, and when the objects are older than MAX_AGE_SECONDS.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                instance = super(WorkerCache, cls).__new__(cls)
+                instance.__initialize()
+                cls._instance = instance
+            return cls._instance
+
+    def __initialize(self) -> None:
+        self.env_helper = EnvHelper()
+        self.enabled = self.env_helper.WORKER_CACHE_ENABLED
+        self.config_check_interval = self.env_helper.WORKER_CACHE_CONFIG_CHECK_INTERVAL
+        self._build_lock = threading.RLock()
+        self._objects = {}
+        self._setup_seconds = {}
+        self._built_at = None
+        self._config_version = None
+        self._config_checked_at = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.setup_seconds_saved = 0.0
+        self._local = threading.local()
+
+    def _get_config_version(self) -> Optional[str]:
+        if not self.env_helper.LOAD_CONFIG_FROM_BLOB_STORAGE:
+            return None
+        # Not counted as a hit, as processing a message uses the blob client anyway
+        blob_client = self._get("blob_client", AzureBlobStorageClient, record=False)
+        return blob_client.get_file_etag(
+            CONFIG_FILE_NAME, container_name=CONFIG_CONTAINER_NAME
+        )
+
+    def invalidate(self) -> None:
+        """
+        Drops the cached objects and the cached active config. The objects are not
+        closed, as invocations running on other threads may still be using them; they
+        are released once the last of those drops its reference.
+        """
+        with self._build_lock:
+            self._objects.clear()
+            self._setup_seconds.clear()
+            self._built_at = None
+            self.invalidations += 1
+            ConfigHelper.get_active_config_or_default.cache_clear()
+
+    def _check_config(self) -> None:
+        now = time.monotonic()
+        if self._built_at is not None and now - self._built_at > MAX_AGE_SECONDS:
+            logger.info("Worker cache expired, rebuilding it")
+            self.invalidate()
+            return
+        if (
+            self._config_checked_at is not None
+            and now - self._config_checked_at < self.config_check_interval
+        ):
+            return
+        first_check = self._config_checked_at is None
+        self._config_checked_at = now
+        try:
+            config_version = self._get_config_version()
+        except Exception:
+            logger.warning("Could not check the active config version", exc_info=True)
+            return
+        if not first_check and config_version != self._config_version:
+            logger.info("Active config changed, rebuilding the worker cache")
+            self.invalidate()
+        self._config_version = config_version
+
+    def _get(self, name: str, build: Callable[[], object], record: bool = True):
+        if not self.enabled:
+            return build()
+        with self._build_lock:
+            if name in self._objects:
+                if not record:
+                    return self._objects[name]
+                self.hits += 1
+                self.setup_seconds_saved += self._setup_seconds[name]
+                self._local.saved = (
+                    getattr(self._local, "saved", 0.0) + self._setup_seconds[name]
+                )
+                return self._objects[name]
+            start = time.perf_counter()
+            value = build()
+            self.misses += 1
+            self._objects[name] = value
+            self._setup_seconds[name] = time.perf_counter() - start
+            if self._built_at is None:
+                self._built_at = time.monotonic()
+            return value
+
+    def get_blob_client(self) -> AzureBlobStorageClient:
+        return self._get("blob_client", AzureBlobStorageClient)
+
+    def get_embedder(self) -> EmbedderBase:
+        if self.enabled:
+            with self._build_lock:
+                self._check_config()
+        blob_client = self.get_blob_client()
+        return self._get(
+            "embedder", lambda: EmbedderFactory.create(self.env_helper, blob_client)
+        )
+
+    def get_search_handler(self) -> SearchHandlerBase:
+        if self.enabled:
+            with self._build_lock:
+                self._check_config()
+        return self._get(
+            "search_handler", lambda: Search.get_search_handler(self.env_helper)
+        )
+
+    def take_setup_seconds_saved(self) -> float:
+        """
+        Returns the setup time saved by reusing cached objects on the current thread
+        since the last call, which is the time saved for the message it processes.
+        """
+        saved = getattr(self._local, "saved", 0.0)
+        self._local.saved = 0.0
+        return saved
+
+    def get_stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "setup_seconds": sum(self._setup_seconds.values()),
+            "setup_seconds_saved": self.setup_seconds_saved,
+        }
+
+    @classmethod
+    def clear_instance(cls):
+        if cls._instance is not None:
+            cls._instance = None
@@ -24,13 +24,13 @@ class AzureSearchDatasource:
             ),
         )
 
-    def create_or_update_datasource(self):
+    def get_datasource(self) -> SearchIndexerDataSourceConnection:
         connection_string = self.generate_datasource_connection_string()
         # Create Datasource
         container = SearchIndexerDataContainer(
             name=self.env_helper.AZURE_BLOB_CONTAINER_NAME
         )
-        data_source_connection = SearchIndexerDataSourceConnection(
+        return SearchIndexerDataSourceConnection(
             name=self.env_helper.AZURE_SEARCH_DATASOURCE_NAME,
             type="azureblob",
             connection_string=connection_string,
@@ -44,8 +44,12 @@ class AzureSearchDatasource:
                 )
             ),
         )
+
+    def create_or_update_datasource(
+        self, data_source_connection: SearchIndexerDataSourceConnection = None
+    ):
         self.indexer_client.create_or_update_data_source_connection(
-            data_source_connection
+            data_source_connection or self.get_datasource()
         )
 
     def generate_datasource_connection_string(self):
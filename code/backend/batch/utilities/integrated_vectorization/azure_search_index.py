@@ -25,6 +25,7 @@ from ..helpers.env_helper import EnvHelper
 from ..helpers.azure_credential_utils import get_azure_credential
 from azure.core.credentials import AzureKeyCredential
 from ..helpers.llm_helper import LLMHelper
+from ..helpers.search_index_cache import SearchIndexCache
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +53,7 @@ class AzureSearchIndex:
             )
         return AzureSearchIndex._search_dimension
 
-    def create_or_update_index(self):
+    def get_index(self) -> SearchIndex:
         # Create a search index
         fields = [
             SimpleField(
@@ -124,14 +125,22 @@ class AzureSearchIndex:
 
         semantic_search = self.get_semantic_search_config()
 
-        index = SearchIndex(
+        return SearchIndex(
             name=self.env_helper.AZURE_SEARCH_INDEX,
             fields=fields,
             vector_search=vector_search,
             semantic_search=semantic_search,
         )
-        result = self.index_client.create_or_update_index(index)
+
+    def create_or_update_index(self, index: SearchIndex = None):
+        result = self.index_client.create_or_update_index(index or self.get_index())
         logger.info(f"{result.name} index created successfully.")
+        SearchIndexCache.set(
+            self.env_helper.AZURE_SEARCH_SERVICE,
+            self.env_helper.AZURE_SEARCH_INDEX,
+            True,
+            self.env_helper.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL,
+        )
         return result
 
     def get_vector_search_config(self):
@@ -159,9 +168,9 @@ class AzureSearchIndex:
                 HnswAlgorithmConfiguration(
                     name="myHnsw",
                     parameters=HnswParameters(
-                        m=4,
-                        ef_construction=400,
-                        ef_search=500,
+                        m=self.env_helper.AZURE_SEARCH_HNSW_M,
+                        ef_construction=self.env_helper.AZURE_SEARCH_HNSW_EF_CONSTRUCTION,
+                        ef_search=self.env_helper.AZURE_SEARCH_HNSW_EF_SEARCH,
                         metric=VectorSearchAlgorithmMetric.COSINE,
                     ),
                 ),
@@ -20,8 +20,8 @@ class AzureSearchIndexer:
             ),
         )
 
-    def create_or_update_indexer(self, indexer_name: str, skillset_name: str):
-        indexer = SearchIndexer(
+    def get_indexer(self, indexer_name: str, skillset_name: str) -> SearchIndexer:
+        return SearchIndexer(
             name=indexer_name,
             description="Indexer to index documents and generate embeddings",
             skillset_name=skillset_name,
@@ -56,16 +56,29 @@ class AzureSearchIndexer:
                 ),
             ],
         )
-        indexer_result = self.indexer_client.create_or_update_indexer(indexer)
-        # Run the indexer
-        self.indexer_client.run_indexer(indexer_name)
-        logger.info(
-            f" {indexer_name} is created and running. If queries return no results, please wait a bit and try again."
+
+    def create_or_update_indexer(
+        self,
+        indexer_name: str,
+        skillset_name: str,
+        indexer: SearchIndexer = None,
+        run: bool = True,
+    ):
+        indexer_result = self.indexer_client.create_or_update_indexer(
+            indexer or self.get_indexer(indexer_name, skillset_name)
         )
+        if run:
+            # Run the indexer
+            self.run_indexer(indexer_name, reset=False)
         return indexer_result
 
-    def run_indexer(self, indexer_name: str):
-        self.indexer_client.reset_indexer(indexer_name)
+    def run_indexer(self, indexer_name: str, reset: bool = True):
+        """
+        Runs the indexer. Unless reset is False, the indexer is reset first so that it
+        processes every document again instead of only the new and changed ones.
+        """
+        if reset:
+            self.indexer_client.reset_indexer(indexer_name)
         self.indexer_client.run_indexer(indexer_name)
         logger.info(
             f" {indexer_name} is created and running. If queries return no results, please wait a bit and try again."
@@ -41,7 +41,7 @@ class AzureSearchSkillset:
         )
         self.integrated_vectorization_config = integrated_vectorization_config
 
-    def create_skillset(self):
+    def get_skillset(self) -> SearchIndexerSkillset:
         skillset_name = f"{self.env_helper.AZURE_SEARCH_INDEX}-skillset"
 
         ocr_skill = OcrSkill(
@@ -175,13 +175,15 @@ class AzureSearchSkillset:
             ),
         )
 
-        skillset = SearchIndexerSkillset(
+        return SearchIndexerSkillset(
             name=skillset_name,
             description="Skillset to chunk documents and generating embeddings",
             skills=[ocr_skill, merge_skill, split_skill, combine_pages_and_chunk_nos_skill, embedding_skill, metadata_shaper],
             index_projections=index_projections,
         )
 
+    def create_skillset(self, skillset: SearchIndexerSkillset = None):
+        skillset = skillset or self.get_skillset()
         skillset_result = self.indexer_client.create_or_update_skillset(skillset)
         logger.info(f"{skillset.name} created")
         return skillset_result
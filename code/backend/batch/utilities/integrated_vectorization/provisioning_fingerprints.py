@@ -0,0 +1,101 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict
+
+from ..helpers.azure_blob_storage_client import AzureBlobStorageClient
+from ..helpers.config.config_helper import CONFIG_CONTAINER_NAME
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINTS_FILE_NAME = "integrated_vectorization_fingerprints.json"
+
+# Changes to these resources change what is indexed for a document, so the indexer is
+# reset when they change. The datasource only says where the documents are.
+RESET_ON_CHANGE = ["index", "skillset", "indexer"]
+
+
+def fingerprint(definition) -> str:
+    """
+    Returns a hash of the serialized definition of a search resource. Only the hash
+    is stored, so secrets in the definition, like a connection string, are not.
+    """
+    serialized = json.dumps(definition.serialize(), sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class ProvisioningFingerprints:
+    """
+    Fingerprints of the integrated vectorization resources last provisioned, by
+    resource, stored in the config container so that they are shared by every
+    worker, and kept in memory so that most blob events do not read them.
+    """
+
+    _fingerprints: Dict[str, str] | None = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _load() -> Dict[str, str]:
+        blob_client = AzureBlobStorageClient(container_name=CONFIG_CONTAINER_NAME)
+        try:
+            if not blob_client.file_exists(FINGERPRINTS_FILE_NAME):
+                return {}
+            return json.loads(blob_client.download_file(FINGERPRINTS_FILE_NAME))
+        except Exception:
+            logger.warning(
+                "Could not load the integrated vectorization fingerprints",
+                exc_info=True,
+            )
+            return {}
+
+    @staticmethod
+    def get_changed(
+        desired: Dict[str, str], force: bool = False
+    ) -> Dict[str, str | None]:
+        """
+        Returns the resources whose desired fingerprint differs from the one last
+        provisioned, with the fingerprint last provisioned, or None if unknown. If force
+        is True, every resource is returned, for when they may not exist anymore.
+        """
+
+        def changed() -> Dict[str, str | None]:
+            return {
+                name: ProvisioningFingerprints._fingerprints.get(name)
+                for name, value in desired.items()
+                if force or ProvisioningFingerprints._fingerprints.get(name) != value
+            }
+
+        with ProvisioningFingerprints._lock:
+            if (
+                not force
+                and ProvisioningFingerprints._fingerprints is not None
+                and not changed()
+            ):
+                return {}
+            # Another worker may have provisioned the changes already
+            ProvisioningFingerprints._fingerprints = ProvisioningFingerprints._load()
+            return changed()
+
+    @staticmethod
+    def set_provisioned(provisioned: Dict[str, str]) -> None:
+        with ProvisioningFingerprints._lock:
+            fingerprints = dict(ProvisioningFingerprints._fingerprints or {})
+            fingerprints.update(provisioned)
+            ProvisioningFingerprints._fingerprints = fingerprints
+        try:
+            AzureBlobStorageClient(container_name=CONFIG_CONTAINER_NAME).upload_file(
+                json.dumps(fingerprints, indent=2),
+                FINGERPRINTS_FILE_NAME,
+                content_type="application/json",
+            )
+        except Exception:
+            logger.warning(
+                "Could not save the integrated vectorization fingerprints",
+                exc_info=True,
+            )
+
+    @staticmethod
+    def clear() -> None:
+        with ProvisioningFingerprints._lock:
+            ProvisioningFingerprints._fingerprints = None
@@ -1,11 +1,14 @@
 import logging
-from typing import List
+from typing import List, Optional
 from .search_handler_base import SearchHandlerBase
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.models import VectorizableTextQuery
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import ResourceNotFoundError
 from ..helpers.azure_credential_utils import get_azure_credential
+from ..helpers.config.vector_search_mode import VectorSearchMode
+from ..helpers.search_index_cache import SearchIndexCache
 from ..common.source_document import SourceDocument
 import re
 
@@ -94,23 +97,55 @@ class IntegratedVectorizationSearchHandler(SearchHandlerBase):
         logging.info(f"Querying search for question: {question}.")
         if self._check_index_exists():
             logging.info("Search index exists. Proceeding with search.")
-            if self.env_helper.AZURE_SEARCH_USE_SEMANTIC_SEARCH:
-                logging.info("Using semantic search.")
-                search_results = self._semantic_search(question)
-            else:
-                logging.info("Using hybrid search.")
-                search_results = self._hybrid_search(question)
-            logging.info("Search completed. Converting results to SourceDocuments.")
-            return self._convert_to_source_documents(search_results)
-
-    def _hybrid_search(self, question: str):
-        logging.info(f"Performing hybrid search for question: {question}.")
-        vector_query = VectorizableTextQuery(
+            try:
+                if self.env_helper.AZURE_SEARCH_USE_SEMANTIC_SEARCH:
+                    logging.info("Using semantic search.")
+                    search_results = self._semantic_search(question)
+                else:
+                    logging.info("Using hybrid search.")
+                    search_results = self._hybrid_search(question)
+                logging.info("Search completed. Converting results to SourceDocuments.")
+                return self._convert_to_source_documents(search_results)
+            except ResourceNotFoundError:
+                # The index was deleted since its existence was cached
+                SearchIndexCache.invalidate(
+                    self.env_helper.AZURE_SEARCH_SERVICE,
+                    self.env_helper.AZURE_SEARCH_INDEX,
+                )
+                raise
+
+    def _vector_query(
+        self, question: str, k: int, exhaustive: Optional[bool] = None
+    ) -> VectorizableTextQuery:
+        """
+        Builds the vector query for the question, searching the HNSW graph unless
+        exhaustive is set, which defaults to AZURE_SEARCH_VECTOR_SEARCH_MODE.
+        """
+        if exhaustive is None:
+            exhaustive = (
+                self.env_helper.AZURE_SEARCH_VECTOR_SEARCH_MODE
+                == VectorSearchMode.EXHAUSTIVE
+            )
+        return VectorizableTextQuery(
             text=question,
-            k_nearest_neighbors=self.env_helper.AZURE_SEARCH_TOP_K,
+            k_nearest_neighbors=k,
             fields=self._VECTOR_FIELD,
-            exhaustive=True,
+            exhaustive=exhaustive,
+        )
+
+    def vector_search(self, question: str, k: int, exhaustive: bool) -> List[str]:
+        """Returns the ids of the k nearest chunks, using only the vector query."""
+        results = self.search_client.search(
+            search_text=None,
+            vector_queries=[self._vector_query(question, k, exhaustive)],
+            select=["id"],
+            top=k,
         )
+        return [result["id"] for result in results]
+
+    def _hybrid_search(self, question: str):
+        logging.info(f"Performing hybrid search for question: {question}.")
+        vector_query = self._vector_query(question, self.env_helper.AZURE_SEARCH_TOP_K)
         return self.search_client.search(
             search_text=question,
             vector_queries=[vector_query],
@@ -119,12 +154,7 @@ class IntegratedVectorizationSearchHandler(SearchHandlerBase):
 
     def _semantic_search(self, question: str):
         logging.info(f"Performing semantic search for question: {question}.")
-        vector_query = VectorizableTextQuery(
-            text=question,
-            k_nearest_neighbors=self.env_helper.AZURE_SEARCH_TOP_K,
-            fields=self._VECTOR_FIELD,
-            exhaustive=True,
-        )
+        vector_query = self._vector_query(question, self.env_helper.AZURE_SEARCH_TOP_K)
         return self.search_client.search(
             search_text=question,
             vector_queries=[vector_query],
@@ -164,6 +194,14 @@ class IntegratedVectorizationSearchHandler(SearchHandlerBase):
         return source_url
 
     def _check_index_exists(self) -> bool:
+        return SearchIndexCache.exists(
+            self.env_helper.AZURE_SEARCH_SERVICE,
+            self.env_helper.AZURE_SEARCH_INDEX,
+            self.env_helper.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL,
+            self._list_index_exists,
+        )
+
+    def _list_index_exists(self) -> bool:
         logging.info("Checking if search index exists.")
         search_index_client = SearchIndexClient(
             endpoint=self.env_helper.AZURE_SEARCH_SERVICE,
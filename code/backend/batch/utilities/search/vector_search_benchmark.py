@@ -0,0 +1,112 @@
+"""
+Offline benchmark of approximate (HNSW) against exhaustive vector search on an
+integrated vectorization index.
+
+Each question is searched in both modes. The exhaustive results are the ground truth
+for the recall@k of the approximate search, and the latency of each mode is reported.
+
+Usage, from the code directory, with the environment of the deployment loaded:
+
+    python -m backend.batch.utilities.search.vector_search_benchmark \\
+        ../tests/llm-evaluator/data/input_questions.json --k 5 --runs 3
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from ..helpers.env_helper import EnvHelper
+from .integrated_vectorization_search_handler import (
+    IntegratedVectorizationSearchHandler,
+)
+
+# Searches for a question, returning the ids of the k nearest chunks, exhaustively or
+# not
+VectorSearch = Callable[[str, int, bool], List[str]]
+
+
+def recall_at_k(expected: List[str], actual: List[str], k: int) -> float:
+    """Returns the fraction of the first k expected ids found in the first k actual."""
+    expected = expected[:k]
+    if not expected:
+        return 1.0
+    return len(set(expected) & set(actual[:k])) / len(expected)
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        "mean_ms": statistics.fmean(latencies_ms),
+        "p50_ms": latencies_ms[(len(latencies_ms) - 1) // 2],
+        "p95_ms": latencies_ms[
+            min(len(latencies_ms) - 1, round(0.95 * (len(latencies_ms) - 1)))
+        ],
+    }
+
+
+def run_benchmark(
+    search: VectorSearch, questions: List[str], k: int, runs: int = 1
+) -> dict:
+    if not questions:
+        raise ValueError("No questions to benchmark")
+    latencies = {"ann": [], "exhaustive": []}
+    recalls = []
+    modes = [("exhaustive", True), ("ann", False)]
+    for question in questions:
+        results = {}
+        for _ in range(max(runs, 1)):
+            # Alternate which mode runs first, so that neither always benefits from
+            # the service having just run the other
+            modes.reverse()
+            for mode, exhaustive in modes:
+                start_time = time.perf_counter()
+                results[mode] = search(question, k, exhaustive)
+                latencies[mode].append(time.perf_counter() - start_time)
+        recalls.append(recall_at_k(results["exhaustive"], results["ann"], k))
+
+    return {
+        "questions": len(questions),
+        "k": k,
+        "recall_at_k": statistics.fmean(recalls),
+        "min_recall_at_k": min(recalls),
+        "ann": summarize_latencies(latencies["ann"]),
+        "exhaustive": summarize_latencies(latencies["exhaustive"]),
+    }
+
+
+def load_questions(path: str) -> List[str]:
+    """
+    Loads the questions from a JSON file with a "questions" list, like the input of
+    the LLM evaluator, or from a JSON lines file with a "query" on each line.
+    """
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".jsonl"):
+        return [
+            json.loads(line)["query"] for line in content.splitlines() if line.strip()
+        ]
+    return json.loads(content)["questions"]
+
+
+def main(argv: List[str] | None = None) -> None:
+    env_helper = EnvHelper()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("questions", help="JSON or JSON lines file of questions")
+    parser.add_argument("--k", type=int, default=env_helper.AZURE_SEARCH_TOP_K)
+    parser.add_argument("--runs", type=int, default=1, help="searches per question")
+    args = parser.parse_args(argv)
+
+    search_handler = IntegratedVectorizationSearchHandler(env_helper)
+    report = run_benchmark(
+        search_handler.vector_search,
+        load_questions(args.questions),
+        args.k,
+        args.runs,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -31,11 +31,13 @@ def load_css(file_path):
 load_css("pages/common.css")
 
 
-def reprocess_all():
+def reprocess_all(delta: bool = False):
     backend_url = urllib.parse.urljoin(
         env_helper.BACKEND_URL, "/api/BatchStartProcessing"
     )
     params = {}
+    if delta:
+        params["delta"] = "true"
     if env_helper.FUNCTION_KEY is not None:
         params["code"] = env_helper.FUNCTION_KEY
         params["clientId"] = "clientKey"
@@ -67,8 +69,8 @@ def sanitize_metadata_value(value):
 
 
 def add_url_embeddings(urls: list[str]):
-    has_valid_url = bool(list(filter(str.strip, urls)))
-    if not has_valid_url:
+    urls = [url.strip() for url in urls if url.strip()]
+    if not urls:
         st.error("Please enter at least one valid URL.")
         return False
 
@@ -76,18 +78,21 @@ def add_url_embeddings(urls: list[str]):
     if env_helper.FUNCTION_KEY is not None:
         params["code"] = env_helper.FUNCTION_KEY
         params["clientId"] = "clientKey"
-    for url in urls:
-        body = {"url": url}
-        backend_url = urllib.parse.urljoin(
-            env_helper.BACKEND_URL, "/api/AddURLEmbeddings"
-        )
-        r = requests.post(url=backend_url, params=params, json=body)
-        if not r.ok:
-            st.error(f"Error {r.status_code}: {r.text}")
-            return False
+    # All URLs are sent at once, and fetched concurrently by the backend
+    body = {"urls": urls}
+    backend_url = urllib.parse.urljoin(env_helper.BACKEND_URL, "/api/AddURLEmbeddings")
+    r = requests.post(url=backend_url, params=params, json=body)
+    if not r.ok:
+        st.error(f"Error {r.status_code}: {r.text}")
+        return False
+    for result in r.json()["results"]:
+        if result["status"] == "succeeded":
+            st.success(f"Embeddings added successfully for {result['url']}")
+        elif result["status"] == "duplicate":
+            st.info(f"Skipped {result['url']}: {result['message']}")
         else:
-            st.success(f"Embeddings added successfully for {url}")
-    return True
+            st.error(f"Error adding {result['url']}: {result['message']}")
+    return r.json()["failed"] == 0
 
 
 try:
@@ -119,6 +124,12 @@ try:
                 )
 
         col1, col2, col3 = st.columns([2, 1, 2])
+        with col1:
+            st.button(
+                "Process new and changed documents in the Azure Storage account",
+                on_click=reprocess_all,
+                kwargs={"delta": True},
+            )
         with col3:
             st.button(
                 "Reprocess all documents in the Azure Storage account",
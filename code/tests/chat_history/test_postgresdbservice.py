@@ -1,7 +1,11 @@
+import asyncio
+import threading
+import time
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from backend.batch.utilities.chat_history.postgresdbservice import (
     PostgresConversationClient,
+    PostgresPool,
 )
 
 
@@ -20,26 +24,20 @@ def mock_connection():
     return AsyncMock()
 
 
-@patch("backend.batch.utilities.chat_history.postgresdbservice.asyncpg.connect")
-@patch("backend.batch.utilities.chat_history.postgresdbservice.get_azure_credential")
+@patch("backend.batch.utilities.chat_history.postgresdbservice.PostgresPool.get")
 @pytest.mark.asyncio
-async def test_connect(mock_credential, mock_connect, postgres_client, mock_connection):
-    # Mock get_azure_credential
-    mock_credential.return_value.get_token.return_value.token = "mock_token"
-
-    # Mock asyncpg connection
-    mock_connect.return_value = mock_connection
+async def test_connect(mock_get_pool, postgres_client, mock_connection):
+    # Mock the pool
+    mock_get_pool.return_value.acquire = AsyncMock(return_value=mock_connection)
 
     # Test the connect method
     await postgres_client.connect()
 
-    mock_connect.assert_called_once_with(
-        user="test_user",
-        host="test_host",
-        database="test_db",
-        password="mock_token",
-        port=5432,
-        ssl=True,
+    mock_get_pool.assert_called_once_with(
+        "test_user",
+        "test_host",
+        "test_db",
+        postgres_client.env_helper.MANAGED_IDENTITY_CLIENT_ID,
     )
     assert postgres_client.conn == mock_connection
 
@@ -51,7 +49,115 @@ async def test_close(postgres_client, mock_connection):
 
     # Test the close method
     await postgres_client.close()
-    mock_connection.close.assert_called_once()
+    mock_connection.release.assert_called_once()
+    assert postgres_client.conn is None
+
+
+@pytest.fixture
+def mock_asyncpg_pool():
+    with patch(
+        "backend.batch.utilities.chat_history.postgresdbservice.asyncpg.create_pool",
+        new_callable=AsyncMock,
+    ) as mock_create_pool:
+        yield mock_create_pool
+
+
+@pytest.fixture
+def pool():
+    pool = PostgresPool("test_user", "test_host", "test_db")
+    yield pool
+    pool.close()
+
+
+def test_pool_is_shared_across_event_loops(pool, mock_asyncpg_pool):
+    # given
+    async def borrow():
+        connection = await pool.acquire()
+        await connection.release()
+        return connection.connection
+
+    # when
+    connections = [asyncio.run(borrow()) for _ in range(2)]
+
+    # then
+    mock_asyncpg_pool.assert_awaited_once()
+    assert mock_asyncpg_pool.call_args.kwargs["statement_cache_size"] == 100
+    assert mock_asyncpg_pool.call_args.kwargs["ssl"] is True
+    assert connections[0] is connections[1]
+    assert mock_asyncpg_pool.return_value.release.await_count == 2
+
+
+def test_close_pools_closes_every_pool(mock_asyncpg_pool):
+    # given
+    pool = PostgresPool.get("test_user", "test_host", "test_db")
+    asyncio.run(pool.acquire())
+
+    # when
+    PostgresPool.close_pools()
+
+    # then
+    mock_asyncpg_pool.return_value.close.assert_awaited_once()
+    assert not pool._thread.is_alive()
+    assert PostgresPool.get("test_user", "test_host", "test_db") is not pool
+    PostgresPool.close_pools()
+
+
+@pytest.mark.asyncio
+async def test_pooled_connection_runs_queries_on_the_pool_loop(pool, mock_asyncpg_pool):
+    # given
+    async def fetch(query, *args):
+        return threading.current_thread().name
+
+    mock_asyncpg_pool.return_value.acquire.return_value.fetch = fetch
+    connection = await pool.acquire()
+
+    # when
+    thread_name = await connection.fetch("SELECT 1")
+
+    # then
+    assert thread_name == "postgres-pool"
+
+
+@patch(
+    "backend.batch.utilities.chat_history.postgresdbservice.get_azure_credential_async"
+)
+@pytest.mark.asyncio
+async def test_pool_password_refreshes_the_token_before_it_expires(
+    mock_credential, pool, mock_asyncpg_pool
+):
+    # given
+    credential = AsyncMock()
+    credential.get_token.side_effect = [
+        MagicMock(token="first", expires_on=time.time() + 60),
+        MagicMock(token="second", expires_on=time.time() + 3600),
+    ]
+    mock_credential.return_value = credential
+    await pool.acquire()
+    password = mock_asyncpg_pool.call_args.kwargs["password"]
+
+    # when
+    passwords = [await pool.run(password()) for _ in range(3)]
+
+    # then
+    assert passwords == ["first", "second", "second"]
+    assert credential.get_token.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_creation_is_retried_after_a_failure(pool, mock_asyncpg_pool):
+    # given
+    asyncpg_pool = MagicMock()
+    asyncpg_pool.acquire = AsyncMock()
+    mock_asyncpg_pool.side_effect = [Exception("Connection error"), asyncpg_pool]
+
+    # when
+    with pytest.raises(Exception, match="Connection error"):
+        await pool.acquire()
+    connection = await pool.acquire()
+
+    # then
+    assert connection is not None
+    assert mock_asyncpg_pool.await_count == 2
 
 
 @pytest.mark.asyncio
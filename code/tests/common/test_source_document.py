@@ -102,6 +102,20 @@ def test_from_metadata_returns_sas_placeholder():
     assert source_document.page_number is None
 
 
+def test_source_from_url_strips_the_sas_token():
+    # Given
+    document_url = "https://example.blob.core.windows.net/path/to/file.txt?sv=sas"
+
+    # When
+    source = SourceDocument.source_from_url(document_url)
+
+    # Then
+    assert (
+        source
+        == "https://example.blob.core.windows.net/path/to/file.txt_SAS_TOKEN_PLACEHOLDER_"
+    )
+
+
 def test_from_metadata():
     # Given
     content = "Some content"
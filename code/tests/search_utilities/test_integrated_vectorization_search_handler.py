@@ -1,12 +1,16 @@
+import time
 import pytest
 from unittest.mock import MagicMock, Mock, patch
+from azure.core.exceptions import ResourceNotFoundError
 from backend.batch.utilities.search.integrated_vectorization_search_handler import (
     IntegratedVectorizationSearchHandler,
 )
 from azure.search.documents.models import VectorizableTextQuery
 from azure.search.documents import SearchItemPaged
 
+from backend.batch.utilities.helpers.config.vector_search_mode import VectorSearchMode
 from backend.batch.utilities.common.source_document import SourceDocument
+from backend.batch.utilities.helpers.search_index_cache import SearchIndexCache
 
 
 @pytest.fixture
@@ -17,9 +21,27 @@ def env_helper_mock():
     mock.AZURE_SEARCH_KEY = "example-key"
     mock.is_auth_type_keys = Mock(return_value=True)
     mock.AZURE_SEARCH_TOP_K = 5
+    mock.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL = 300.0
+    mock.AZURE_SEARCH_VECTOR_SEARCH_MODE = VectorSearchMode.ANN
     return mock
 
 
+@pytest.fixture(autouse=True)
+def clear_search_index_cache():
+    SearchIndexCache.clear()
+    yield
+    SearchIndexCache.clear()
+
+
+@pytest.fixture
+def search_index_client_mock():
+    with patch(
+        "backend.batch.utilities.search.integrated_vectorization_search_handler.SearchIndexClient"
+    ) as mock:
+        mock.return_value.list_index_names.return_value = ["example-index"]
+        yield mock
+
+
 @pytest.fixture
 def search_index_mock():
     with patch.object(
@@ -170,7 +192,7 @@ def test_query_search_performs_search_hybrid(handler, env_helper_mock):
         text=question,
         k_nearest_neighbors=env_helper_mock.AZURE_SEARCH_TOP_K,
         fields="content_vector",
-        exhaustive=True,
+        exhaustive=False,
     )
 
     # when
@@ -193,7 +215,7 @@ def test_query_search_performs_search_semantic(handler, env_helper_mock):
         text=question,
         k_nearest_neighbors=env_helper_mock.AZURE_SEARCH_TOP_K,
         fields="content_vector",
-        exhaustive=True,
+        exhaustive=False,
     )
 
     # when
@@ -212,6 +234,45 @@ def test_query_search_performs_search_semantic(handler, env_helper_mock):
     )
 
 
+def test_query_search_performs_exhaustive_search_when_configured(
+    handler, env_helper_mock
+):
+    # given
+    env_helper_mock.AZURE_SEARCH_USE_SEMANTIC_SEARCH = False
+    env_helper_mock.AZURE_SEARCH_VECTOR_SEARCH_MODE = VectorSearchMode.EXHAUSTIVE
+
+    # when
+    handler.query_search("test question")
+
+    # then
+    vector_query = handler.search_client.search.call_args.kwargs["vector_queries"][0]
+    assert vector_query.exhaustive is True
+
+
+def test_vector_search_returns_ids_of_nearest_chunks(handler):
+    # given
+    handler.search_client.search.return_value = [{"id": "1"}, {"id": "2"}]
+
+    # when
+    ids = handler.vector_search("test question", 2, exhaustive=True)
+
+    # then
+    assert ids == ["1", "2"]
+    handler.search_client.search.assert_called_once_with(
+        search_text=None,
+        vector_queries=[
+            VectorizableTextQuery(
+                text="test question",
+                k_nearest_neighbors=2,
+                fields="content_vector",
+                exhaustive=True,
+            )
+        ],
+        select=["id"],
+        top=2,
+    )
+
+
 def test_query_search_converts_results_to_source_documents(handler):
     # given
     question = "test question"
@@ -288,3 +349,66 @@ def test_delete_from_index(env_helper_mock, handler, search_client_mock):
         filter=f"title eq '{title}'",
     )
     search_client_mock.delete_documents.assert_called_once_with(ids_to_delete)
+
+
+def test_check_index_exists_lists_indexes_once_per_ttl(
+    env_helper_mock, search_client_mock, search_index_client_mock
+):
+    # given
+    handler = IntegratedVectorizationSearchHandler(env_helper_mock)
+
+    # when
+    for _ in range(3):
+        handler.query_search("test question")
+    handler.get_files()
+
+    # then
+    search_index_client_mock.return_value.list_index_names.assert_called_once()
+
+
+def test_query_search_invalidates_cached_index_when_not_found(
+    env_helper_mock, search_client_mock, search_index_client_mock
+):
+    # given
+    handler = IntegratedVectorizationSearchHandler(env_helper_mock)
+    handler.search_client.search.side_effect = ResourceNotFoundError("not found")
+
+    # when
+    with pytest.raises(ResourceNotFoundError):
+        handler.query_search("test question")
+
+    # then
+    assert (
+        SearchIndexCache.get(env_helper_mock.AZURE_SEARCH_SERVICE, "example-index")
+        is None
+    )
+
+
+@pytest.mark.azure
+def test_benchmark_query_search_latency_with_cached_index_state(
+    env_helper_mock, search_client_mock, search_index_client_mock
+):
+    """Micro-benchmark of the chat search path with and without the cached index state."""
+    # Stands in for the round trip to list the indexes of the search service
+    search_index_client_mock.return_value.list_index_names.side_effect = lambda: (
+        time.sleep(0.05) or ["example-index"]
+    )
+    search_client_mock.return_value.search.return_value = []
+    questions = 20
+
+    for ttl in [0.0, 300.0]:
+        SearchIndexCache.clear()
+        env_helper_mock.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL = ttl
+        handler = IntegratedVectorizationSearchHandler(env_helper_mock)
+
+        start_time = time.perf_counter()
+        for _ in range(questions):
+            handler.query_search("test question")
+        elapsed = time.perf_counter() - start_time
+
+        print(
+            f"TTL {ttl:.0f}s: {elapsed / questions * 1000:.1f}ms per question, "
+            f"{search_index_client_mock.return_value.list_index_names.call_count} "
+            "index listings"
+        )
+        search_index_client_mock.return_value.list_index_names.reset_mock()
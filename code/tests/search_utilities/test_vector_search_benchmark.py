@@ -0,0 +1,93 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.batch.utilities.search.vector_search_benchmark import (
+    load_questions,
+    recall_at_k,
+    run_benchmark,
+    summarize_latencies,
+)
+
+
+@pytest.mark.parametrize(
+    "expected,actual,k,recall",
+    [
+        (["1", "2", "3"], ["3", "2", "1"], 3, 1.0),
+        (["1", "2", "3"], ["1", "4", "5"], 3, 1 / 3),
+        (["1", "2", "3", "4"], ["1", "2", "4"], 2, 1.0),
+        ([], [], 3, 1.0),
+    ],
+)
+def test_recall_at_k(expected, actual, k, recall):
+    assert recall_at_k(expected, actual, k) == pytest.approx(recall)
+
+
+def test_summarize_latencies():
+    # when
+    summary = summarize_latencies([i / 1000 for i in range(1, 101)])
+
+    # then
+    assert summary["mean_ms"] == pytest.approx(50.5)
+    assert summary["p50_ms"] == pytest.approx(50)
+    assert summary["p95_ms"] == pytest.approx(95)
+
+
+def test_run_benchmark_compares_ann_with_exhaustive_results():
+    # given
+    def search(question, k, exhaustive):
+        if exhaustive or question == "exact":
+            return ["1", "2"]
+        return ["1", "3"]
+
+    search_mock = MagicMock(side_effect=search)
+
+    # when
+    report = run_benchmark(search_mock, ["exact", "approximate"], k=2, runs=2)
+
+    # then
+    assert search_mock.call_count == 8
+    assert report["questions"] == 2
+    assert report["recall_at_k"] == pytest.approx(0.75)
+    assert report["min_recall_at_k"] == pytest.approx(0.5)
+    assert set(report["ann"]) == {"mean_ms", "p50_ms", "p95_ms"}
+    assert set(report["exhaustive"]) == {"mean_ms", "p50_ms", "p95_ms"}
+
+
+def test_run_benchmark_alternates_which_mode_runs_first():
+    # given
+    search_mock = MagicMock(return_value=["1"])
+
+    # when
+    run_benchmark(search_mock, ["question"], k=1, runs=2)
+
+    # then
+    assert [call.args[2] for call in search_mock.call_args_list] == [
+        False,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_run_benchmark_raises_without_questions():
+    with pytest.raises(ValueError):
+        run_benchmark(MagicMock(), [], k=5)
+
+
+def test_load_questions_from_json_and_json_lines(tmp_path):
+    # given
+    json_path = tmp_path / "questions.json"
+    json_path.write_text(json.dumps({"questions": ["first", "second"]}))
+    jsonl_path = tmp_path / "dataset.jsonl"
+    jsonl_path.write_text(
+        json.dumps({"query": "first", "ground_truth": ""})
+        + "\n"
+        + json.dumps({"query": "second", "ground_truth": ""})
+        + "\n"
+    )
+
+    # then
+    assert load_questions(str(json_path)) == ["first", "second"]
+    assert load_questions(str(jsonl_path)) == ["first", "second"]
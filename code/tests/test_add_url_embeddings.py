@@ -1,7 +1,9 @@
+import json
 import sys
 import os
-from unittest.mock import ANY, MagicMock, patch
+from unittest.mock import ANY, MagicMock, call, patch
 import azure.functions as func
+import pytest
 
 
 sys.path.append(os.path.join(os.path.dirname(sys.path[0]), "backend", "batch"))
@@ -141,3 +143,134 @@ def test_add_url_embeddings_integrated_vectorization_returns_500_when_exception_
         b"Error occurred while adding https://example.com to the knowledge base."
         in response.get_body()
     )
+
+
+def bulk_request(urls) -> func.HttpRequest:
+    return func.HttpRequest(
+        method="POST",
+        url="",
+        body=json.dumps({"urls": urls}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+
+
+@pytest.fixture
+def mock_url_fetcher():
+    with patch("backend.batch.add_url_embeddings.UrlFetcher") as mock:
+        responses = {}
+
+        async def fetch_all(urls):
+            for url in urls:
+                yield (url, *responses.get(url, (b"<p>content</p>", None)))
+
+        mock.create.return_value.fetch_all.side_effect = fetch_all
+        mock.responses = responses
+        yield mock
+
+
+@patch("backend.batch.add_url_embeddings.EmbedderFactory")
+def test_add_url_embeddings_bulk_dedupes_and_reports_status_per_url(
+    mock_embedder_factory: MagicMock, mock_url_fetcher: MagicMock
+):
+    # given
+    mock_url_fetcher.responses["https://example.com/missing"] = (None, "HTTP 404")
+    urls = [
+        "https://example.com/page",
+        "HTTPS://Example.com:443/page#section",
+        "not a url",
+        "https://example.com/missing",
+    ]
+    mock_embedder_instance = mock_embedder_factory.create.return_value
+
+    # when
+    response = add_url_embeddings.build().get_user_function()(bulk_request(urls))
+
+    # then
+    assert response.status_code == 200
+    report = json.loads(response.get_body())
+    assert [result["status"] for result in report["results"]] == [
+        "succeeded",
+        "duplicate",
+        "failed",
+        "failed",
+    ]
+    assert report["results"][3]["message"] == "HTTP 404"
+    assert report["succeeded"] == 1
+    assert report["failed"] == 2
+    mock_url_fetcher.create.return_value.fetch_all.assert_called_once_with(
+        ["https://example.com/page", "https://example.com/missing"]
+    )
+    mock_embedder_factory.create.assert_called_once()
+    mock_embedder_instance.embed_documents.assert_called_once_with(
+        "https://example.com/page", ".url", ANY
+    )
+    documents = mock_embedder_instance.embed_documents.call_args[0][2]
+    assert [document.content for document in documents] == ["content"]
+
+
+@patch("backend.batch.add_url_embeddings.EmbedderFactory")
+def test_add_url_embeddings_bulk_continues_after_failed_url(
+    mock_embedder_factory: MagicMock, mock_url_fetcher: MagicMock
+):
+    # given
+    urls = ["https://example.com/1", "https://example.com/2"]
+    mock_embedder_instance = mock_embedder_factory.create.return_value
+    mock_embedder_instance.embed_documents.side_effect = [
+        Exception("Test exception"),
+        None,
+    ]
+
+    # when
+    response = add_url_embeddings.build().get_user_function()(bulk_request(urls))
+
+    # then
+    assert response.status_code == 200
+    report = json.loads(response.get_body())
+    assert report["results"] == [
+        {
+            "url": "https://example.com/1",
+            "canonical_url": "https://example.com/1",
+            "status": "failed",
+            "message": "Test exception",
+        },
+        {
+            "url": "https://example.com/2",
+            "canonical_url": "https://example.com/2",
+            "status": "succeeded",
+        },
+    ]
+
+
+@patch("backend.batch.add_url_embeddings.EnvHelper")
+@patch("backend.batch.add_url_embeddings.AzureBlobStorageClient")
+def test_add_url_embeddings_bulk_integrated_vectorization(
+    mock_blob_storage_client: MagicMock,
+    mock_env_helper: MagicMock,
+    mock_url_fetcher: MagicMock,
+):
+    # given
+    urls = ["https://example.com/1", "https://example.com/2"]
+    mock_env_helper.return_value.AZURE_SEARCH_USE_INTEGRATED_VECTORIZATION = True
+    mock_blob_storage_client_instance = mock_blob_storage_client.return_value
+
+    # when
+    response = add_url_embeddings.build().get_user_function()(bulk_request(urls))
+
+    # then
+    assert response.status_code == 200
+    assert json.loads(response.get_body())["succeeded"] == 2
+    mock_blob_storage_client_instance.upload_file.assert_has_calls(
+        [
+            call(ANY, url, metadata={"title": url})
+            for url in ["https://example.com/1", "https://example.com/2"]
+        ]
+    )
+
+
+@pytest.mark.parametrize("urls", [[], "https://example.com", [1]])
+def test_add_url_embeddings_bulk_returns_400_when_urls_are_invalid(urls):
+    # when
+    response = add_url_embeddings.build().get_user_function()(bulk_request(urls))
+
+    # then
+    assert response.status_code == 400
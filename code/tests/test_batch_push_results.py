@@ -9,15 +9,19 @@ from backend.batch.batch_push_results import (
 
 
 @pytest.fixture(autouse=True)
-def get_processor_handler_mock():
-    with patch(
-        "backend.batch.batch_push_results.EmbedderFactory.create"
-    ) as mock_create_embedder, patch(
-        "backend.batch.batch_push_results.Search.get_search_handler"
-    ) as mock_get_search_handler:
-        processor_handler_create = mock_create_embedder.return_value
-        processor_handler_get_search_handler = mock_get_search_handler.return_value
-        yield processor_handler_create, processor_handler_get_search_handler
+def worker_cache_mock():
+    with patch("backend.batch.batch_push_results.WorkerCache") as mock:
+        worker_cache = mock.return_value
+        worker_cache.take_setup_seconds_saved.return_value = 0.0
+        yield worker_cache
+
+
+@pytest.fixture
+def get_processor_handler_mock(worker_cache_mock):
+    yield (
+        worker_cache_mock.get_embedder.return_value,
+        worker_cache_mock.get_search_handler.return_value,
+    )
 
 
 def test_get_file_name_from_message():
@@ -89,11 +93,8 @@ def test_batch_push_results_with_blob_deleted_event(
     mock_process_document_deleted_event.assert_called_once_with(expected_message_body)
 
 
-@patch("backend.batch.batch_push_results.EnvHelper")
-@patch("backend.batch.batch_push_results.AzureBlobStorageClient")
 def test_batch_push_results_with_blob_created_event_uses_embedder(
-    mock_azure_blob_storage_client,
-    mock_env_helper,
+    worker_cache_mock,
     get_processor_handler_mock,
 ):
     mock_create_embedder, mock_get_search_handler = get_processor_handler_mock
@@ -102,7 +103,7 @@ def test_batch_push_results_with_blob_created_event_uses_embedder(
         body='{"eventType": "Microsoft.Storage.BlobCreated", "filename": "test/test/test_filename.md"}'
     )
 
-    mock_blob_client_instance = mock_azure_blob_storage_client.return_value
+    mock_blob_client_instance = worker_cache_mock.get_blob_client.return_value
     mock_blob_client_instance.get_blob_sas.return_value = "test_blob_sas"
 
     batch_push_results.build().get_user_function()(mock_queue_message)
@@ -111,9 +112,7 @@ def test_batch_push_results_with_blob_created_event_uses_embedder(
     )
 
 
-@patch("backend.batch.batch_push_results.EnvHelper")
 def test_batch_push_results_with_blob_deleted_event_uses_search_to_delete_with_sas_appended(
-    mock_env_helper,
     get_processor_handler_mock,
 ):
     mock_create_embedder, mock_get_search_handler = get_processor_handler_mock
@@ -8,6 +8,7 @@ def env_helper_mock():
     with patch("backend.batch.batch_start_processing.EnvHelper") as mock:
         env_helper = mock.return_value
         env_helper.AZURE_SEARCH_INDEXER_NAME = "AZURE_SEARCH_INDEXER_NAME"
+        env_helper.BATCH_START_PROCESSING_CONCURRENCY = 4
 
         yield env_helper
 
@@ -31,10 +32,10 @@ def test_batch_start_processing_processes_all(
 
     mock_queue_client = Mock()
     mock_create_queue_client.return_value = mock_queue_client
-    mock_blob_storage_client.return_value.get_all_files.return_value = [
-        {"filename": "file_name_one", "embeddings_added": False},
-        {"filename": "file_name_two", "embeddings_added": True},
-    ]
+    mock_blob_storage_client.return_value.get_files_to_process.return_value = (
+        ["file_name_one", "file_name_two"],
+        0,
+    )
     env_helper_mock.AZURE_SEARCH_USE_INTEGRATED_VECTORIZATION = False
     # when
     response = batch_start_processing.build().get_user_function()(mock_http_request)
@@ -43,10 +44,84 @@ def test_batch_start_processing_processes_all(
     assert response.status_code == 200
     assert response.get_body() == b"Conversion started successfully for 2 documents."
 
+    mock_blob_storage_client.return_value.get_files_to_process.assert_called_once_with(
+        only_changed=False
+    )
     send_message_calls = mock_queue_client.send_message.call_args_list
     assert len(send_message_calls) == 2
-    assert send_message_calls[0] == call(b'{"filename": "file_name_one"}')
-    assert send_message_calls[1] == call(b'{"filename": "file_name_two"}')
+    mock_queue_client.send_message.assert_has_calls(
+        [
+            call(b'{"filename": "file_name_one"}'),
+            call(b'{"filename": "file_name_two"}'),
+        ],
+        any_order=True,
+    )
+
+
+@patch("backend.batch.batch_start_processing.create_queue_client")
+@patch("backend.batch.batch_start_processing.AzureBlobStorageClient")
+def test_batch_start_processing_delta_enqueues_only_changed_files(
+    mock_blob_storage_client, mock_create_queue_client, env_helper_mock
+):
+    # given
+    mock_http_request = Mock()
+    mock_http_request.params = {"delta": "true"}
+
+    mock_queue_client = mock_create_queue_client.return_value
+    mock_blob_storage_client.return_value.get_files_to_process.return_value = (
+        ["file_name_one"],
+        2,
+    )
+    env_helper_mock.AZURE_SEARCH_USE_INTEGRATED_VECTORIZATION = False
+
+    # when
+    response = batch_start_processing.build().get_user_function()(mock_http_request)
+
+    # then
+    assert response.status_code == 200
+    assert response.get_body() == (
+        b"Conversion started successfully for 1 documents. "
+        b"Skipped 2 unchanged documents."
+    )
+    mock_blob_storage_client.return_value.get_files_to_process.assert_called_once_with(
+        only_changed=True
+    )
+    mock_queue_client.send_message.assert_called_once_with(
+        b'{"filename": "file_name_one"}'
+    )
+
+
+@patch("backend.batch.batch_start_processing.create_queue_client")
+@patch("backend.batch.batch_start_processing.AzureBlobStorageClient")
+def test_batch_start_processing_reports_files_that_failed_to_enqueue(
+    mock_blob_storage_client, mock_create_queue_client, env_helper_mock
+):
+    # given
+    mock_http_request = Mock()
+    mock_http_request.params = dict()
+
+    def send_message(message):
+        if b"file_name_two" in message:
+            raise Exception("Test exception")
+
+    mock_queue_client = mock_create_queue_client.return_value
+    mock_queue_client.send_message.side_effect = send_message
+    mock_blob_storage_client.return_value.get_files_to_process.return_value = (
+        ["file_name_one", "file_name_two", "file_name_three"],
+        0,
+    )
+    env_helper_mock.AZURE_SEARCH_USE_INTEGRATED_VECTORIZATION = False
+
+    # when
+    response = batch_start_processing.build().get_user_function()(mock_http_request)
+
+    # then
+    assert response.status_code == 500
+    assert response.get_body() == (
+        b"Conversion started successfully for 2 documents. "
+        b"Failed to start conversion for 1 documents."
+    )
+    assert mock_queue_client.send_message.call_count == 3
 
 
 @patch("backend.batch.batch_start_processing.create_queue_client")
@@ -81,4 +156,28 @@ def test_batch_start_processing_processes_all_integrated_vectorization(
 
     send_message_calls = mock_queue_client.send_message.call_args_list
     assert len(send_message_calls) == 0
-    mock_integrated_vectorization_embedder.return_value.reprocess_all.assert_called_once()
+    mock_integrated_vectorization_embedder.return_value.reprocess_all.assert_called_once_with(
+        reset=True
+    )
+
+
+@patch("backend.batch.batch_start_processing.AzureBlobStorageClient")
+def test_batch_start_processing_delta_runs_integrated_vectorization_incrementally(
+    mock_blob_storage_client,
+    mock_integrated_vectorization_embedder,
+    env_helper_mock,
+):
+    # given
+    mock_http_request = Mock()
+    mock_http_request.params = {"delta": "true"}
+    mock_blob_storage_client.return_value.get_all_files.return_value = []
+    env_helper_mock.AZURE_SEARCH_USE_INTEGRATED_VECTORIZATION = True
+
+    # when
+    response = batch_start_processing.build().get_user_function()(mock_http_request)
+
+    # then
+    assert response.status_code == 200
+    mock_integrated_vectorization_embedder.return_value.reprocess_all.assert_called_once_with(
+        reset=False
+    )
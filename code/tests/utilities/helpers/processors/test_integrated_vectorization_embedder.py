@@ -1,8 +1,10 @@
 import pytest
 from unittest.mock import MagicMock, patch
+from azure.core.exceptions import ResourceNotFoundError
 from backend.batch.utilities.helpers.embedders.integrated_vectorization_embedder import (
     IntegratedVectorizationEmbedder,
 )
+from backend.batch.utilities.common.source_document import SourceDocument
 from backend.batch.utilities.document_chunking.chunking_strategy import ChunkingSettings
 from backend.batch.utilities.document_loading import LoadingSettings
 from backend.batch.utilities.document_loading.strategies import LoadingStrategy
@@ -68,6 +70,24 @@ def azure_search_iv_indexer_helper_mock():
         yield mock
 
 
+@pytest.fixture(autouse=True)
+def provisioning_fingerprints_mock():
+    with patch(
+        "backend.batch.utilities.helpers.embedders.integrated_vectorization_embedder.ProvisioningFingerprints"
+    ) as mock:
+        mock.get_changed.return_value = {}
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def fingerprint_mock():
+    with patch(
+        "backend.batch.utilities.helpers.embedders.integrated_vectorization_embedder.fingerprint",
+        return_value="new-fingerprint",
+    ) as mock:
+        yield mock
+
+
 @pytest.fixture(autouse=True)
 def mock_config_helper():
     with patch(
@@ -85,9 +105,16 @@ def test_process_using_integrated_vectorization(
     azure_search_iv_datasource_helper_mock: MagicMock,
     azure_search_iv_skillset_helper_mock: MagicMock,
     azure_search_iv_indexer_helper_mock: MagicMock,
+    provisioning_fingerprints_mock: MagicMock,
     mock_config_helper,
 ):
     # given
+    provisioning_fingerprints_mock.get_changed.return_value = {
+        "datasource": None,
+        "index": None,
+        "skillset": None,
+        "indexer": None,
+    }
     document_processor = IntegratedVectorizationEmbedder(env_helper_mock)
     source_url = "https://dagrs.berkeley.edu/sites/default/files/2020-01/sample.pdf"
 
@@ -95,29 +122,137 @@ def test_process_using_integrated_vectorization(
     result = document_processor.process_using_integrated_vectorization(source_url)
 
     # then
+    search_datasource = azure_search_iv_datasource_helper_mock.return_value
+    search_index = azure_search_iv_index_helper_mock.return_value
+    search_skillset = azure_search_iv_skillset_helper_mock.return_value
+    search_indexer = azure_search_iv_indexer_helper_mock.return_value
+
     azure_search_iv_datasource_helper_mock.assert_called_once_with(env_helper_mock)
-    azure_search_iv_datasource_helper_mock.return_value.create_or_update_datasource.assert_called_once()
+    search_datasource.create_or_update_datasource.assert_called_once_with(
+        search_datasource.get_datasource.return_value
+    )
 
     azure_search_iv_index_helper_mock.assert_called_once_with(
         env_helper_mock, llm_helper_mock
     )
-    azure_search_iv_index_helper_mock.return_value.create_or_update_index.assert_called_once()
+    search_index.create_or_update_index.assert_called_once_with(
+        search_index.get_index.return_value
+    )
 
     azure_search_iv_skillset_helper_mock.assert_called_once_with(
         env_helper_mock, mock_config_helper
     )
-    azure_search_iv_skillset_helper_mock.return_value.create_skillset.assert_called_once()
+    search_skillset.create_skillset.assert_called_once_with(
+        search_skillset.get_skillset.return_value
+    )
 
     azure_search_iv_indexer_helper_mock.assert_called_once_with(env_helper_mock)
-    azure_search_iv_indexer_helper_mock.return_value.create_or_update_indexer.assert_called_once()
+    search_indexer.get_indexer.assert_called_once_with(
+        AZURE_SEARCH_INDEXER_NAME,
+        skillset_name=search_skillset.get_skillset.return_value.name,
+    )
+    search_indexer.create_or_update_indexer.assert_called_once_with(
+        AZURE_SEARCH_INDEXER_NAME,
+        skillset_name=search_skillset.get_skillset.return_value.name,
+        indexer=search_indexer.get_indexer.return_value,
+        run=False,
+    )
+    search_indexer.run_indexer.assert_called_once_with(
+        AZURE_SEARCH_INDEXER_NAME, reset=False
+    )
+    provisioning_fingerprints_mock.set_provisioned.assert_called_once_with(
+        {
+            "datasource": "new-fingerprint",
+            "index": "new-fingerprint",
+            "skillset": "new-fingerprint",
+            "indexer": "new-fingerprint",
+        }
+    )
+
+    assert result == search_indexer.create_or_update_indexer.return_value
+    assert search_skillset.get_skillset.return_value.skills is not None
+
+
+def test_process_using_integrated_vectorization_skips_unchanged_resources(
+    env_helper_mock: MagicMock,
+    azure_search_iv_index_helper_mock: MagicMock,
+    azure_search_iv_datasource_helper_mock: MagicMock,
+    azure_search_iv_skillset_helper_mock: MagicMock,
+    azure_search_iv_indexer_helper_mock: MagicMock,
+    provisioning_fingerprints_mock: MagicMock,
+):
+    # given
+    document_processor = IntegratedVectorizationEmbedder(env_helper_mock)
 
-    assert (
-        result
-        == azure_search_iv_indexer_helper_mock.return_value.create_or_update_indexer.return_value
+    # when
+    document_processor.process_using_integrated_vectorization("new-blob.pdf")
+
+    # then
+    provisioning_fingerprints_mock.get_changed.assert_called_once_with(
+        {
+            "datasource": "new-fingerprint",
+            "index": "new-fingerprint",
+            "skillset": "new-fingerprint",
+            "indexer": "new-fingerprint",
+        },
+        force=False,
+    )
+    azure_search_iv_datasource_helper_mock.return_value.create_or_update_datasource.assert_not_called()
+    azure_search_iv_index_helper_mock.return_value.create_or_update_index.assert_not_called()
+    azure_search_iv_skillset_helper_mock.return_value.create_skillset.assert_not_called()
+    azure_search_iv_indexer_helper_mock.return_value.create_or_update_indexer.assert_not_called()
+    provisioning_fingerprints_mock.set_provisioned.assert_not_called()
+    azure_search_iv_indexer_helper_mock.return_value.run_indexer.assert_called_once_with(
+        AZURE_SEARCH_INDEXER_NAME, reset=False
     )
-    assert (
-        azure_search_iv_skillset_helper_mock.return_value.create_skillset.return_value.skills
-        is not None
+
+
+def test_process_using_integrated_vectorization_resets_indexer_when_skillset_changes(
+    env_helper_mock: MagicMock,
+    azure_search_iv_datasource_helper_mock: MagicMock,
+    azure_search_iv_skillset_helper_mock: MagicMock,
+    azure_search_iv_indexer_helper_mock: MagicMock,
+    provisioning_fingerprints_mock: MagicMock,
+):
+    # given
+    provisioning_fingerprints_mock.get_changed.return_value = {
+        "skillset": "old-fingerprint"
+    }
+    document_processor = IntegratedVectorizationEmbedder(env_helper_mock)
+
+    # when
+    document_processor.process_using_integrated_vectorization("new-blob.pdf")
+
+    # then
+    azure_search_iv_skillset_helper_mock.return_value.create_skillset.assert_called_once()
+    azure_search_iv_datasource_helper_mock.return_value.create_or_update_datasource.assert_not_called()
+    provisioning_fingerprints_mock.set_provisioned.assert_called_once_with(
+        {"skillset": "new-fingerprint"}
+    )
+    azure_search_iv_indexer_helper_mock.return_value.run_indexer.assert_called_once_with(
+        AZURE_SEARCH_INDEXER_NAME, reset=True
+    )
+
+
+def test_process_using_integrated_vectorization_does_not_reset_indexer_when_datasource_changes(
+    env_helper_mock: MagicMock,
+    azure_search_iv_datasource_helper_mock: MagicMock,
+    azure_search_iv_indexer_helper_mock: MagicMock,
+    provisioning_fingerprints_mock: MagicMock,
+):
+    # given
+    provisioning_fingerprints_mock.get_changed.return_value = {
+        "datasource": "old-fingerprint"
+    }
+    document_processor = IntegratedVectorizationEmbedder(env_helper_mock)
+
+    # when
+    document_processor.process_using_integrated_vectorization("new-blob.pdf")
+
+    # then
+    azure_search_iv_datasource_helper_mock.return_value.create_or_update_datasource.assert_called_once()
+    azure_search_iv_indexer_helper_mock.return_value.run_indexer.assert_called_once_with(
+        AZURE_SEARCH_INDEXER_NAME, reset=False
     )
 
 
@@ -140,11 +275,28 @@ def test_reprocess_all_runs_indexer_when_indexer_exists(
 
     # Then
     azure_search_iv_indexer_helper_mock.return_value.run_indexer.assert_called_once_with(
-        env_helper_mock.AZURE_SEARCH_INDEXER_NAME
+        env_helper_mock.AZURE_SEARCH_INDEXER_NAME, reset=True
     )
     azure_search_iv_indexer_helper_mock.return_value.create_or_update_indexer.assert_not_called()
 
 
+def test_reprocess_all_runs_indexer_without_reset(
+    env_helper_mock: MagicMock,
+    azure_search_iv_indexer_helper_mock: MagicMock,
+):
+    # Given
+    azure_search_iv_indexer_helper_mock.return_value.indexer_exists.return_value = True
+
+    # When
+    embedder = IntegratedVectorizationEmbedder(env_helper_mock)
+    embedder.reprocess_all(reset=False)
+
+    # Then
+    azure_search_iv_indexer_helper_mock.return_value.run_indexer.assert_called_once_with(
+        env_helper_mock.AZURE_SEARCH_INDEXER_NAME, reset=False
+    )
+
+
 def test_reprocess_all_calls_process_using_integrated_vectorization_when_indexer_does_not_exist(
     env_helper_mock: MagicMock,
     llm_helper_mock: MagicMock,
@@ -152,15 +304,94 @@ def test_reprocess_all_calls_process_using_integrated_vectorization_when_indexer
     azure_search_iv_datasource_helper_mock: MagicMock,
     azure_search_iv_skillset_helper_mock: MagicMock,
     azure_search_iv_indexer_helper_mock: MagicMock,
+    provisioning_fingerprints_mock: MagicMock,
     mock_config_helper,
 ):
     # Given
     azure_search_iv_indexer_helper_mock.return_value.indexer_exists.return_value = False
+    provisioning_fingerprints_mock.get_changed.return_value = {"indexer": None}
 
     # When
     embedder = IntegratedVectorizationEmbedder(env_helper_mock)
     embedder.reprocess_all()
 
     # Then
-    azure_search_iv_indexer_helper_mock.return_value.run_indexer.assert_not_called()
+    assert provisioning_fingerprints_mock.get_changed.call_args.kwargs["force"] is True
     azure_search_iv_indexer_helper_mock.return_value.create_or_update_indexer.assert_called_once()
+    azure_search_iv_indexer_helper_mock.return_value.run_indexer.assert_called_once_with(
+        env_helper_mock.AZURE_SEARCH_INDEXER_NAME, reset=False
+    )
+
+
+def test_process_using_integrated_vectorization_reprovisions_when_indexer_is_missing(
+    env_helper_mock: MagicMock,
+    azure_search_iv_index_helper_mock: MagicMock,
+    azure_search_iv_indexer_helper_mock: MagicMock,
+    provisioning_fingerprints_mock: MagicMock,
+):
+    # given
+    provisioning_fingerprints_mock.get_changed.side_effect = [
+        {},
+        {"index": "new-fingerprint", "indexer": "new-fingerprint"},
+    ]
+    search_indexer = azure_search_iv_indexer_helper_mock.return_value
+    search_indexer.run_indexer.side_effect = [
+        ResourceNotFoundError("Indexer not found"),
+        None,
+    ]
+    document_processor = IntegratedVectorizationEmbedder(env_helper_mock)
+
+    # when
+    document_processor.process_using_integrated_vectorization("new-blob.pdf")
+
+    # then
+    provisioning_fingerprints_mock.clear.assert_called_once_with()
+    assert provisioning_fingerprints_mock.get_changed.call_args.kwargs["force"] is True
+    azure_search_iv_index_helper_mock.return_value.create_or_update_index.assert_called_once()
+    search_indexer.create_or_update_indexer.assert_called_once()
+    assert search_indexer.run_indexer.call_count == 2
+
+
+def test_process_using_integrated_vectorization_raises_when_indexer_is_still_missing(
+    env_helper_mock: MagicMock,
+    azure_search_iv_indexer_helper_mock: MagicMock,
+    provisioning_fingerprints_mock: MagicMock,
+):
+    # given
+    search_indexer = azure_search_iv_indexer_helper_mock.return_value
+    search_indexer.run_indexer.side_effect = ResourceNotFoundError("Indexer not found")
+    document_processor = IntegratedVectorizationEmbedder(env_helper_mock)
+
+    # when
+    with pytest.raises(ResourceNotFoundError):
+        document_processor.process_using_integrated_vectorization("new-blob.pdf")
+
+    # then
+    assert search_indexer.run_indexer.call_count == 2
+
+
+def test_embed_documents_uploads_loaded_documents_and_runs_indexer(
+    env_helper_mock: MagicMock,
+    azure_search_iv_indexer_helper_mock: MagicMock,
+):
+    # given
+    blob_client = MagicMock()
+    embedder = IntegratedVectorizationEmbedder(env_helper_mock, blob_client)
+    documents = [
+        SourceDocument(content="first page", source="https://example.com/page"),
+        SourceDocument(content="second page", source="https://example.com/page"),
+    ]
+
+    # when
+    embedder.embed_documents("https://example.com/page", ".url", documents)
+
+    # then
+    blob_client.upload_file.assert_called_once_with(
+        b"first page\n\nsecond page",
+        "https://example.com/page",
+        content_type="text/plain; charset=utf-8",
+        metadata={"title": "https://example.com/page"},
+    )
+    azure_search_iv_indexer_helper_mock.return_value.run_indexer.assert_called_once_with(
+        AZURE_SEARCH_INDEXER_NAME, reset=False
+    )
@@ -0,0 +1,258 @@
+from io import BytesIO
+from pathlib import Path
+from typing import List, Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import (
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+)
+
+from backend.batch.utilities.document_loading.auto import AutoDocumentLoading
+from backend.batch.utilities.document_loading.strategies import get_document_loader
+
+DOCUMENT_URL = "https://example.com/sample.pdf"
+
+
+def create_pdf(pages: List[tuple]) -> bytes:
+    """Builds a PDF with a page for each (content stream, with_image) tuple."""
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for content, with_image in pages:
+        page = writer.add_blank_page(612, 792)
+        resources = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        if with_image:
+            image = DecodedStreamObject()
+            image.set_data(b"\x00")
+            image.update(
+                {
+                    NameObject("/Type"): NameObject("/XObject"),
+                    NameObject("/Subtype"): NameObject("/Image"),
+                    NameObject("/Width"): NumberObject(1),
+                    NameObject("/Height"): NumberObject(1),
+                    NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+                    NameObject("/BitsPerComponent"): NumberObject(8),
+                }
+            )
+            resources[NameObject("/XObject")] = DictionaryObject(
+                {NameObject("/Im1"): writer._add_object(image)}
+            )
+            content += b" q 612 0 0 792 0 0 cm /Im1 Do Q"
+        contents = DecodedStreamObject()
+        contents.set_data(content)
+        page[NameObject("/Resources")] = resources
+        page[NameObject("/Contents")] = writer._add_object(contents)
+    file = BytesIO()
+    writer.write(file)
+    return file.getvalue()
+
+
+def text_page(heading: Optional[str], lines: List[str]) -> bytes:
+    content = b""
+    if heading:
+        content += f"BT /F1 20 Tf 72 720 Td ({heading}) Tj ET ".encode()
+    content += b"BT /F1 11 Tf 72 690 Td 14 TL"
+    for line in lines:
+        content += f" ({line}) Tj T*".encode()
+    return content + b" ET"
+
+
+LONG_LINES = [
+    f"Line {i} of the text layer of this born-digital page." for i in range(8)
+]
+
+
+@pytest.fixture(autouse=True)
+def env_helper_mock():
+    with patch("backend.batch.utilities.document_loading.auto.EnvHelper") as mock:
+        env_helper = mock.return_value
+        env_helper.PDF_TEXT_LAYER_MIN_CHARACTERS = 200
+        yield env_helper
+
+
+@pytest.fixture
+def download_document_mock():
+    with patch(
+        "backend.batch.utilities.document_loading.auto.download_document"
+    ) as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def azure_form_recognizer_client_mock():
+    with patch(
+        "backend.batch.utilities.document_loading.auto.AzureFormRecognizerClient"
+    ) as mock:
+        mock.return_value.analyze_pages.side_effect = lambda url, pages: {
+            page_number: f"<p>analyzed page {page_number}</p> " for page_number in pages
+        }
+        yield mock.return_value
+
+
+@pytest.fixture(autouse=True)
+def document_analysis_cache_mock():
+    with patch(
+        "backend.batch.utilities.document_loading.auto.DocumentAnalysisCache"
+    ) as mock:
+        mock.get_instance.return_value.get_or_analyze.side_effect = (
+            lambda url, model_id, analyze: analyze()
+        )
+        yield mock.get_instance.return_value
+
+
+@pytest.fixture
+def layout_document_loading_mock():
+    with patch(
+        "backend.batch.utilities.document_loading.auto.LayoutDocumentLoading"
+    ) as mock:
+        yield mock.return_value
+
+
+def test_load_uses_text_layer_of_born_digital_pages(
+    download_document_mock: MagicMock, azure_form_recognizer_client_mock: MagicMock
+):
+    # given
+    download_document_mock.return_value = create_pdf(
+        [
+            (text_page("Introduction", LONG_LINES), True),
+            (text_page(None, LONG_LINES), False),
+        ]
+    )
+
+    # when
+    documents = AutoDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    azure_form_recognizer_client_mock.analyze_pages.assert_not_called()
+    assert len(documents) == 2
+    assert documents[0].content == (
+        "<h2>Introduction</h2>\n<p>" + "\n".join(LONG_LINES) + "</p>\n "
+    )
+    assert documents[1].content == "<p>" + "\n".join(LONG_LINES) + "</p>\n "
+    assert [document.page_number for document in documents] == [0, 1]
+
+
+def test_load_analyzes_only_scanned_pages(
+    download_document_mock: MagicMock,
+    azure_form_recognizer_client_mock: MagicMock,
+    document_analysis_cache_mock: MagicMock,
+):
+    # given
+    download_document_mock.return_value = create_pdf(
+        [
+            (text_page(None, LONG_LINES), False),
+            (text_page(None, ["Figure 1"]), True),
+            (text_page(None, LONG_LINES), True),
+            (b"", True),
+        ]
+    )
+
+    # when
+    documents = AutoDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    azure_form_recognizer_client_mock.analyze_pages.assert_called_once_with(
+        DOCUMENT_URL, [2, 4]
+    )
+    assert document_analysis_cache_mock.get_or_analyze.call_args[0][1] == (
+        "prebuilt-layout/pages=2,4"
+    )
+    assert [document.content for document in documents[1::2]] == [
+        "<p>analyzed page 2</p> ",
+        "<p>analyzed page 4</p> ",
+    ]
+    offset = 0
+    for page_number, document in enumerate(documents):
+        assert document.page_number == page_number
+        assert document.offset == offset
+        offset += len(document.content)
+
+
+def test_load_analyzes_pages_with_unreadable_text(
+    download_document_mock: MagicMock, azure_form_recognizer_client_mock: MagicMock
+):
+    # given
+    # Glyphs without a character mapping are extracted as control characters
+    unreadable_page = b"BT /F1 11 Tf 72 690 Td <0102030405060708090a0b0c0d0e0f> Tj ET"
+    download_document_mock.return_value = create_pdf(
+        [(text_page(None, LONG_LINES), False), (unreadable_page, False)]
+    )
+
+    # when
+    AutoDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    azure_form_recognizer_client_mock.analyze_pages.assert_called_once_with(
+        DOCUMENT_URL, [2]
+    )
+
+
+def test_load_uses_layout_when_every_page_is_scanned(
+    download_document_mock: MagicMock,
+    layout_document_loading_mock: MagicMock,
+    azure_form_recognizer_client_mock: MagicMock,
+):
+    # given
+    download_document_mock.return_value = create_pdf([(b"", True), (b"", True)])
+
+    # when
+    documents = AutoDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    azure_form_recognizer_client_mock.analyze_pages.assert_not_called()
+    layout_document_loading_mock.load.assert_called_once_with(DOCUMENT_URL)
+    assert documents == layout_document_loading_mock.load.return_value
+
+
+def test_load_uses_layout_when_document_is_not_a_pdf(
+    download_document_mock: MagicMock, layout_document_loading_mock: MagicMock
+):
+    # given
+    download_document_mock.return_value = b"\x89PNG\r\n\x1a\n"
+
+    # when
+    documents = AutoDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    layout_document_loading_mock.load.assert_called_once_with(DOCUMENT_URL)
+    assert documents == layout_document_loading_mock.load.return_value
+
+
+def test_load_sample_document_offline(
+    download_document_mock: MagicMock, azure_form_recognizer_client_mock: MagicMock
+):
+    # given
+    sample_document = Path(__file__).parents[4] / "data" / "employee_handbook.pdf"
+    download_document_mock.return_value = sample_document.read_bytes()
+
+    # when
+    documents = AutoDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    # Only the cover page, an image with a title, is analyzed
+    azure_form_recognizer_client_mock.analyze_pages.assert_called_once_with(
+        DOCUMENT_URL, [1]
+    )
+    assert len(documents) == 11
+    assert "<h2>" in documents[2].content
+    assert "Contoso Electronics is a leader in the aerospace industry" in (
+        documents[2].content
+    )
+
+
+def test_get_document_loader_returns_auto_loader():
+    assert isinstance(get_document_loader("auto"), AutoDocumentLoading)
@@ -4,9 +4,12 @@ Tests focus on actual business logic: file operations, SAS generation, metadata
 and authentication modes (key-based vs RBAC).
 """
 
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 
 import pytest
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceModifiedError, ResourceNotFoundError
 
 from backend.batch.utilities.helpers.azure_blob_storage_client import (
     AzureBlobStorageClient,
@@ -508,6 +511,119 @@ class TestMetadataOperations:
         assert updated_metadata['to_update'] == "new_value"
         assert updated_metadata['new_key'] == "new_value"
 
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.BlobServiceClient")
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.AzureNamedKeyCredential")
+    def test_get_file_etag(self, mock_credential_class, mock_blob_service_class, mock_env_helper):
+        """Test get_file_etag returns the ETag of the blob, or None when it does not exist."""
+        mock_blob_client = Mock()
+        mock_blob_client.get_blob_properties.return_value.etag = "etag"
+        mock_blob_service = Mock()
+        mock_blob_service.get_blob_client.return_value = mock_blob_client
+        mock_blob_service_class.return_value = mock_blob_service
+
+        client = AzureBlobStorageClient()
+
+        assert client.get_file_etag("active.json", container_name="config") == "etag"
+        mock_blob_service.get_blob_client.assert_called_once_with(container="config", blob="active.json")
+
+        mock_blob_client.get_blob_properties.side_effect = ResourceNotFoundError("not found")
+        assert client.get_file_etag("active.json") is None
+
+
+def create_blob(name, metadata=None, content_md5=None, last_modified=None):
+    blob = Mock()
+    blob.name = name
+    blob.metadata = metadata
+    blob.content_settings.content_md5 = content_md5
+    blob.last_modified = last_modified
+    return blob
+
+
+class TestDeltaProcessing:
+    """Tests for detecting the files that changed since they were indexed."""
+
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.BlobServiceClient")
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.AzureNamedKeyCredential")
+    def test_is_unchanged_since_indexed_compares_content_md5(self, mock_credential_class, mock_blob_service_class, mock_env_helper):
+        """Test blobs with an MD5 are unchanged only when it matches the indexed one."""
+        client = AzureBlobStorageClient()
+        metadata = {"embeddings_added": "true", "indexed_content_md5": "0102"}
+
+        assert client.is_unchanged_since_indexed(create_blob("a.pdf", metadata, bytearray(b"\x01\x02"))) is True
+        assert client.is_unchanged_since_indexed(create_blob("a.pdf", metadata, bytearray(b"\x03\x04"))) is False
+        assert client.is_unchanged_since_indexed(create_blob("a.pdf", {"indexed_content_md5": "0102"}, bytearray(b"\x01\x02"))) is False
+
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.BlobServiceClient")
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.AzureNamedKeyCredential")
+    def test_is_unchanged_since_indexed_is_false_without_md5(self, mock_credential_class, mock_blob_service_class, mock_env_helper):
+        """Test blobs without an MD5 are always processed again, however recently they were indexed."""
+        client = AzureBlobStorageClient()
+        indexed_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        metadata = {"embeddings_added": "true", "indexed_at": indexed_at.isoformat()}
+
+        assert client.is_unchanged_since_indexed(create_blob("a.pdf", metadata, None, indexed_at + timedelta(seconds=1))) is False
+
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.BlobServiceClient")
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.AzureNamedKeyCredential")
+    def test_get_files_to_process_skips_unchanged_files(self, mock_credential_class, mock_blob_service_class, mock_env_helper):
+        """Test get_files_to_process skips converted and, when only_changed is set, unchanged files."""
+        indexed = {"embeddings_added": "true", "indexed_content_md5": "01"}
+        mock_container_client = Mock()
+        mock_container_client.list_blobs.return_value = [
+            create_blob("new.pdf", None, bytearray(b"\x01")),
+            create_blob("unchanged.pdf", indexed, bytearray(b"\x01")),
+            create_blob("changed.pdf", indexed, bytearray(b"\x02")),
+            create_blob("converted/new.pdf.zip", None, bytearray(b"\x01")),
+        ]
+        mock_blob_service_class.return_value.get_container_client.return_value = mock_container_client
+
+        client = AzureBlobStorageClient()
+
+        assert client.get_files_to_process(only_changed=True) == (["new.pdf", "changed.pdf"], 1)
+        assert client.get_files_to_process(only_changed=False) == (["new.pdf", "unchanged.pdf", "changed.pdf"], 0)
+        mock_container_client.list_blobs.assert_called_with(include="metadata")
+
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.BlobServiceClient")
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.AzureNamedKeyCredential")
+    def test_mark_embeddings_added_records_indexed_version(self, mock_credential_class, mock_blob_service_class, mock_env_helper):
+        """Test mark_embeddings_added records the MD5 read before indexing, conditional on that ETag."""
+        mock_properties = Mock()
+        mock_properties.metadata = {"title": "test"}
+        mock_properties.etag = "etag"
+        mock_properties.content_settings.content_md5 = bytearray(b"\x01\x02")
+
+        mock_blob_client = Mock()
+        mock_blob_service_class.return_value.get_blob_client.return_value = mock_blob_client
+
+        client = AzureBlobStorageClient()
+        client.mark_embeddings_added("test-file.pdf", mock_properties)
+
+        mock_blob_client.get_blob_properties.assert_not_called()
+        set_metadata_call = mock_blob_client.set_blob_metadata.call_args[1]
+        assert set_metadata_call['metadata']['title'] == "test"
+        assert set_metadata_call['metadata']['embeddings_added'] == "true"
+        assert set_metadata_call['metadata']['indexed_content_md5'] == "0102"
+        assert "indexed_at" in set_metadata_call['metadata']
+        assert set_metadata_call['etag'] == "etag"
+        assert set_metadata_call['match_condition'] == MatchConditions.IfNotModified
+
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.BlobServiceClient")
+    @patch("backend.batch.utilities.helpers.azure_blob_storage_client.AzureNamedKeyCredential")
+    def test_mark_embeddings_added_ignores_blobs_modified_meanwhile(self, mock_credential_class, mock_blob_service_class, mock_env_helper):
+        """Test mark_embeddings_added leaves blobs modified since they were read unmarked."""
+        mock_properties = Mock()
+        mock_properties.metadata = {}
+        mock_properties.etag = "etag-before-indexing"
+        mock_properties.content_settings.content_md5 = None
+        mock_blob_client = Mock()
+        mock_blob_client.set_blob_metadata.side_effect = ResourceModifiedError("modified")
+        mock_blob_service_class.return_value.get_blob_client.return_value = mock_blob_client
+
+        client = AzureBlobStorageClient()
+        client.mark_embeddings_added("test-file.pdf", mock_properties)
+
+        mock_blob_client.set_blob_metadata.assert_called_once()
+
 
 class TestSASGeneration:
     """Tests for SAS token generation methods."""
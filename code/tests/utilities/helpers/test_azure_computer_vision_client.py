@@ -156,6 +156,30 @@ def test_returns_image_vectors(
     assert actual_vectors == expected_vectors
 
 
+def test_vectorize_image_bytes_sends_image_in_request_body(
+    httpserver: HTTPServer, azure_computer_vision_client: AzureComputerVisionClient
+):
+    # given
+    expected_vectors = [1.0, 2.0, 3.0]
+
+    httpserver.expect_request(
+        COMPUTER_VISION_VECTORIZE_IMAGE_PATH,
+        COMPUTER_VISION_VECTORIZE_IMAGE_REQUEST_METHOD,
+        query_string="api-version=2024-02-01&model-version=2023-04-15",
+        headers={
+            "Content-Type": "application/octet-stream",
+            "Ocp-Apim-Subscription-Key": AZURE_COMPUTER_VISION_KEY,
+        },
+        data=b"image-bytes",
+    ).respond_with_json({"modelVersion": "2022-04-11", "vector": expected_vectors})
+
+    # when
+    actual_vectors = azure_computer_vision_client.vectorize_image_bytes(b"image-bytes")
+
+    # then
+    assert actual_vectors == expected_vectors
+
+
 def test_returns_text_vectors(
     httpserver: HTTPServer, azure_computer_vision_client: AzureComputerVisionClient
 ):
@@ -5,9 +5,14 @@ and role-based HTML conversion.
 """
 
 import html
+import json
+import random
+import time
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 import pytest
+from azure.core.exceptions import HttpResponseError
 
 from backend.batch.utilities.helpers.azure_form_recognizer_helper import AzureFormRecognizerClient
 
@@ -21,6 +26,8 @@ def mock_env_helper():
         env.AZURE_FORM_RECOGNIZER_KEY = "test-key-12345"
         env.AZURE_AUTH_TYPE = "keys"
         env.MANAGED_IDENTITY_CLIENT_ID = None
+        env.AZURE_FORM_RECOGNIZER_PAGE_RANGE_SIZE = 0
+        env.AZURE_FORM_RECOGNIZER_MAX_CONCURRENCY = 2
         mock.return_value = env
         yield env
 
@@ -33,6 +40,8 @@ def mock_env_helper_rbac():
         env.AZURE_FORM_RECOGNIZER_ENDPOINT = "https://test-endpoint.cognitiveservices.azure.com/"
         env.AZURE_AUTH_TYPE = "rbac"
         env.MANAGED_IDENTITY_CLIENT_ID = "test-client-id"
+        env.AZURE_FORM_RECOGNIZER_PAGE_RANGE_SIZE = 0
+        env.AZURE_FORM_RECOGNIZER_MAX_CONCURRENCY = 2
         mock.return_value = env
         yield env
 
@@ -371,3 +380,298 @@ class TestDocumentAnalysisIntegration:
         page_text = result[0]['page_text']
         assert '<h1>' in page_text  # title role
         assert '<h2>' in page_text  # sectionHeading role
+
+
+def _legacy_page_map(client, form_recognizer_results):
+    """The character by character page assembly the span-based one replaced."""
+    offset = 0
+    page_map = []
+    roles_start = {}
+    roles_end = {}
+    for paragraph in form_recognizer_results.paragraphs:
+        para_start = paragraph.spans[0].offset
+        para_end = paragraph.spans[0].offset + paragraph.spans[0].length
+        roles_start[para_start] = paragraph.role if paragraph.role is not None else "paragraph"
+        roles_end[para_end] = paragraph.role if paragraph.role is not None else "paragraph"
+
+    for page_num, page in enumerate(form_recognizer_results.pages):
+        tables_on_page = [
+            table
+            for table in form_recognizer_results.tables
+            if table.bounding_regions[0].page_number == page_num + 1
+        ]
+        page_offset = page.spans[0].offset
+        page_length = page.spans[0].length
+        table_chars = [-1] * page_length
+        for table_id, table in enumerate(tables_on_page):
+            for span in table.spans:
+                for i in range(span.length):
+                    idx = span.offset - page_offset + i
+                    if idx >= 0 and idx < page_length:
+                        table_chars[idx] = table_id
+
+        page_text = ""
+        added_tables = set()
+        for idx, table_id in enumerate(table_chars):
+            if table_id == -1:
+                position = page_offset + idx
+                if position in roles_start.keys():
+                    html_role = client.form_recognizer_role_to_html.get(roles_start[position])
+                    if html_role is not None:
+                        page_text += f"<{html_role}>"
+                if position in roles_end.keys():
+                    html_role = client.form_recognizer_role_to_html.get(roles_end[position])
+                    if html_role is not None:
+                        page_text += f"</{html_role}>"
+                page_text += form_recognizer_results.content[page_offset + idx]
+            elif table_id not in added_tables:
+                page_text += client._table_to_html(tables_on_page[table_id])
+                added_tables.add(table_id)
+
+        page_text += " "
+        page_map.append({"page_number": page_num, "offset": offset, "page_text": page_text})
+        offset += len(page_text)
+    return page_map
+
+
+def _generate_layout_result(rng, page_count, page_length):
+    """Builds a layout result with paragraphs, headers and (overlapping) tables."""
+    roles = [None, "title", "sectionHeading", "pageHeader", "pageFooter", "footnote"]
+    content = "".join(
+        rng.choice("abc <>&\n") for _ in range(page_count * page_length)
+    )
+    pages = []
+    paragraphs = []
+    tables = []
+    for page_num in range(page_count):
+        page_offset = page_num * page_length
+        pages.append(SimpleNamespace(spans=[SimpleNamespace(offset=page_offset, length=page_length)]))
+        position = page_offset
+        while position < page_offset + page_length:
+            length = rng.randint(1, page_length // 4)
+            paragraphs.append(
+                SimpleNamespace(
+                    role=rng.choice(roles),
+                    spans=[SimpleNamespace(offset=position, length=length)],
+                )
+            )
+            position += length + rng.randint(0, 3)
+        for _ in range(rng.randint(0, 3)):
+            spans = []
+            for _ in range(rng.randint(1, 2)):
+                # Spans may run past the page and overlap other tables
+                start = page_offset + rng.randint(-5, page_length)
+                spans.append(SimpleNamespace(offset=start, length=rng.randint(1, page_length // 3)))
+            tables.append(
+                SimpleNamespace(
+                    row_count=1,
+                    bounding_regions=[SimpleNamespace(page_number=page_num + 1)],
+                    spans=spans,
+                    cells=[
+                        SimpleNamespace(
+                            row_index=0,
+                            column_index=0,
+                            kind="content",
+                            content=f"table {len(tables)}",
+                            column_span=1,
+                            row_span=1,
+                        )
+                    ],
+                )
+            )
+    return SimpleNamespace(content=content, pages=pages, paragraphs=paragraphs, tables=tables)
+
+
+class TestPageAssembly:
+    """Tests that the span-based page assembly matches the previous html output."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    @patch("backend.batch.utilities.helpers.azure_form_recognizer_helper.DocumentAnalysisClient")
+    def test_page_map_matches_legacy_assembly(self, mock_client_class, seed):
+        """Test the page text is identical to the character by character assembly."""
+        form_recognizer_results = _generate_layout_result(random.Random(seed), 5, 60)
+        mock_client_class.return_value.begin_analyze_document_from_url.return_value.result.return_value = (
+            form_recognizer_results
+        )
+
+        client = AzureFormRecognizerClient()
+        result = client.begin_analyze_document_from_url("https://example.com/doc.pdf")
+
+        assert result == _legacy_page_map(client, form_recognizer_results)
+
+    @patch("backend.batch.utilities.helpers.azure_form_recognizer_helper.DocumentAnalysisClient")
+    def test_closing_tag_at_page_end_is_added_to_next_page(self, mock_client_class):
+        """Test a paragraph ending on a page boundary is closed on the following page."""
+        form_recognizer_results = SimpleNamespace(
+            content="Title Body",
+            paragraphs=[SimpleNamespace(role="title", spans=[SimpleNamespace(offset=0, length=5)])],
+            tables=[],
+            pages=[
+                SimpleNamespace(spans=[SimpleNamespace(offset=0, length=5)]),
+                SimpleNamespace(spans=[SimpleNamespace(offset=5, length=5)]),
+            ],
+        )
+        mock_client_class.return_value.begin_analyze_document_from_url.return_value.result.return_value = (
+            form_recognizer_results
+        )
+
+        client = AzureFormRecognizerClient()
+        result = client.begin_analyze_document_from_url("https://example.com/doc.pdf")
+
+        assert [page["page_text"] for page in result] == ["<h1>Title ", "</h1> Body "]
+
+    @pytest.mark.azure
+    @patch("backend.batch.utilities.helpers.azure_form_recognizer_helper.DocumentAnalysisClient")
+    def test_benchmark_large_layout(self, mock_client_class):
+        """Micro-benchmark of the page assembly on a 600 page layout result."""
+        form_recognizer_results = _generate_layout_result(random.Random(0), 600, 3000)
+        mock_client_class.return_value.begin_analyze_document_from_url.return_value.result.return_value = (
+            form_recognizer_results
+        )
+        client = AzureFormRecognizerClient()
+
+        start_time = time.perf_counter()
+        result = client.begin_analyze_document_from_url("https://example.com/doc.pdf")
+        span_based = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        expected = _legacy_page_map(client, form_recognizer_results)
+        legacy = time.perf_counter() - start_time
+
+        print(f"span-based: {span_based:.3f}s, character by character: {legacy:.3f}s")
+        assert result == expected
+        assert span_based < legacy
+
+
+def _bad_request(inner_error):
+    """Builds the HttpResponseError the service returns for a 400 with the given inner error."""
+    response = Mock(status_code=400, reason="Bad Request", headers={})
+    response.text.return_value = json.dumps(
+        {"error": {"code": "InvalidRequest", "message": "Invalid request.", "innererror": inner_error}}
+    )
+    return HttpResponseError(response=response)
+
+
+PAGE_RANGE_ERROR = {
+    "code": "InvalidParameter",
+    "message": "The parameter pages is invalid: The page range is out of bounds.",
+}
+
+
+def _page_range_result(first_page, page_count):
+    """Builds a read result for page_count pages, one table on the first page."""
+    content = "".join(f"page {first_page + i:03}" for i in range(page_count))
+    return SimpleNamespace(
+        content=content,
+        paragraphs=[],
+        pages=[SimpleNamespace(spans=[SimpleNamespace(offset=i * 8, length=8)]) for i in range(page_count)],
+        tables=[
+            SimpleNamespace(
+                row_count=1,
+                bounding_regions=[SimpleNamespace(page_number=first_page)],
+                spans=[SimpleNamespace(offset=0, length=4)],
+                cells=[
+                    SimpleNamespace(
+                        row_index=0,
+                        column_index=0,
+                        kind="content",
+                        content=f"table {first_page}",
+                        column_span=1,
+                        row_span=1,
+                    )
+                ],
+            )
+        ],
+    )
+
+
+class TestPageRangeAnalysis:
+    """Tests for analyzing large documents in concurrent page ranges."""
+
+    @staticmethod
+    def _analyze_side_effect(page_count):
+        def begin_analyze(model_id, document_url, pages):
+            first_page, last_page = (int(page) for page in pages.split("-"))
+            if first_page > page_count:
+                raise _bad_request(PAGE_RANGE_ERROR)
+            poller = Mock()
+            poller.result.return_value = _page_range_result(
+                first_page, min(last_page, page_count) - first_page + 1
+            )
+            return poller
+
+        return begin_analyze
+
+    @pytest.mark.parametrize("page_count", [1, 3, 6, 7])
+    @patch("backend.batch.utilities.helpers.azure_form_recognizer_helper.DocumentAnalysisClient")
+    def test_page_ranges_are_merged_with_global_offsets(
+        self, mock_client_class, mock_env_helper, page_count
+    ):
+        """Test page maps of all ranges are merged in order with global page numbers."""
+        mock_env_helper.AZURE_FORM_RECOGNIZER_PAGE_RANGE_SIZE = 3
+        mock_client = mock_client_class.return_value
+        mock_client.begin_analyze_document_from_url.side_effect = self._analyze_side_effect(page_count)
+
+        client = AzureFormRecognizerClient()
+        result = client.begin_analyze_document_from_url("https://example.com/doc.pdf", use_layout=False)
+
+        assert [page["page_number"] for page in result] == list(range(page_count))
+        offset = 0
+        for page_num, page in enumerate(result):
+            assert page["offset"] == offset
+            assert page["page_text"].endswith(f"{page_num + 1:03} ")
+            offset += len(page["page_text"])
+        # Each range places its table on its own first page
+        assert [page_num for page_num, page in enumerate(result) if "<table>" in page["page_text"]] == list(
+            range(0, page_count, 3)
+        )
+        mock_client.begin_analyze_document_from_url.assert_any_call(
+            "prebuilt-read", document_url="https://example.com/doc.pdf", pages="1-3"
+        )
+
+    @patch("backend.batch.utilities.helpers.azure_form_recognizer_helper.DocumentAnalysisClient")
+    def test_page_range_errors_are_raised(self, mock_client_class, mock_env_helper):
+        """Test an error analyzing the first range is not mistaken for the end of the document."""
+        mock_env_helper.AZURE_FORM_RECOGNIZER_PAGE_RANGE_SIZE = 3
+        mock_client_class.return_value.begin_analyze_document_from_url.side_effect = HttpResponseError(
+            response=Mock(status_code=400, reason="Bad Request")
+        )
+
+        client = AzureFormRecognizerClient()
+
+        with pytest.raises(ValueError):
+            client.begin_analyze_document_from_url("https://example.com/doc.pdf")
+
+    @patch("backend.batch.utilities.helpers.azure_form_recognizer_helper.DocumentAnalysisClient")
+    def test_other_bad_requests_past_the_first_range_are_raised(self, mock_client_class, mock_env_helper):
+        """Test only an invalid pages error is taken as the end of the document."""
+        mock_env_helper.AZURE_FORM_RECOGNIZER_PAGE_RANGE_SIZE = 3
+        side_effect = self._analyze_side_effect(10)
+
+        def begin_analyze(model_id, document_url, pages):
+            if pages.startswith("4-"):
+                raise _bad_request({"code": "InvalidContent", "message": "The file is corrupted."})
+            return side_effect(model_id, document_url, pages)
+
+        mock_client_class.return_value.begin_analyze_document_from_url.side_effect = begin_analyze
+
+        client = AzureFormRecognizerClient()
+
+        with pytest.raises(ValueError, match="corrupted"):
+            client.begin_analyze_document_from_url("https://example.com/doc.pdf")
+
+    @patch("backend.batch.utilities.helpers.azure_form_recognizer_helper.DocumentAnalysisClient")
+    def test_analyze_pages_returns_requested_pages(self, mock_client_class, mock_env_helper):
+        """Test only the requested pages are analyzed, and returned by page number."""
+        mock_client = mock_client_class.return_value
+        mock_client.begin_analyze_document_from_url.return_value.result.return_value = _page_range_result(3, 3)
+
+        client = AzureFormRecognizerClient()
+        result = client.analyze_pages("https://example.com/doc.pdf", [7, 3, 4])
+
+        mock_client.begin_analyze_document_from_url.assert_called_once_with(
+            "prebuilt-layout", document_url="https://example.com/doc.pdf", pages="3-4,7"
+        )
+        assert list(result.keys()) == [3, 4, 7]
+        assert "<table>" in result[3]
+        assert "<table>" not in result[4] and "<table>" not in result[7]
@@ -1,19 +1,40 @@
+import struct
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 import psycopg2
-from backend.batch.utilities.helpers.azure_postgres_helper import AzurePostgresHelper
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from backend.batch.utilities.helpers.azure_postgres_helper import (
+    AzurePostgresHelper,
+    CopyStream,
+    copy_binary_rows,
+)
+
+
+def create_mock_connection():
+    connection = MagicMock()
+    connection.closed = 0
+    connection.info.transaction_status = TRANSACTION_STATUS_IDLE
+    return connection
 
 
 class TestAzurePostgresHelper(unittest.TestCase):
+    def setUp(self):
+        AzurePostgresHelper.close_pools()
+
+    def tearDown(self):
+        AzurePostgresHelper.close_pools()
+
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
     def test_create_search_client_success(self, mock_connect, mock_credential):
         # Arrange
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_connect.return_value = mock_connection
 
         helper = AzurePostgresHelper()
@@ -22,7 +43,7 @@ class TestAzurePostgresHelper(unittest.TestCase):
         helper.env_helper.POSTGRESQL_DATABASE = "mock_database"
 
         # Act
-        connection = helper._create_search_client()
+        connection = helper.get_search_client().getconn()
 
         # Assert
         self.assertEqual(connection, mock_connection)
@@ -33,22 +54,28 @@ class TestAzurePostgresHelper(unittest.TestCase):
             "host=mock_host user=mock_user dbname=mock_database password=mock-access-token sslmode=require"
         )
 
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
-    def test_get_search_client_reuses_connection(self, mock_connect):
+    def test_get_search_client_reuses_connection(self, mock_connect, mock_credential):
         # Arrange
-        mock_connection = MagicMock()
-        mock_connection.closed = 0  # Simulate an open connection
+        mock_access_token = MagicMock()
+        mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
+        mock_credential.return_value.get_token.return_value = mock_access_token
+
+        mock_connection = create_mock_connection()
         mock_connect.return_value = mock_connection
 
-        helper = AzurePostgresHelper()
-        helper.conn = mock_connection
+        pool = AzurePostgresHelper().get_search_client()
+        pool.putconn(pool.getconn())
 
         # Act
-        connection = helper.get_search_client()
+        connection = AzurePostgresHelper().get_search_client().getconn()
 
         # Assert
         self.assertEqual(connection, mock_connection)
-        mock_connect.assert_not_called()  # Ensure no new connection is created
+        mock_connect.assert_called_once()  # Ensure no new connection is created
+        mock_credential.return_value.get_token.assert_called_once()
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -65,10 +92,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the database connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_connect.return_value = mock_connection
         mock_cursor_instance = MagicMock()
         mock_cursor.return_value = mock_cursor_instance
@@ -95,6 +123,34 @@ class TestAzurePostgresHelper(unittest.TestCase):
             "host=mock_host user=mock_user dbname=mock_database password=mock-access-token sslmode=require"
         )
 
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.logger")
+    def test_get_vector_store_logs_pool_stats(
+        self, mock_logger, mock_connect, mock_credential
+    ):
+        # Arrange
+        mock_access_token = MagicMock()
+        mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
+        mock_credential.return_value.get_token.return_value = mock_access_token
+        mock_connect.return_value = create_mock_connection()
+        helper = AzurePostgresHelper()
+        helper.env_helper = MagicMock()
+
+        # Act
+        helper.get_vector_store([1, 2, 3])
+
+        # Assert
+        stats_messages = [
+            call.args[0]
+            for call in mock_logger.info.call_args_list
+            if call.args[0].startswith("PostgreSQL connection pool stats: ")
+        ]
+        self.assertEqual(len(stats_messages), 1)
+        self.assertIn("'acquires': 1", stats_messages[0])
+        self.assertIn("'connects': 1", stats_messages[0])
+
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
     def test_get_vector_store_query_error(self, mock_connect, mock_credential):
@@ -109,9 +165,10 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_connect.return_value = mock_connection
 
         def raise_exception(*args, **kwargs):
@@ -148,6 +205,7 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         def raise_exception(*args, **kwargs):
@@ -160,9 +218,10 @@ class TestAzurePostgresHelper(unittest.TestCase):
 
         # Act & Assert
         with self.assertRaises(Exception) as context:
-            helper._create_search_client()
+            helper.get_search_client().getconn()
 
         self.assertEqual(str(context.exception), "Connection error")
+        self.assertEqual(helper.get_search_client().stats()["size"], 0)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -177,10 +236,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Arrange: Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -201,7 +261,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         self.assertEqual(
             result, [{"id": 1, "title": "Title 1"}, {"id": 2, "title": "Title 2"}]
         )
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -216,10 +277,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Arrange: Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -235,7 +297,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
 
         # Assert: Check that the result is None
         self.assertIsNone(result)
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -253,10 +316,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Arrange: Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -274,7 +338,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         mock_logger.error.assert_called_with(
             "Database error while fetching titles: Database error"
         )
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -292,10 +357,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Arrange: Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -313,7 +379,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         mock_logger.error.assert_called_with(
             "Unexpected error while fetching titles: Unexpected error"
         )
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -331,10 +398,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -354,9 +422,49 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Assert: Check that the correct number of rows were deleted
         self.assertEqual(result, 3)
         mock_connection.commit.assert_called_once()
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
         mock_logger.info.assert_called_with("Deleted 3 documents.")
 
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.EnvHelper")
+    def test_delete_documents_by_source_success(
+        self, mock_env_helper, mock_connect, mock_credential
+    ):
+        # Arrange: Mock the EnvHelper attributes
+        mock_env_helper.POSTGRESQL_USER = "mock_user"
+        mock_env_helper.POSTGRESQL_HOST = "mock_host"
+        mock_env_helper.POSTGRESQL_DATABASE = "mock_database"
+
+        # Mock access token retrieval
+        mock_access_token = MagicMock()
+        mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
+        mock_credential.return_value.get_token.return_value = mock_access_token
+
+        # Mock the connection and cursor
+        mock_connection = create_mock_connection()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+        mock_cursor.rowcount = 2
+
+        # Create an instance of the helper
+        helper = AzurePostgresHelper()
+
+        # Act: Call the method under test
+        result = helper.delete_documents_by_source("https://example.com/file.pdf")
+
+        # Assert: Check that the rows of the source were deleted
+        self.assertEqual(result, 2)
+        mock_cursor.execute.assert_called_once_with(
+            "DELETE FROM vector_store WHERE source = %s",
+            ("https://example.com/file.pdf",),
+        )
+        mock_connection.commit.assert_called_once()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
+
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.logger")
@@ -373,10 +481,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -393,7 +502,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Assert: Check that no rows were deleted and a warning was logged
         self.assertEqual(result, 0)
         mock_logger.warning.assert_called_with("No IDs provided for deletion.")
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -411,10 +521,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -435,7 +546,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
             "Database error while deleting documents: Database error"
         )
         mock_connection.rollback.assert_called_once()
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -453,10 +565,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -477,7 +590,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
             "Unexpected error while deleting documents: Unexpected error"
         )
         mock_connection.rollback.assert_called_once()
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -495,10 +609,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -527,7 +642,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         self.assertEqual(result[0]["metadata"], "Test Metadata")
 
         # Ensure the connection was closed
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
         mock_logger.info.assert_called_with("Retrieved 1 search result(s).")
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
@@ -546,10 +662,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -569,7 +686,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         self.assertEqual(result, [])  # Empty list returned for no results
 
         # Ensure the connection was closed
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
         mock_logger.info.assert_called_with("Retrieved 0 search result(s).")
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
@@ -588,10 +706,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -611,7 +730,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         mock_logger.error.assert_called_with(
             "Error executing search query: Database error"
         )
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -629,10 +749,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -655,7 +776,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         self.assertEqual(result[1]["title"], "Unique Title 2")
 
         # Ensure the connection was closed
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
         mock_logger.info.assert_called_with("Retrieved 2 unique title(s).")
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
@@ -674,10 +796,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -695,7 +818,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         self.assertEqual(result, [])  # Empty list returned for no results
 
         # Ensure the connection was closed
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
         mock_logger.info.assert_called_with("Retrieved 0 unique title(s).")
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
@@ -714,10 +838,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -735,7 +860,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         mock_logger.error.assert_called_with(
             "Error executing search query: Database error"
         )
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -753,10 +879,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -780,7 +907,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         self.assertEqual(result[1]["title"], "Title 2")
 
         # Ensure the connection was closed
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
         mock_logger.info.assert_called_with("Retrieved 2 unique title(s).")
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
@@ -799,10 +927,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -821,7 +950,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         self.assertEqual(result, [])  # Empty list returned for no results
 
         # Ensure the connection was closed
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
         mock_logger.info.assert_called_with("Retrieved 0 unique title(s).")
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
@@ -840,10 +970,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -862,7 +993,8 @@ class TestAzurePostgresHelper(unittest.TestCase):
         mock_logger.error.assert_called_with(
             "Error executing search query: Database error"
         )
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
@@ -880,6 +1012,7 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock a new open connection
@@ -888,31 +1021,32 @@ class TestAzurePostgresHelper(unittest.TestCase):
 
         mock_connect.return_value = mock_new_connection
 
-        # Create an instance of the helper
-        helper = AzurePostgresHelper()
+        # Mock a connection that gets closed while pooled
+        mock_closed_connection = create_mock_connection()
+        mock_connect.side_effect = [mock_closed_connection, mock_new_connection]
 
-        # Mock a closed connection
-        mock_closed_connection = MagicMock()
+        # Create an instance of the helper and pool the first connection
+        helper = AzurePostgresHelper()
+        pool = helper.get_search_client()
+        pool.putconn(pool.getconn())
         mock_closed_connection.closed = 1  # Connection is closed
 
-        # Set the helper to have a closed connection
-        helper.conn = mock_closed_connection
-
-        # Act: Call get_search_client which should recreate the connection
-        result = helper.get_search_client()
+        # Act: Acquire a connection, which should replace the closed one
+        result = pool.getconn()
 
         # Assert: Verify new connection was created
         self.assertEqual(result, mock_new_connection)
-        self.assertEqual(mock_connect.call_count, 1)
+        self.assertEqual(mock_connect.call_count, 2)
         mock_logger.info.assert_called_with("Connected to Azure PostgreSQL successfully.")
+        self.assertEqual(pool.stats()["size"], 1)
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
-    @patch("backend.batch.utilities.helpers.azure_postgres_helper.execute_values")
+    @patch.object(AzurePostgresHelper, "_vector_store_id_key_checked", True)
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.logger")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.EnvHelper")
     def test_create_vector_store_success(
-        self, mock_env_helper, mock_logger, mock_execute_values, mock_connect, mock_credential
+        self, mock_env_helper, mock_logger, mock_connect, mock_credential
     ):
         # Arrange: Mock the EnvHelper attributes
         mock_env_helper.POSTGRESQL_USER = "mock_user"
@@ -923,10 +1057,11 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
@@ -936,7 +1071,7 @@ class TestAzurePostgresHelper(unittest.TestCase):
             {
                 "id": "doc1",
                 "title": "Title 1",
-                "chunk": "Chunk 1",
+                "chunk": 1,
                 "chunk_id": "chunk1",
                 "offset": 0,
                 "page_number": 1,
@@ -948,7 +1083,7 @@ class TestAzurePostgresHelper(unittest.TestCase):
             {
                 "id": "doc2",
                 "title": "Title 2",
-                "chunk": "Chunk 2",
+                "chunk": 2,
                 "chunk_id": "chunk2",
                 "offset": 100,
                 "page_number": 2,
@@ -965,19 +1100,29 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Act: Call the method under test
         helper.create_vector_store(documents_to_upload)
 
-        # Assert: Verify execute_values was called
-        mock_execute_values.assert_called_once()
+        # Assert: Verify the documents were copied into staging and merged by id
+        mock_cursor.copy_expert.assert_called_once()
+        copy_sql, stream = mock_cursor.copy_expert.call_args.args
+        self.assertIn("COPY vector_store_staging", copy_sql)
+        self.assertIn("FROM STDIN (FORMAT binary)", copy_sql)
+        data = stream.read()
+        self.assertTrue(data.startswith(b"PGCOPY\n\xff\r\n\x00"))
+        self.assertTrue(data.endswith(struct.pack("!h", -1)))
+        executed_sql = " ".join(call.args[0] for call in mock_cursor.execute.call_args_list)
+        self.assertIn("ON CONFLICT (id) DO UPDATE", executed_sql)
+        self.assertIn("DELETE FROM vector_store v", executed_sql)
         mock_connection.commit.assert_called_once()
-        mock_connection.close.assert_called_once()
-        mock_logger.info.assert_called_with("Inserted 2 documents successfully.")
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
+        self.assertTrue(mock_logger.info.call_args.args[0].startswith("Upserted 2 documents successfully"))
 
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
-    @patch("backend.batch.utilities.helpers.azure_postgres_helper.execute_values")
+    @patch.object(AzurePostgresHelper, "_vector_store_id_key_checked", True)
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.logger")
     @patch("backend.batch.utilities.helpers.azure_postgres_helper.EnvHelper")
     def test_create_vector_store_error(
-        self, mock_env_helper, mock_logger, mock_execute_values, mock_connect, mock_credential
+        self, mock_env_helper, mock_logger, mock_connect, mock_credential
     ):
         # Arrange: Mock the EnvHelper attributes
         mock_env_helper.POSTGRESQL_USER = "mock_user"
@@ -988,23 +1133,24 @@ class TestAzurePostgresHelper(unittest.TestCase):
         # Mock access token retrieval
         mock_access_token = MagicMock()
         mock_access_token.token = "mock-access-token"
+        mock_access_token.expires_on = time.time() + 3600
         mock_credential.return_value.get_token.return_value = mock_access_token
 
         # Mock the connection and cursor
-        mock_connection = MagicMock()
+        mock_connection = create_mock_connection()
         mock_cursor = MagicMock()
         mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
         mock_connect.return_value = mock_connection
 
-        # Simulate an error during execute_values
-        mock_execute_values.side_effect = Exception("Insert failed")
+        # Simulate an error during the copy
+        mock_cursor.copy_expert.side_effect = Exception("Insert failed")
 
         # Create test documents
         documents_to_upload = [
             {
                 "id": "doc1",
                 "title": "Title 1",
-                "chunk": "Chunk 1",
+                "chunk": 1,
                 "chunk_id": "chunk1",
                 "offset": 0,
                 "page_number": 1,
@@ -1024,4 +1170,84 @@ class TestAzurePostgresHelper(unittest.TestCase):
 
         mock_logger.error.assert_called_with("Error during index creation: Insert failed")
         mock_connection.rollback.assert_called_once()
-        mock_connection.close.assert_called_once()
+        mock_connection.close.assert_not_called()
+        self.assertEqual(helper.get_search_client().stats()["idle"], 1)
+
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.logger")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.EnvHelper")
+    @patch.object(AzurePostgresHelper, "_vector_store_id_key_checked", False)
+    def test_create_vector_store_adds_missing_id_key(
+        self, mock_env_helper, mock_logger, mock_connect, mock_credential
+    ):
+        # Arrange: Mock a vector_store table without a unique key on id
+        mock_connection = create_mock_connection()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+        mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+
+        helper = AzurePostgresHelper()
+
+        # Act
+        helper.create_vector_store([])
+
+        # Assert: Duplicates are removed before the unique index is created
+        executed_sql = [call.args[0] for call in mock_cursor.execute.call_args_list]
+        dedupe = next(i for i, sql in enumerate(executed_sql) if "a.ctid < b.ctid" in sql)
+        unique_index = executed_sql.index("CREATE UNIQUE INDEX IF NOT EXISTS vector_store_id_key ON vector_store (id)")
+        self.assertLess(dedupe, unique_index)
+        mock_logger.warning.assert_called_once()
+        self.assertTrue(AzurePostgresHelper._vector_store_id_key_checked)
+
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.get_azure_credential")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.psycopg2.connect")
+    @patch("backend.batch.utilities.helpers.azure_postgres_helper.EnvHelper")
+    @patch.object(AzurePostgresHelper, "_vector_store_id_key_checked", True)
+    def test_create_vector_store_checks_id_key_once(
+        self, mock_env_helper, mock_connect, mock_credential
+    ):
+        # Arrange
+        mock_connection = create_mock_connection()
+        mock_cursor = MagicMock()
+        mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_connect.return_value = mock_connection
+
+        helper = AzurePostgresHelper()
+
+        # Act
+        helper.create_vector_store([])
+
+        # Assert
+        executed_sql = " ".join(call.args[0] for call in mock_cursor.execute.call_args_list)
+        self.assertNotIn("pg_index", executed_sql)
+
+    def test_copy_binary_rows_encodes_rows_in_binary_copy_format(self):
+        # Arrange
+        rows = [("doc1", 7, [0.5, 1.0], None, 3)]
+
+        # Act
+        data = CopyStream(copy_binary_rows(rows, ["text", "integer", "vector", "text", "bigint"])).read()
+
+        # Assert
+        self.assertEqual(
+            data,
+            b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+            + struct.pack("!h", 5)
+            + struct.pack("!i", 4) + b"doc1"
+            + struct.pack("!ii", 4, 7)
+            + struct.pack("!i", 12) + struct.pack("!hhff", 2, 0, 0.5, 1.0)
+            + struct.pack("!i", -1)
+            + struct.pack("!iq", 8, 3)
+            + struct.pack("!h", -1),
+        )
+
+    def test_copy_stream_reads_in_chunks(self):
+        # Arrange
+        stream = CopyStream(iter([b"abc", b"de", b"f"]))
+
+        # Act & Assert
+        self.assertEqual(stream.read(4), b"abcd")
+        self.assertEqual(stream.read(4), b"ef")
+        self.assertEqual(stream.read(4), b"")
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import ANY, MagicMock, patch
 from backend.batch.utilities.helpers.azure_search_helper import AzureSearchHelper
+from backend.batch.utilities.helpers.search_index_cache import SearchIndexCache
 from azure.search.documents.indexes.models import (
     ExhaustiveKnnAlgorithmConfiguration,
     ExhaustiveKnnParameters,
@@ -91,6 +92,7 @@ def env_helper_mock():
             AZURE_SEARCH_CONVERSATIONS_LOG_INDEX
         )
         env_helper.MANAGED_IDENTITY_CLIENT_ID = "mock-client-id"
+        env_helper.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL = 300.0
 
         env_helper.USE_ADVANCED_IMAGE_PROCESSING = USE_ADVANCED_IMAGE_PROCESSING
         env_helper.is_auth_type_keys.return_value = True
@@ -102,9 +104,11 @@ def env_helper_mock():
 def reset_search_dimensions():
     AzureSearchHelper._search_dimension = None
     AzureSearchHelper._image_search_dimension = None
+    SearchIndexCache.clear()
     yield
     AzureSearchHelper._search_dimension = None
     AzureSearchHelper._image_search_dimension = None
+    SearchIndexCache.clear()
 
 
 @pytest.fixture(autouse=True)
@@ -357,6 +361,68 @@ def test_does_not_create_search_index_if_it_exists(
     search_index_client_mock.return_value.create_index.assert_not_called()
 
 
+@patch("backend.batch.utilities.helpers.azure_search_helper.SearchClient")
+@patch("backend.batch.utilities.helpers.azure_search_helper.SearchIndexClient")
+def test_get_search_client_caches_index_existence(
+    search_index_client_mock: MagicMock,
+    search_client_mock: MagicMock,
+    llm_helper_mock: MagicMock,
+):
+    # given
+    search_index_client_mock.return_value.list_index_names.return_value = [
+        AZURE_SEARCH_INDEX
+    ]
+
+    # when
+    for _ in range(3):
+        AzureSearchHelper().get_search_client()
+
+    # then
+    search_index_client_mock.return_value.list_index_names.assert_called_once()
+    llm_helper_mock.get_embedding_model.return_value.embed_query.assert_not_called()
+
+
+@patch("backend.batch.utilities.helpers.azure_search_helper.SearchClient")
+@patch("backend.batch.utilities.helpers.azure_search_helper.SearchIndexClient")
+def test_get_search_client_caches_created_index(
+    search_index_client_mock: MagicMock,
+    search_client_mock: MagicMock,
+):
+    # given
+    search_index_client_mock.return_value.list_index_names.return_value = []
+
+    # when
+    AzureSearchHelper().get_search_client()
+    AzureSearchHelper().get_search_client()
+
+    # then
+    search_index_client_mock.return_value.create_index.assert_called_once()
+    search_index_client_mock.return_value.list_index_names.assert_called_once()
+
+
+@patch("backend.batch.utilities.helpers.azure_search_helper.SearchClient")
+@patch("backend.batch.utilities.helpers.azure_search_helper.SearchIndexClient")
+def test_index_existence_is_checked_again_when_cache_expires(
+    search_index_client_mock: MagicMock,
+    search_client_mock: MagicMock,
+    env_helper_mock: MagicMock,
+):
+    # given
+    env_helper_mock.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL = 0.0
+    search_index_client_mock.return_value.list_index_names.return_value = []
+    azure_search_helper = AzureSearchHelper()
+
+    # when
+    assert azure_search_helper._index_not_exists(AZURE_SEARCH_INDEX) is True
+    search_index_client_mock.return_value.list_index_names.return_value = [
+        AZURE_SEARCH_INDEX
+    ]
+    assert azure_search_helper._index_not_exists(AZURE_SEARCH_INDEX) is False
+
+    # then
+    assert search_index_client_mock.return_value.list_index_names.call_count == 2
+
+
 @patch("backend.batch.utilities.helpers.azure_search_helper.SearchClient")
 @patch("backend.batch.utilities.helpers.azure_search_helper.SearchIndexClient")
 def test_propogates_exceptions_when_creating_search_index(
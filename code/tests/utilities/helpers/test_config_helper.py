@@ -200,16 +200,16 @@ def test_default_config_when_use_advanced_image_processing(env_helper_mock):
 
     expected_processors = [
         {"document_type": "pdf", "chunking": expected_chunking, "loading": expected_loading},
-        {"document_type": "txt", "chunking": expected_chunking, "loading": {"strategy": "web"}},
+        {"document_type": "txt", "chunking": expected_chunking, "loading": {"strategy": "text"}},
         {"document_type": "url", "chunking": expected_chunking, "loading": {"strategy": "web"}},
-        {"document_type": "md", "chunking": expected_chunking, "loading": {"strategy": "web"}},
-        {"document_type": "html", "chunking": expected_chunking, "loading": {"strategy": "web"}},
-        {"document_type": "htm", "chunking": expected_chunking, "loading": {"strategy": "web"}},
+        {"document_type": "md", "chunking": expected_chunking, "loading": {"strategy": "text"}},
+        {"document_type": "html", "chunking": expected_chunking, "loading": {"strategy": "html"}},
+        {"document_type": "htm", "chunking": expected_chunking, "loading": {"strategy": "html"}},
         {"document_type": "docx", "chunking": expected_chunking, "loading": {"strategy": "docx"}},
         {
             "document_type": "json",
             "chunking": {"strategy": "json", "size": 500, "overlap": 100},
-            "loading": {"strategy": "web"},
+            "loading": {"strategy": "text"},
         },
         {"document_type": "jpg", "chunking": expected_chunking, "loading": expected_loading},
         {"document_type": "jpeg", "chunking": expected_chunking, "loading": expected_loading},
@@ -475,7 +475,9 @@ def test_get_available_loading_strategies(config: Config):
     loading_strategies = config.get_available_loading_strategies()
 
     # then
-    assert sorted(loading_strategies) == sorted(["layout", "read", "web", "docx"])
+    assert sorted(loading_strategies) == sorted(
+        ["layout", "read", "web", "docx", "text", "html", "auto"]
+    )
 
 
 def test_get_available_orchestration_strategies(config: Config):
@@ -0,0 +1,159 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from backend.batch.utilities.helpers.document_analysis_cache import (
+    DocumentAnalysisCache,
+)
+from backend.batch.utilities.helpers.embedding_cache import SqliteEmbeddingCacheBackend
+
+DOCUMENT_URL = "https://account.blob.core.windows.net/documents/doc.pdf?sas-token"
+PAGE_MAP = [{"page_number": 0, "offset": 0, "page_text": "<h1>Title</h1> "}]
+
+
+@pytest.fixture(autouse=True)
+def blob_client_mock():
+    with patch(
+        "backend.batch.utilities.helpers.document_analysis_cache.BlobClient"
+    ) as mock:
+        properties = mock.from_blob_url.return_value.get_blob_properties.return_value
+        properties.content_settings.content_md5 = bytearray(b"\x01\x02")
+        properties.etag = "some-etag"
+        yield mock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DocumentAnalysisCache(
+        SqliteEmbeddingCacheBackend(str(tmp_path / "cache.sqlite3"), 10)
+    )
+
+
+def test_get_or_analyze_stores_page_map_on_miss(cache, blob_client_mock: MagicMock):
+    # given
+    analyze = MagicMock(return_value=PAGE_MAP)
+
+    # when
+    page_map = cache.get_or_analyze(DOCUMENT_URL, "prebuilt-layout", analyze)
+
+    # then
+    assert page_map == PAGE_MAP
+    analyze.assert_called_once_with()
+    blob_client_mock.from_blob_url.assert_called_once_with(DOCUMENT_URL)
+    assert cache.backend.get_many(["prebuilt-layout/md5-0102"]) != {}
+
+
+def test_get_or_analyze_skips_analysis_on_hit(cache):
+    # given
+    cache.get_or_analyze(DOCUMENT_URL, "prebuilt-layout", lambda: PAGE_MAP)
+    analyze = MagicMock()
+
+    # when
+    page_map = cache.get_or_analyze(DOCUMENT_URL, "prebuilt-layout", analyze)
+
+    # then
+    assert page_map == PAGE_MAP
+    analyze.assert_not_called()
+
+
+def test_get_or_analyze_keys_entries_by_model(cache):
+    # given
+    cache.get_or_analyze(DOCUMENT_URL, "prebuilt-layout", lambda: PAGE_MAP)
+    analyze = MagicMock(return_value=[])
+
+    # when
+    page_map = cache.get_or_analyze(DOCUMENT_URL, "prebuilt-read", analyze)
+
+    # then
+    assert page_map == []
+    analyze.assert_called_once_with()
+
+
+def test_get_or_analyze_reanalyzes_changed_blob(cache, blob_client_mock: MagicMock):
+    # given
+    properties = (
+        blob_client_mock.from_blob_url.return_value.get_blob_properties.return_value
+    )
+    properties.content_settings.content_md5 = None
+    cache.get_or_analyze(DOCUMENT_URL, "prebuilt-layout", lambda: PAGE_MAP)
+    properties.etag = "some-other-etag"
+    analyze = MagicMock(return_value=[])
+
+    # when
+    page_map = cache.get_or_analyze(DOCUMENT_URL, "prebuilt-layout", analyze)
+
+    # then
+    assert page_map == []
+    analyze.assert_called_once_with()
+
+
+def test_get_or_analyze_bypass_refreshes_entry(tmp_path):
+    # given
+    backend = SqliteEmbeddingCacheBackend(str(tmp_path / "cache.sqlite3"), 10)
+    DocumentAnalysisCache(backend).get_or_analyze(
+        DOCUMENT_URL, "prebuilt-layout", lambda: PAGE_MAP
+    )
+    analyze = MagicMock(return_value=[])
+
+    # when
+    page_map = DocumentAnalysisCache(backend, bypass=True).get_or_analyze(
+        DOCUMENT_URL, "prebuilt-layout", analyze
+    )
+
+    # then
+    assert page_map == []
+    assert (
+        DocumentAnalysisCache(backend).get_or_analyze(
+            DOCUMENT_URL, "prebuilt-layout", MagicMock()
+        )
+        == []
+    )
+
+
+def test_get_or_analyze_does_not_cache_when_blob_properties_unavailable(
+    cache, blob_client_mock: MagicMock
+):
+    # given
+    blob_client_mock.from_blob_url.side_effect = ValueError("Not a blob URL")
+    analyze = MagicMock(return_value=PAGE_MAP)
+
+    # when
+    cache.get_or_analyze("https://example.com/doc.pdf", "prebuilt-layout", analyze)
+    cache.get_or_analyze("https://example.com/doc.pdf", "prebuilt-layout", analyze)
+
+    # then
+    assert analyze.call_count == 2
+
+
+def test_get_or_analyze_without_backend_always_analyzes(blob_client_mock: MagicMock):
+    # given
+    analyze = MagicMock(return_value=PAGE_MAP)
+
+    # when
+    page_map = DocumentAnalysisCache(None).get_or_analyze(
+        DOCUMENT_URL, "prebuilt-layout", analyze
+    )
+
+    # then
+    assert page_map == PAGE_MAP
+    blob_client_mock.from_blob_url.assert_not_called()
+
+
+def test_get_instance_creates_cache_once(tmp_path):
+    # given
+    env_helper = MagicMock()
+    env_helper.DOCUMENT_ANALYSIS_CACHE_BACKEND = "sqlite"
+    env_helper.DOCUMENT_ANALYSIS_CACHE_PATH = str(tmp_path / "cache.sqlite3")
+    env_helper.DOCUMENT_ANALYSIS_CACHE_MAX_ENTRIES = 10
+    env_helper.DOCUMENT_ANALYSIS_CACHE_BYPASS = False
+    DocumentAnalysisCache.clear_instance()
+
+    # when
+    with patch.object(
+        DocumentAnalysisCache, "create", wraps=DocumentAnalysisCache.create
+    ) as create_mock:
+        caches = [DocumentAnalysisCache.get_instance(env_helper) for _ in range(3)]
+    DocumentAnalysisCache.clear_instance()
+
+    # then
+    assert caches[0] is caches[1] is caches[2]
+    create_mock.assert_called_once_with(env_helper)
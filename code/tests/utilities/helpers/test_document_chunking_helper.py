@@ -1,9 +1,27 @@
+import json
+import logging
+import time
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import docx
+import pytest
+from langchain.text_splitter import MarkdownTextSplitter, TokenTextSplitter
 from backend.batch.utilities.common.source_document import SourceDocument
 from backend.batch.utilities.helpers.document_chunking_helper import DocumentChunking
 from backend.batch.utilities.document_chunking.chunking_strategy import (
     ChunkingStrategy,
     ChunkingSettings,
 )
+from backend.batch.utilities.document_chunking.token_chunker import (
+    TokenChunker,
+    get_encoding,
+    get_markdown_splitter,
+)
+
+logger = logging.getLogger(__name__)
 
 # Create a sample document
 documents = [
@@ -139,7 +157,310 @@ def test_document_chunking_json():
     ]
 
     document_chunking = DocumentChunking()
-    chunked_documents = document_chunking.chunk(json_documents, chunking)
+    chunked_documents = list(document_chunking.chunk(json_documents, chunking))
     assert len(chunked_documents) == 2
     assert chunked_documents[0].content == "{'window': {'title': 'Sample Widget', 'name': 'main_window', 'width': 500, 'height': 500}}"
     assert chunked_documents[1].content == "{'image': {'src': 'Images/Sun.png', 'name': 'sun1', 'hOffset': 250, 'vOffset': 250, 'alignment': 'center'}}"
+
+
+@pytest.fixture
+def cl100k_encoding():
+    """Chunks with the cached cl100k_base encoder so offsets do not depend on gpt2."""
+    get_markdown_splitter.cache_clear()
+    with patch(
+        "backend.batch.utilities.document_chunking.token_chunker.get_encoding",
+        side_effect=lambda encoding_name=None: get_encoding("cl100k_base"),
+    ), patch(
+        "backend.batch.utilities.document_chunking.paragraph.get_encoding",
+        side_effect=lambda encoding_name=None: get_encoding("cl100k_base"),
+    ):
+        yield
+    get_markdown_splitter.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [
+        ChunkingStrategy.LAYOUT,
+        ChunkingStrategy.PAGE,
+        ChunkingStrategy.FIXED_SIZE_OVERLAP,
+        ChunkingStrategy.PARAGRAPH,
+    ],
+)
+def test_document_chunking_keeps_exact_offsets_and_page_numbers(cl100k_encoding, strategy):
+    # given
+    chunking = ChunkingSettings({"strategy": strategy, "size": 10, "overlap": 5})
+    full_document_content = "".join(document.content for document in documents)
+    page_length = len(documents[0].content)
+
+    # when
+    chunked_documents = list(DocumentChunking().chunk(documents, chunking))
+
+    # then
+    assert len(chunked_documents) > 2
+    for chunked_document in chunked_documents:
+        offset = chunked_document.offset
+        assert (
+            full_document_content[offset : offset + len(chunked_document.content)]
+            == chunked_document.content
+        )
+        assert chunked_document.page_number == (1 if offset < page_length else 2)
+
+
+def test_document_chunking_paragraph_packs_paragraphs(cl100k_encoding):
+    # given
+    paragraph_documents = [
+        SourceDocument(
+            content="<h1>Title</h1>\n<p>First paragraph.</p>\n<p>Second paragraph.</p>\n",
+            source="https://example.com/sample_document.pdf",
+            page_number=0,
+        ),
+        SourceDocument(
+            content="Third paragraph.\n\nFourth paragraph.\n \n",
+            source="https://example.com/sample_document.pdf",
+            page_number=1,
+        ),
+    ]
+    chunking = ChunkingSettings(
+        {"strategy": ChunkingStrategy.PARAGRAPH, "size": 16, "overlap": 0}
+    )
+
+    # when
+    chunked_documents = DocumentChunking().chunk(paragraph_documents, chunking)
+
+    # then
+    assert isinstance(chunked_documents, Iterator)
+    chunked_documents = list(chunked_documents)
+    assert [document.content for document in chunked_documents] == [
+        "<h1>Title</h1>\n<p>First paragraph.</p>",
+        "<p>Second paragraph.</p>\nThird paragraph.\n\nFourth paragraph.",
+    ]
+    assert [document.page_number for document in chunked_documents] == [0, 0]
+    assert [document.offset for document in chunked_documents] == [0, 39]
+    assert [document.chunk for document in chunked_documents] == [0, 1]
+    assert len({document.id for document in chunked_documents}) == 2
+
+
+def test_document_chunking_paragraph_splits_only_oversized_paragraphs(cl100k_encoding):
+    # given
+    long_paragraph = " ".join(f"word{i}" for i in range(40))
+    paragraph_documents = [
+        SourceDocument(
+            content=f"Short one.\n\n{long_paragraph}\n\nShort two.",
+            source="https://example.com/sample_document.pdf",
+            page_number=0,
+        )
+    ]
+    chunking = ChunkingSettings(
+        {"strategy": ChunkingStrategy.PARAGRAPH, "size": 20, "overlap": 5}
+    )
+
+    # when
+    chunked_documents = list(DocumentChunking().chunk(paragraph_documents, chunking))
+
+    # then
+    assert chunked_documents[0].content == "Short one."
+    assert chunked_documents[-1].content == "Short two."
+    windows = chunked_documents[1:-1]
+    assert len(windows) > 1
+    assert all(
+        len(get_encoding("cl100k_base").encode(document.content)) <= 20
+        for document in windows
+    )
+    assert windows[0].content.startswith("word0")
+    assert windows[-1].content.endswith("word39")
+
+
+def test_document_chunking_json_packs_array_items_at_path():
+    # given
+    content = json.dumps(
+        {"meta": {"count": 3}, "data": {"items": [{"id": 1}, {"id": 2}, {"id": 3}]}}
+    )
+    chunking = ChunkingSettings(
+        {"strategy": ChunkingStrategy.JSON, "size": 30, "overlap": 0, "json_path": "data.items"}
+    )
+
+    # when
+    chunked_documents = DocumentChunking().chunk(
+        [SourceDocument(content=content, source="https://example.com/sample_document.json")],
+        chunking,
+    )
+
+    # then
+    assert isinstance(chunked_documents, Iterator)
+    chunked_documents = list(chunked_documents)
+    assert [document.content for document in chunked_documents] == [
+        "{'data': {'items': [{'id': 1}, {'id': 2}]}}",
+        "{'data': {'items': [{'id': 3}]}}",
+    ]
+    assert content[chunked_documents[0].offset :].startswith('{"id": 1}')
+    assert content[chunked_documents[1].offset :].startswith('{"id": 3}')
+
+
+def test_document_chunking_json_splits_array_items_larger_than_chunk_size():
+    # given
+    content = json.dumps([{"id": 1}, {"a": "x" * 60, "b": "y" * 60}, {"id": 3}])
+    chunking = ChunkingSettings({"strategy": ChunkingStrategy.JSON, "size": 60, "overlap": 0})
+
+    # when
+    chunked_documents = list(
+        DocumentChunking().chunk(
+            [SourceDocument(content=content, source="https://example.com/sample_document.json")],
+            chunking,
+        )
+    )
+
+    # then
+    assert [document.content for document in chunked_documents] == [
+        "[{'id': 1}]",
+        f"[{{'a': '{'x' * 60}'}}]",
+        f"[{{'b': '{'y' * 60}'}}]",
+        "[{'id': 3}]",
+    ]
+    assert content[chunked_documents[1].offset :].startswith('{"a": ')
+    assert content[chunked_documents[2].offset :].startswith('{"a": ')
+
+
+def test_document_chunking_json_offsets_point_at_members():
+    # given
+    content = json.dumps({"first": "a" * 60, "second": {"nested": "b"}}, indent=2)
+    chunking = ChunkingSettings({"strategy": ChunkingStrategy.JSON, "size": 100, "overlap": 0})
+
+    # when
+    chunked_documents = list(
+        DocumentChunking().chunk(
+            [SourceDocument(content=content, source="https://example.com/sample_document.json")],
+            chunking,
+        )
+    )
+
+    # then
+    assert [document.content for document in chunked_documents] == [
+        str({"first": "a" * 60}),
+        "{'second': {'nested': 'b'}}",
+    ]
+    assert [document.offset for document in chunked_documents] == [
+        content.index('"first"'),
+        content.index('"second"'),
+    ]
+
+
+def test_document_chunking_json_has_bounded_peak_memory():
+    # given
+    item = {"id": 0, "text": "x" * 200, "tags": ["a", "b", "c"]}
+    content = json.dumps([dict(item, id=i) for i in range(20000)])
+    documents = [SourceDocument(content=content, source="https://example.com/sample_document.json")]
+    chunking = ChunkingSettings({"strategy": ChunkingStrategy.JSON, "size": 5000, "overlap": 0})
+
+    # when
+    tracemalloc.start()
+    chunk_count = 0
+    for _ in DocumentChunking().chunk(documents, chunking):
+        chunk_count += 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # then
+    assert chunk_count > 100
+    # Decoding the whole document at once takes several times its size
+    assert peak < len(content) / 20
+
+
+def test_token_chunker_windows_overlap_by_tokens():
+    # given
+    token_chunker = TokenChunker(documents, "cl100k_base")
+    encoding = get_encoding("cl100k_base")
+    tokens = encoding.encode(token_chunker.content)
+
+    # when
+    token_windows = token_chunker.token_windows(10, 4)
+
+    # then
+    assert [token_chunker.content[start:end] for start, end in token_windows] == [
+        encoding.decode(tokens[i : i + 10]) for i in range(0, len(tokens) - 4, 6)
+    ]
+
+
+def test_token_chunker_does_not_split_characters():
+    # given
+    token_chunker = TokenChunker(
+        [SourceDocument(content="日本語のテキスト" * 5, source="https://example.com/a.pdf")],
+        "cl100k_base",
+    )
+
+    # when
+    token_windows = token_chunker.token_windows(3, 1)
+
+    # then
+    assert "".join(
+        token_chunker.content[start:end] for start, end in token_windows[:1]
+    ) + "".join(
+        token_chunker.content[previous_end:end]
+        for (_, previous_end), (_, end) in zip(token_windows, token_windows[1:])
+    ) == token_chunker.content
+    assert all("�" not in token_chunker.content[start:end] for start, end in token_windows)
+
+
+def test_token_chunker_rejects_overlap_larger_than_chunk_size():
+    with pytest.raises(ValueError):
+        TokenChunker(documents, "cl100k_base").token_windows(5, 10)
+
+
+def test_token_chunker_text_offsets_of_overlapping_and_repeated_chunks():
+    # given
+    token_chunker = TokenChunker(
+        [SourceDocument(content="Yes No Yes Yes No", source="https://example.com/a.pdf")]
+    )
+
+    # when
+    offsets = token_chunker.text_offsets(["Yes", "Yes No", "No Yes", "Yes", "Yes No"])
+
+    # then
+    assert offsets == [0, 0, 4, 7, 11]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(100, 20), (500, 100)])
+def test_benchmark_token_chunker_on_sample_documents(chunk_size, chunk_overlap):
+    """Micro-benchmark of the chunking engine against the LangChain splitters."""
+    data_directory = Path(__file__).parents[4] / "data"
+    # Load the encoding up front, so neither side pays for it
+    get_markdown_splitter(chunk_size, chunk_overlap).split_text("warm up")
+    langchain_time = 0.0
+    token_chunker_time = 0.0
+    for document_path in sorted(data_directory.glob("*.docx")):
+        paragraphs = [paragraph.text for paragraph in docx.Document(document_path).paragraphs]
+        pages = [
+            SourceDocument(
+                content="\n".join(paragraphs[i : i + 40]),
+                source="https://example.com/sample.docx",
+                page_number=i // 40,
+            )
+            for i in range(0, len(paragraphs), 40)
+        ]
+        full_document_content = "".join(page.content for page in pages)
+
+        start_time = time.perf_counter()
+        TokenTextSplitter.from_tiktoken_encoder(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        ).split_text(full_document_content)
+        MarkdownTextSplitter.from_tiktoken_encoder(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        ).split_text(full_document_content)
+        langchain_time += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        token_chunker = TokenChunker(pages)
+        token_chunker.token_windows(chunk_size, chunk_overlap)
+        chunks = get_markdown_splitter(chunk_size, chunk_overlap).split_text(
+            token_chunker.content
+        )
+        offsets = token_chunker.text_offsets(chunks)
+        token_chunker_time += time.perf_counter() - start_time
+
+        for chunk, offset in zip(chunks, offsets):
+            assert token_chunker.content.startswith(chunk, offset)
+
+    logger.info(
+        f"Chunk size {chunk_size}, overlap {chunk_overlap}: LangChain splitters {langchain_time:.3f}s, token chunker {token_chunker_time:.3f}s"
+    )
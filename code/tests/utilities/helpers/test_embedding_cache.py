@@ -0,0 +1,107 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from backend.batch.utilities.helpers.embedding_cache import (
+    AzureBlobEmbeddingCacheBackend,
+    EmbeddingCache,
+    SqliteEmbeddingCacheBackend,
+)
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    return SqliteEmbeddingCacheBackend(str(tmp_path / "cache.sqlite3"), 2)
+
+
+def test_sqlite_backend_returns_stored_entries(sqlite_backend):
+    # given
+    sqlite_backend.set_many({"a": b"1", "b": b"2"})
+
+    # when
+    entries = sqlite_backend.get_many(["a", "b", "c"])
+
+    # then
+    assert entries == {"a": b"1", "b": b"2"}
+
+
+def test_sqlite_backend_evicts_least_recently_used_entries(sqlite_backend):
+    # given
+    with patch(
+        "backend.batch.utilities.helpers.embedding_cache.time.time",
+        side_effect=[1, 2, 3, 4],
+    ):
+        sqlite_backend.set_many({"a": b"1"})
+        sqlite_backend.set_many({"b": b"2"})
+        sqlite_backend.get_many(["a"])
+
+        # when
+        sqlite_backend.set_many({"c": b"3"})
+
+    # then
+    assert sqlite_backend.get_many(["a", "b", "c"]) == {"a": b"1", "c": b"3"}
+
+
+@patch("backend.batch.utilities.helpers.embedding_cache.AzureBlobStorageClient")
+def test_blob_backend_treats_missing_blobs_as_misses(blob_client_mock: MagicMock):
+    # given
+    backend = AzureBlobEmbeddingCacheBackend("some-container")
+    blob_client_mock.return_value.download_file.side_effect = [
+        b"1",
+        ResourceNotFoundError(),
+    ]
+
+    # when
+    entries = backend.get_many(["a", "b"])
+
+    # then
+    blob_client_mock.assert_called_once_with(container_name="some-container")
+    assert entries == {"a": b"1"}
+
+
+def test_embedding_cache_key_is_based_on_deployment_and_normalized_text():
+    # given
+    cache = EmbeddingCache(MagicMock(), "some-deployment")
+    other_cache = EmbeddingCache(MagicMock(), "some-other-deployment")
+
+    # then
+    assert cache.key("some  text\n") == cache.key("some text")
+    assert cache.key("some text").startswith("some-deployment/")
+    assert cache.key("some text") != other_cache.key("some text")
+    assert cache.key("some text") != cache.key("some other text")
+
+
+def test_embedding_cache_round_trips_embeddings_and_counts_hits(sqlite_backend):
+    # given
+    cache = EmbeddingCache(sqlite_backend, "some-deployment")
+    cache.set_many(["a", "b"], [[0.5, 1.0], [2.0, 4.0]])
+
+    # when
+    embeddings = cache.get_many(["b", "c", "a"])
+
+    # then
+    assert embeddings == [[2.0, 4.0], None, [0.5, 1.0]]
+    assert cache.stats() == {"hits": 2, "misses": 1}
+
+
+def test_embedding_cache_treats_backend_errors_as_misses():
+    # given
+    backend = MagicMock()
+    backend.get_many.side_effect = Exception("Some error")
+    cache = EmbeddingCache(backend, "some-deployment")
+
+    # when
+    embeddings = cache.get_many(["a"])
+
+    # then
+    assert embeddings == [None]
+    assert cache.stats() == {"hits": 0, "misses": 1}
+
+
+def test_create_returns_none_when_cache_is_disabled():
+    # given
+    env_helper = MagicMock()
+    env_helper.EMBEDDING_CACHE_BACKEND = "none"
+
+    # then
+    assert EmbeddingCache.create(env_helper) is None
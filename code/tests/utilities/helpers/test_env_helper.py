@@ -1,6 +1,7 @@
 from unittest.mock import patch
 from pytest import MonkeyPatch
 import pytest
+from backend.batch.utilities.helpers.config.vector_search_mode import VectorSearchMode
 from backend.batch.utilities.helpers.env_helper import EnvHelper
 
 
@@ -157,6 +158,31 @@ def test_env_helper_not_created_if_error_occurs(_):
     assert EnvHelper._instance is None
 
 
+def test_vector_search_mode_is_parsed(monkeypatch: MonkeyPatch):
+    # given
+    monkeypatch.setenv("AZURE_SEARCH_VECTOR_SEARCH_MODE", "Exhaustive")
+
+    # when
+    vector_search_mode = EnvHelper().AZURE_SEARCH_VECTOR_SEARCH_MODE
+
+    # then
+    assert vector_search_mode == VectorSearchMode.EXHAUSTIVE
+
+
+def test_env_helper_not_created_with_invalid_vector_search_mode(
+    monkeypatch: MonkeyPatch,
+):
+    # given
+    monkeypatch.setenv("AZURE_SEARCH_VECTOR_SEARCH_MODE", "approximate")
+
+    # when
+    with pytest.raises(ValueError):
+        EnvHelper()
+
+    # then
+    assert EnvHelper._instance is None
+
+
 def test_database_type_if_set_as_postgresql(monkeypatch: MonkeyPatch):
     # given
     monkeypatch.setenv("DATABASE_TYPE", "PostgreSQL")
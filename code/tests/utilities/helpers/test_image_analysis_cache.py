@@ -0,0 +1,110 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.batch.utilities.helpers.embedding_cache import SqliteEmbeddingCacheBackend
+from backend.batch.utilities.helpers.image_analysis_cache import ImageAnalysisCache
+
+IMAGE_HASH = ImageAnalysisCache.hash_image(b"some image")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ImageAnalysisCache(
+        SqliteEmbeddingCacheBackend(str(tmp_path / "cache.sqlite3"), 10)
+    )
+
+
+def test_get_or_caption_captions_each_image_once(cache: ImageAnalysisCache):
+    # given
+    caption = MagicMock(return_value="A logo")
+
+    # when
+    captions = [cache.get_or_caption(IMAGE_HASH, "gpt-4.1", caption) for _ in range(2)]
+
+    # then
+    assert captions == ["A logo", "A logo"]
+    caption.assert_called_once_with()
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_get_or_caption_keys_entries_by_model(cache: ImageAnalysisCache):
+    # given
+    cache.get_or_caption(IMAGE_HASH, "gpt-4.1", lambda: "A logo")
+    caption = MagicMock(return_value="A company logo")
+
+    # when
+    result = cache.get_or_caption(IMAGE_HASH, "gpt-4o", caption)
+
+    # then
+    assert result == "A company logo"
+    caption.assert_called_once_with()
+
+
+def test_get_or_vectorize_vectorizes_each_image_once(cache: ImageAnalysisCache):
+    # given
+    vectorize = MagicMock(return_value=[0.5, 1.0, 2.0])
+
+    # when
+    vectors = [
+        cache.get_or_vectorize(IMAGE_HASH, "2023-04-15", vectorize) for _ in range(2)
+    ]
+
+    # then
+    assert vectors == [[0.5, 1.0, 2.0], [0.5, 1.0, 2.0]]
+    vectorize.assert_called_once_with()
+
+
+def test_captions_and_vectors_of_the_same_image_do_not_collide(
+    cache: ImageAnalysisCache,
+):
+    # given
+    cache.get_or_caption(IMAGE_HASH, "model", lambda: "A logo")
+
+    # when
+    vector = cache.get_or_vectorize(IMAGE_HASH, "model", lambda: [1.0])
+
+    # then
+    assert vector == [1.0]
+
+
+def test_cache_failures_do_not_fail_analysis():
+    # given
+    backend = MagicMock()
+    backend.get_many.side_effect = Exception("Read failed")
+    backend.set_many.side_effect = Exception("Write failed")
+    cache = ImageAnalysisCache(backend)
+
+    # when
+    caption = cache.get_or_caption(IMAGE_HASH, "gpt-4.1", lambda: "A logo")
+
+    # then
+    assert caption == "A logo"
+
+
+def test_without_backend_every_image_is_analyzed():
+    # given
+    cache = ImageAnalysisCache(None)
+    vectorize = MagicMock(return_value=[1.0])
+
+    # when
+    cache.get_or_vectorize(IMAGE_HASH, "2023-04-15", vectorize)
+    cache.get_or_vectorize(IMAGE_HASH, "2023-04-15", vectorize)
+
+    # then
+    assert vectorize.call_count == 2
+
+
+def test_create_uses_the_embedding_cache_backend(tmp_path):
+    # given
+    env_helper = MagicMock()
+    env_helper.EMBEDDING_CACHE_BACKEND = "sqlite"
+    env_helper.EMBEDDING_CACHE_PATH = str(tmp_path / "cache.sqlite3")
+    env_helper.EMBEDDING_CACHE_MAX_ENTRIES = 10
+
+    # when
+    cache = ImageAnalysisCache.create(env_helper)
+
+    # then
+    assert isinstance(cache.backend, SqliteEmbeddingCacheBackend)
+    assert cache.backend.path == env_helper.EMBEDDING_CACHE_PATH
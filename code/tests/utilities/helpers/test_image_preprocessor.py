@@ -0,0 +1,124 @@
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from backend.batch.utilities.helpers.image_preprocessor import ImagePreprocessor
+
+IMAGE_URL = "https://account.blob.core.windows.net/documents/image.png?sas=token"
+
+
+def create_image(size, mode="RGB", format="PNG") -> bytes:
+    image = io.BytesIO()
+    Image.new(mode, size).save(image, format=format)
+    return image.getvalue()
+
+
+@pytest.fixture
+def image_preprocessor():
+    return ImagePreprocessor(max_dimension=1024)
+
+
+def test_prepare_downscales_large_images_to_jpeg(
+    image_preprocessor: ImagePreprocessor,
+):
+    # given
+    image = create_image((3000, 1500))
+
+    # when
+    prepared, mime_type = image_preprocessor.prepare(IMAGE_URL, image)
+
+    # then
+    assert mime_type == "image/jpeg"
+    with Image.open(io.BytesIO(prepared)) as downscaled:
+        assert downscaled.size == (1024, 512)
+        assert downscaled.format == "JPEG"
+
+
+def test_prepare_keeps_transparency(image_preprocessor: ImagePreprocessor):
+    # given
+    image = create_image((2048, 2048), mode="RGBA")
+
+    # when
+    prepared, mime_type = image_preprocessor.prepare(IMAGE_URL, image)
+
+    # then
+    assert mime_type == "image/png"
+    with Image.open(io.BytesIO(prepared)) as downscaled:
+        assert downscaled.size == (1024, 1024)
+        assert downscaled.mode == "RGBA"
+
+
+def test_prepare_returns_small_images_as_they_are(
+    image_preprocessor: ImagePreprocessor,
+):
+    # given
+    image = create_image((800, 600))
+
+    # when
+    prepared, mime_type = image_preprocessor.prepare(IMAGE_URL, image)
+
+    # then
+    assert prepared is image
+    assert mime_type == "image/png"
+
+
+def test_prepare_returns_images_that_cannot_be_decoded_as_they_are(
+    image_preprocessor: ImagePreprocessor,
+):
+    # when
+    prepared, mime_type = image_preprocessor.prepare(
+        "https://example.com/image.jpg", b"not an image"
+    )
+
+    # then
+    assert prepared == b"not an image"
+    assert mime_type == "image/jpeg"
+
+
+def test_fetch_downloads_urls(image_preprocessor: ImagePreprocessor):
+    # given
+    with patch(
+        "backend.batch.utilities.helpers.image_preprocessor.requests.get"
+    ) as get_mock:
+        get_mock.return_value.content = b"image"
+
+        # when
+        image = image_preprocessor.fetch(IMAGE_URL)
+
+    # then
+    assert image == b"image"
+    get_mock.assert_called_once_with(IMAGE_URL, timeout=30)
+    get_mock.return_value.raise_for_status.assert_called_once_with()
+
+
+def test_fetch_reads_local_files(image_preprocessor: ImagePreprocessor, tmp_path):
+    # given
+    path = tmp_path / "image.png"
+    path.write_bytes(b"image")
+
+    # when
+    image = image_preprocessor.fetch(str(path))
+
+    # then
+    assert image == b"image"
+
+
+def test_to_data_url():
+    assert (
+        ImagePreprocessor.to_data_url(b"image", "image/png")
+        == "data:image/png;base64,aW1hZ2U="
+    )
+
+
+def test_create_uses_max_dimension_from_env():
+    # given
+    env_helper = MagicMock()
+    env_helper.ADVANCED_IMAGE_PROCESSING_MAX_DIMENSION = 512
+
+    # when
+    image_preprocessor = ImagePreprocessor.create(env_helper)
+
+    # then
+    assert image_preprocessor.max_dimension == 512
@@ -1,6 +1,10 @@
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
+from openai import BadRequestError
 from backend.batch.utilities.helpers.llm_helper import LLMHelper
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from openai.types.create_embedding_response import CreateEmbeddingResponse
@@ -31,6 +35,9 @@ def env_helper_mock():
         env_helper.AZURE_OPENAI_MODEL = AZURE_OPENAI_MODEL
         env_helper.AZURE_OPENAI_MAX_TOKENS = AZURE_OPENAI_MAX_TOKENS
         env_helper.AZURE_OPENAI_EMBEDDING_MODEL = AZURE_OPENAI_EMBEDDING_MODEL
+        env_helper.AZURE_OPENAI_EMBEDDING_BATCH_SIZE = 16
+        env_helper.AZURE_OPENAI_EMBEDDING_BATCH_MAX_TOKENS = 100000
+        env_helper.EMBEDDING_CACHE_BACKEND = "none"
         env_helper.AZURE_SUBSCRIPTION_ID = AZURE_SUBSCRIPTION_ID
         env_helper.AZURE_RESOURCE_GROUP = AZURE_RESOURCE_GROUP
         env_helper.AZURE_ML_WORKSPACE_NAME = AZURE_ML_WORKSPACE_NAME
@@ -139,6 +146,167 @@ def test_generate_embeddings_returns_embeddings(azure_openai_mock):
     assert actual_embeddings == expected_embeddings
 
 
+def create_embedding_response(inputs: list[str]) -> CreateEmbeddingResponse:
+    # Return the embeddings out of order to check they are re-ordered by index
+    return CreateEmbeddingResponse(
+        data=[
+            Embedding(embedding=[float(len(text))], index=i, object="embedding")
+            for i, text in reversed(list(enumerate(inputs)))
+        ],
+        model="mock-model",
+        object="list",
+        usage={"prompt_tokens": 0, "total_tokens": 0},
+    )
+
+
+def test_embed_batch_embeds_inputs_in_a_single_request(azure_openai_mock):
+    # given
+    llm_helper = LLMHelper()
+    azure_openai_mock.return_value.embeddings.create.side_effect = (
+        lambda input, model: create_embedding_response(input)
+    )
+
+    # when
+    embeddings = llm_helper.embed_batch(["a", "bb", "ccc"])
+
+    # then
+    azure_openai_mock.return_value.embeddings.create.assert_called_once_with(
+        input=["a", "bb", "ccc"], model=AZURE_OPENAI_EMBEDDING_MODEL
+    )
+    assert embeddings == [[1.0], [2.0], [3.0]]
+
+
+def test_embed_batch_respects_batch_size(azure_openai_mock, env_helper_mock):
+    # given
+    env_helper_mock.AZURE_OPENAI_EMBEDDING_BATCH_SIZE = 2
+    llm_helper = LLMHelper()
+    azure_openai_mock.return_value.embeddings.create.side_effect = (
+        lambda input, model: create_embedding_response(input)
+    )
+
+    # when
+    embeddings = llm_helper.embed_batch(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    # then
+    calls = azure_openai_mock.return_value.embeddings.create.call_args_list
+    assert [c.kwargs["input"] for c in calls] == [
+        ["a", "bb"],
+        ["ccc", "dddd"],
+        ["eeeee"],
+    ]
+    assert embeddings == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+
+
+def test_embed_batch_respects_token_budget(azure_openai_mock, env_helper_mock):
+    # given
+    env_helper_mock.AZURE_OPENAI_EMBEDDING_BATCH_MAX_TOKENS = 4
+    llm_helper = LLMHelper()
+    azure_openai_mock.return_value.embeddings.create.side_effect = (
+        lambda input, model: create_embedding_response(input)
+    )
+
+    # when
+    llm_helper.embed_batch(["one two three", "four five", "six"])
+
+    # then
+    calls = azure_openai_mock.return_value.embeddings.create.call_args_list
+    assert [c.kwargs["input"] for c in calls] == [
+        ["one two three"],
+        ["four five", "six"],
+    ]
+
+
+def test_embed_batch_splits_batch_on_failure(azure_openai_mock):
+    # given
+    llm_helper = LLMHelper()
+
+    def create(input, model):
+        if len(input) > 1:
+            raise BadRequestError(
+                "Too many tokens",
+                response=httpx.Response(
+                    400, request=httpx.Request("POST", AZURE_OPENAI_ENDPOINT)
+                ),
+                body=None,
+            )
+        return create_embedding_response(input)
+
+    azure_openai_mock.return_value.embeddings.create.side_effect = create
+
+    # when
+    embeddings = llm_helper.embed_batch(["a", "bb", "ccc"])
+
+    # then
+    assert embeddings == [[1.0], [2.0], [3.0]]
+
+
+def test_embed_batch_raises_when_single_input_fails(azure_openai_mock):
+    # given
+    llm_helper = LLMHelper()
+    azure_openai_mock.return_value.embeddings.create.side_effect = BadRequestError(
+        "Too many tokens",
+        response=httpx.Response(
+            400, request=httpx.Request("POST", AZURE_OPENAI_ENDPOINT)
+        ),
+        body=None,
+    )
+
+    # when + then
+    with pytest.raises(BadRequestError):
+        llm_helper.embed_batch(["a"])
+
+
+def test_embed_batch_uses_embedding_cache(azure_openai_mock, env_helper_mock, tmp_path):
+    # given
+    env_helper_mock.EMBEDDING_CACHE_BACKEND = "sqlite"
+    env_helper_mock.EMBEDDING_CACHE_PATH = str(tmp_path / "cache.sqlite3")
+    env_helper_mock.EMBEDDING_CACHE_MAX_ENTRIES = 10
+    azure_openai_mock.return_value.embeddings.create.side_effect = (
+        lambda input, model: create_embedding_response(input)
+    )
+    LLMHelper().embed_batch(["a", "bb"])
+    azure_openai_mock.return_value.embeddings.create.reset_mock()
+    llm_helper = LLMHelper()
+
+    # when
+    embeddings = llm_helper.embed_batch(["a", "ccc", "bb"])
+
+    # then
+    azure_openai_mock.return_value.embeddings.create.assert_called_once_with(
+        input=["ccc"], model=AZURE_OPENAI_EMBEDDING_MODEL
+    )
+    assert embeddings == [[1.0], [3.0], [2.0]]
+    assert llm_helper.get_embedding_cache().stats() == {"hits": 2, "misses": 1}
+
+
+@patch("backend.batch.utilities.helpers.llm_helper.EmbeddingCache")
+def test_get_embedding_cache_creates_cache_once_across_threads(
+    mock_embedding_cache, env_helper_mock
+):
+    # given
+    def create(env_helper):
+        time.sleep(0.05)
+        return MagicMock()
+
+    mock_embedding_cache.create.side_effect = create
+    llm_helper = LLMHelper()
+    caches = []
+    threads = [
+        threading.Thread(target=lambda: caches.append(llm_helper.get_embedding_cache()))
+        for _ in range(4)
+    ]
+
+    # when
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # then
+    mock_embedding_cache.create.assert_called_once_with(env_helper_mock)
+    assert all(cache is caches[0] for cache in caches)
+
+
 @patch("backend.batch.utilities.helpers.llm_helper.get_azure_credential")
 @patch("backend.batch.utilities.helpers.llm_helper.MLClient")
 def test_get_ml_client_initializes_with_expected_parameters(
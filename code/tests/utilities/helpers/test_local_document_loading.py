@@ -0,0 +1,220 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from backend.batch.utilities.document_loading.download import (
+    decode_document,
+    download_document,
+)
+from backend.batch.utilities.document_loading.html import HtmlDocumentLoading
+from backend.batch.utilities.document_loading.strategies import get_document_loader
+from backend.batch.utilities.document_loading.text import TextDocumentLoading
+from backend.batch.utilities.document_loading.web import WebDocumentLoading
+
+BLOB_URL = "https://account.blob.core.windows.net/documents/sample.txt?sas-token"
+DOCUMENT_URL = "https://example.com/sample.html"
+HTML_CONTENT = """<!DOCTYPE html>
+<html>
+<head><title>Sample</title><style>p { color: red; }</style></head>
+<body>
+<nav><a href="/">Home</a></nav>
+<h1>Sample   heading</h1>
+<!-- a comment -->
+<p>First paragraph with <b>bold</b> text &amp; an entity.</p>
+<script>var tracking = true;</script>
+<ul><li>One</li><li>Two</li></ul>
+<footer>Copyright</footer>
+</body>
+</html>"""
+
+
+@pytest.fixture
+def download_document_mock():
+    with patch(
+        "backend.batch.utilities.document_loading.text.download_document"
+    ) as text_mock, patch(
+        "backend.batch.utilities.document_loading.html.download_document",
+        new=text_mock,
+    ):
+        yield text_mock
+
+
+@pytest.mark.parametrize(
+    "data,expected",
+    [
+        ("héllo wörld".encode("utf-8"), "héllo wörld"),
+        ("héllo wörld".encode("utf-8-sig"), "héllo wörld"),
+        ("héllo wörld".encode("utf-16"), "héllo wörld"),
+    ],
+)
+def test_decode_document(data, expected):
+    assert decode_document(data) == expected
+
+
+def test_decode_document_detects_legacy_encoding():
+    # given
+    text = "Ceci est un exemple de texte en français, très simple et lisible. " * 20
+
+    # when
+    content = decode_document(text.encode("cp1252"))
+
+    # then
+    assert "français" in content
+
+
+@patch("backend.batch.utilities.document_loading.download.BlobClient")
+def test_download_document_uses_blob_client_for_blobs(blob_client_mock: MagicMock):
+    # given
+    blob_client_mock.from_blob_url.return_value.download_blob.return_value.readall.return_value = (
+        b"content"
+    )
+
+    # when
+    data = download_document(BLOB_URL)
+
+    # then
+    assert data == b"content"
+    assert blob_client_mock.from_blob_url.call_args[0] == (BLOB_URL,)
+
+
+@patch("backend.batch.utilities.document_loading.download._session")
+def test_download_document_uses_pooled_session(session_mock: MagicMock):
+    # given
+    session_mock.get.return_value.content = b"content"
+
+    # when
+    data = download_document(DOCUMENT_URL)
+
+    # then
+    assert data == b"content"
+    session_mock.get.assert_called_once_with(DOCUMENT_URL)
+    session_mock.get.return_value.raise_for_status.assert_called_once_with()
+
+
+def test_text_loader_returns_decoded_content(download_document_mock: MagicMock):
+    # given
+    download_document_mock.return_value = "# Title\n\nSome text".encode("utf-8")
+
+    # when
+    documents = TextDocumentLoading().load(BLOB_URL)
+
+    # then
+    download_document_mock.assert_called_once_with(BLOB_URL)
+    assert len(documents) == 1
+    assert documents[0].content == "# Title\n\nSome text"
+    assert documents[0].source == BLOB_URL
+
+
+def test_html_loader_extracts_text_without_boilerplate(
+    download_document_mock: MagicMock,
+):
+    # given
+    download_document_mock.return_value = HTML_CONTENT.encode("utf-8")
+
+    # when
+    documents = HtmlDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    assert documents[0].content == (
+        "Sample heading\n\nFirst paragraph with bold text & an entity.\n\nOne\nTwo"
+    )
+
+
+def test_html_loader_parses_xml_declaration(download_document_mock: MagicMock):
+    # given
+    download_document_mock.return_value = (
+        b'<?xml version="1.0" encoding="utf-8"?><html><body><p>Text</p></body></html>'
+    )
+
+    # when
+    documents = HtmlDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    assert documents[0].content == "Text"
+
+
+@pytest.mark.parametrize(
+    "strategy,loader_class",
+    [("text", TextDocumentLoading), ("html", HtmlDocumentLoading)],
+)
+def test_get_document_loader_returns_local_loaders(strategy, loader_class):
+    assert isinstance(get_document_loader(strategy), loader_class)
+
+
+@pytest.mark.azure
+def test_benchmark_local_loaders_against_web_loader(httpserver, ca, monkeypatch):
+    """Micro-benchmark of the local loaders against the WebBaseLoader path."""
+    paragraphs = "".join(
+        f"<p>Paragraph {i} of the sample document.</p>\n" for i in range(20000)
+    )
+    httpserver.expect_request("/sample.html").respond_with_data(
+        HTML_CONTENT.replace("</footer>", f"</footer>{paragraphs}"),
+        content_type="text/html",
+    )
+    httpserver.expect_request("/sample.txt").respond_with_data(
+        paragraphs, content_type="text/plain"
+    )
+
+    with ca.cert_pem.tempfile() as ca_temp_path:
+        monkeypatch.setenv("REQUESTS_CA_BUNDLE", ca_temp_path)
+        for path, loader in [
+            ("/sample.html", HtmlDocumentLoading()),
+            ("/sample.txt", TextDocumentLoading()),
+        ]:
+            url = httpserver.url_for(path)
+            start_time = time.perf_counter()
+            WebDocumentLoading().load(url)
+            web_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            loader.load(url)
+            local_time = time.perf_counter() - start_time
+
+            print(
+                f"{path}: WebBaseLoader {web_time:.3f}s, "
+                f"{type(loader).__name__} {local_time:.3f}s"
+            )
+
+
+def test_html_loader_separates_nested_blocks_from_parent_text(
+    download_document_mock: MagicMock,
+):
+    # given
+    download_document_mock.return_value = (
+        b"<html><body><div>intro<p>para</p>outro</div></body></html>"
+    )
+
+    # when
+    documents = HtmlDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    assert documents[0].content == "intro\npara\noutro"
+
+
+def test_html_loader_keeps_text_inside_forms(download_document_mock: MagicMock):
+    # given
+    download_document_mock.return_value = (
+        b'<html><body><form id="aspnetForm"><h1>Title</h1><p>Body text</p>'
+        b"<button>Submit</button></form></body></html>"
+    )
+
+    # when
+    documents = HtmlDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    assert documents[0].content == "Title\nBody text"
+
+
+@pytest.mark.parametrize("html_content", [b"", b"   ", b"<!-- comment -->"])
+def test_html_loader_returns_empty_document_without_elements(
+    download_document_mock: MagicMock, html_content: bytes
+):
+    # given
+    download_document_mock.return_value = html_content
+
+    # when
+    documents = HtmlDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    assert len(documents) == 1
+    assert documents[0].content == ""
@@ -0,0 +1,254 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+from backend.batch.utilities.helpers.postgres_connection_pool import (
+    POSTGRES_TOKEN_SCOPE,
+    AccessTokenCache,
+    PostgresConnectionPool,
+)
+
+MODULE = "backend.batch.utilities.helpers.postgres_connection_pool"
+
+
+def create_connection():
+    connection = MagicMock()
+    connection.closed = 0
+    connection.info.transaction_status = TRANSACTION_STATUS_IDLE
+    return connection
+
+
+def create_token(token: str, expires_in: float):
+    access_token = MagicMock()
+    access_token.token = token
+    access_token.expires_on = time.time() + expires_in
+    return access_token
+
+
+@pytest.fixture
+def connect():
+    return MagicMock(side_effect=lambda: create_connection())
+
+
+def test_get_token_caches_the_token_until_it_is_about_to_expire():
+    # given
+    credential = MagicMock()
+    credential.get_token.side_effect = [
+        create_token("first", 3600),
+        create_token("second", 3600),
+    ]
+    access_token_cache = AccessTokenCache(credential)
+
+    # when
+    tokens = [access_token_cache.get_token() for _ in range(3)]
+
+    # then
+    assert tokens == ["first", "first", "first"]
+    credential.get_token.assert_called_once_with(POSTGRES_TOKEN_SCOPE)
+
+
+def test_get_token_refreshes_the_token_before_it_expires():
+    # given
+    credential = MagicMock()
+    credential.get_token.side_effect = [
+        create_token("first", 60),
+        create_token("second", 3600),
+    ]
+    access_token_cache = AccessTokenCache(credential, refresh_margin=300)
+
+    # when
+    tokens = [access_token_cache.get_token() for _ in range(2)]
+
+    # then
+    assert tokens == ["first", "second"]
+    assert access_token_cache.refreshes == 2
+
+
+def test_getconn_reuses_released_connections(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+    connection = pool.getconn()
+    pool.putconn(connection)
+
+    # when
+    reused = pool.getconn()
+
+    # then
+    assert reused is connection
+    connect.assert_called_once_with()
+    reused.cursor.assert_not_called()
+
+
+def test_getconn_opens_connections_up_to_max_size(connect):
+    # given
+    pool = PostgresConnectionPool(connect, max_size=2, timeout=0.1)
+    connections = [pool.getconn(), pool.getconn()]
+
+    # when
+    with pytest.raises(TimeoutError):
+        pool.getconn()
+
+    # then
+    assert connections[0] is not connections[1]
+    assert pool.stats()["size"] == 2
+
+
+def test_getconn_waits_for_a_released_connection(connect):
+    # given
+    pool = PostgresConnectionPool(connect, max_size=1, timeout=5)
+    connection = pool.getconn()
+    threading.Timer(0.1, pool.putconn, args=(connection,)).start()
+
+    # when
+    reused = pool.getconn()
+
+    # then
+    assert reused is connection
+    connect.assert_called_once_with()
+
+
+def test_getconn_checks_connections_that_were_idle(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+    connection = pool.getconn()
+    pool.putconn(connection)
+
+    # when
+    with patch(f"{MODULE}.HEALTH_CHECK_AFTER_SECONDS", 0):
+        reused = pool.getconn()
+
+    # then
+    assert reused is connection
+    connection.cursor.return_value.__enter__.return_value.execute.assert_called_once_with(
+        "SELECT 1"
+    )
+
+
+def test_getconn_replaces_connections_that_fail_the_health_check(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+    broken = pool.getconn()
+    pool.putconn(broken)
+    broken.cursor.side_effect = psycopg2.OperationalError(
+        "server closed the connection"
+    )
+
+    # when
+    with patch(f"{MODULE}.HEALTH_CHECK_AFTER_SECONDS", 0):
+        connection = pool.getconn()
+
+    # then
+    assert connection is not broken
+    broken.close.assert_called_once_with()
+    assert pool.stats()["size"] == 1
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_putconn_rolls_back_open_transactions(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+    connection = pool.getconn()
+    connection.info.transaction_status = TRANSACTION_STATUS_INTRANS
+
+    # when
+    pool.putconn(connection)
+
+    # then
+    connection.rollback.assert_called_once_with()
+    assert pool.stats()["idle"] == 1
+
+
+def test_putconn_discards_closed_connections(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+    connection = pool.getconn()
+    connection.closed = 2
+
+    # when
+    pool.putconn(connection)
+
+    # then
+    assert pool.stats()["size"] == 0
+    assert pool.stats()["idle"] == 0
+
+
+def test_putconn_replaces_connections_past_their_lifetime(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+    connection = pool.getconn()
+
+    # when
+    with patch(f"{MODULE}.MAX_LIFETIME_SECONDS", 0):
+        pool.putconn(connection)
+
+    # then
+    connection.close.assert_called_once_with()
+    assert pool.getconn() is not connection
+
+
+def test_failed_connects_free_their_slot():
+    # given
+    connect = MagicMock(
+        side_effect=[Exception("Connection error"), create_connection()]
+    )
+    pool = PostgresConnectionPool(connect, max_size=1, timeout=0.1)
+
+    # when
+    with pytest.raises(Exception, match="Connection error"):
+        pool.getconn()
+    connection = pool.getconn()
+
+    # then
+    assert connection is not None
+    assert pool.stats()["size"] == 1
+
+
+def test_stats_record_connect_acquire_and_query_timings(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+
+    # when
+    for _ in range(2):
+        with pool.connection():
+            pass
+
+    # then
+    stats = pool.stats()
+    assert stats["connects"] == 1
+    assert stats["acquires"] == 2
+    assert stats["queries"] == 2
+    assert stats["connect_seconds"] >= 0
+    assert stats["acquire_seconds"] >= 0
+    assert stats["query_seconds"] >= 0
+
+
+def test_close_closes_idle_connections(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+    connection = pool.getconn()
+    pool.putconn(connection)
+
+    # when
+    pool.close()
+
+    # then
+    connection.close.assert_called_once_with()
+    assert pool.stats()["size"] == 0
+
+
+def test_connections_released_after_close_are_closed(connect):
+    # given
+    pool = PostgresConnectionPool(connect)
+    connection = pool.getconn()
+    pool.close()
+
+    # when
+    pool.putconn(connection)
+
+    # then
+    connection.close.assert_called_once_with()
+    assert pool.stats()["size"] == 0
@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import MagicMock, patch
 
 import pytest
 from backend.batch.utilities.helpers.embedders.postgres_embedder import PostgresEmbedder
@@ -26,6 +26,7 @@ def llm_helper_mock():
         choice.message.content = "This is a caption for an image"
         mock_completion.choices = [choice]
         llm_helper.generate_embeddings.return_value = [123]
+        llm_helper.embed_batch.side_effect = lambda texts: [[123] for _ in texts]
         yield llm_helper
 
 
@@ -134,7 +135,9 @@ def test_embed_file(
     )
 
     # Mock methods
-    llm_helper_mock.generate_embeddings.return_value = [0.1, 0.2, 0.3]
+    llm_helper_mock.embed_batch.side_effect = lambda texts: [
+        [0.1, 0.2, 0.3] for _ in texts
+    ]
     azure_postgres_helper_mock.create_vector_store.return_value = True
 
     # Execute
@@ -147,9 +150,10 @@ def test_embed_file(
     document_chunking_mock.return_value.chunk.assert_called_once_with(
         document_loading_mock.return_value.load.return_value, embedding_config.chunking
     )
-    llm_helper_mock.generate_embeddings.assert_has_calls(
-        [call("some content"), call("some other content")]
+    llm_helper_mock.embed_batch.assert_called_once_with(
+        ["some content", "some other content"]
     )
+    llm_helper_mock.generate_embeddings.assert_not_called()
 
 
 def test_advanced_image_processing_not_implemented():
@@ -176,6 +180,31 @@ def test_advanced_image_processing_not_implemented():
     )
 
 
+def test_postgres_embed_file_marks_blob_with_properties_read_before_loading(
+    document_loading_mock, env_helper_mock
+):
+    # given
+    blob_client = MagicMock()
+    properties = MagicMock()
+    calls = []
+    blob_client.get_blob_properties.side_effect = lambda file_name: (
+        calls.append("get_blob_properties") or properties
+    )
+    document_loading_mock.return_value.load.side_effect = (
+        lambda source_url, loading: calls.append("load") or []
+    )
+    embedder = PostgresEmbedder(blob_client, env_helper_mock)
+
+    # when
+    embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    assert calls[:2] == ["get_blob_properties", "load"]
+    blob_client.mark_embeddings_added.assert_called_once_with(
+        "some-file-name.pdf", properties
+    )
+
+
 def test_postgres_embed_file_loads_documents(document_loading_mock, env_helper_mock):
     # given
     push_embedder = PostgresEmbedder(MagicMock(), env_helper_mock)
@@ -193,6 +222,23 @@ def test_postgres_embed_file_loads_documents(document_loading_mock, env_helper_m
     )
 
 
+def test_postgres_embed_documents_chunks_loaded_documents(
+    document_loading_mock, document_chunking_mock, env_helper_mock
+):
+    # given
+    postgres_embedder = PostgresEmbedder(MagicMock(), env_helper_mock)
+    documents = [SourceDocument(content="fetched content", source="some-url")]
+
+    # when
+    postgres_embedder.embed_documents("some-url", "some-file-name.pdf", documents)
+
+    # then
+    document_loading_mock.return_value.load.assert_not_called()
+    document_chunking_mock.return_value.chunk.assert_called_once_with(
+        documents, CHUNKING_SETTINGS
+    )
+
+
 def test_postgres_embed_file_chunks_documents(
     document_loading_mock, document_chunking_mock, env_helper_mock
 ):
@@ -209,3 +255,23 @@ def test_postgres_embed_file_chunks_documents(
     document_chunking_mock.return_value.chunk.assert_called_once_with(
         document_loading_mock.return_value.load.return_value, CHUNKING_SETTINGS
     )
+
+
+def test_postgres_embed_file_deletes_source_rows_when_document_has_no_chunks(
+    document_chunking_mock, azure_postgres_helper_mock, env_helper_mock
+):
+    # given
+    document_chunking_mock.return_value.chunk.return_value = []
+    postgres_embedder = PostgresEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    postgres_embedder.embed_file(
+        "https://example.com/some-file-name.pdf", "some-file-name.pdf"
+    )
+
+    # then
+    azure_postgres_helper = azure_postgres_helper_mock.return_value
+    azure_postgres_helper.create_vector_store.assert_not_called()
+    azure_postgres_helper.delete_documents_by_source.assert_called_once_with(
+        "https://example.com/some-file-name.pdf"
+    )
@@ -1,13 +1,20 @@
+import base64
+import gc
 import hashlib
+import io
 import json
+import threading
 import pytest
-from unittest.mock import MagicMock, call, patch
+from PIL import Image
+from unittest.mock import MagicMock, patch
 from backend.batch.utilities.helpers.embedders.push_embedder import PushEmbedder
 from backend.batch.utilities.document_chunking.chunking_strategy import ChunkingSettings
 from backend.batch.utilities.document_loading import LoadingSettings
 from backend.batch.utilities.document_loading.strategies import LoadingStrategy
 from backend.batch.utilities.common.source_document import SourceDocument
 from backend.batch.utilities.helpers.config.embedding_config import EmbeddingConfig
+from backend.batch.utilities.helpers.embedding_cache import SqliteEmbeddingCacheBackend
+from backend.batch.utilities.helpers.image_analysis_cache import ImageAnalysisCache
 
 CHUNKING_SETTINGS = ChunkingSettings({"strategy": "layout", "size": 1, "overlap": 0})
 LOADING_SETTINGS = LoadingSettings({"strategy": LoadingStrategy.LAYOUT})
@@ -28,6 +35,7 @@ AZURE_SEARCH_SEMANTIC_SEARCH_CONFIG = "default"
 AZURE_SEARCH_CONVERSATIONS_LOG_INDEX = "mock-log-index"
 USE_ADVANCED_IMAGE_PROCESSING = False
 AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE = 100
+AZURE_OPENAI_EMBEDDING_MODEL = "mock-embedding-model"
 
 
 @pytest.fixture(autouse=True)
@@ -45,6 +53,7 @@ def llm_helper_mock():
         mock_completion.choices = [choice]
 
         llm_helper.generate_embeddings.return_value = [123]
+        llm_helper.embed_batch.side_effect = lambda texts: [[123] for _ in texts]
         yield llm_helper
 
 
@@ -81,6 +90,14 @@ def env_helper_mock():
         env_helper.AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE = (
             AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE
         )
+        env_helper.AZURE_SEARCH_INCREMENTAL_INDEXING = True
+        env_helper.AZURE_OPENAI_EMBEDDING_MODEL = AZURE_OPENAI_EMBEDDING_MODEL
+        env_helper.AZURE_OPENAI_EMBEDDING_BATCH_SIZE = 16
+        env_helper.EMBEDDING_PIPELINE_CONCURRENCY = 2
+        env_helper.EMBEDDING_PIPELINE_QUEUE_DEPTH = 2
+        env_helper.ADVANCED_IMAGE_PROCESSING_MAX_DIMENSION = 1024
+        env_helper.ADVANCED_IMAGE_PROCESSING_CONCURRENCY = 2
+        env_helper.EMBEDDING_CACHE_BACKEND = "none"
         yield env_helper
 
 
@@ -172,32 +189,28 @@ def azure_computer_vision_mock():
 
 
 @pytest.fixture(autouse=True)
-def urllib_request_mock():
+def requests_get_mock():
     with patch(
-        "backend.batch.utilities.helpers.embedders.push_embedder.urllib.request.urlopen"
+        "backend.batch.utilities.helpers.image_preprocessor.requests.get"
     ) as mock:
-        # Create a mock response object
-        mock_response = MagicMock()
-        mock_response.read.return_value = b"fake_image_data"
-        mock_response.__enter__.return_value = mock_response
-        mock_response.__exit__.return_value = None
-        mock.return_value = mock_response
+        mock.return_value.content = b"fake_image_data"
         yield mock
 
 
 def test_embed_file_advanced_image_processing_vectorizes_image(
-    azure_computer_vision_mock,
+    azure_computer_vision_mock, env_helper_mock, requests_get_mock
 ):
     # given
-    push_embedder = PushEmbedder(MagicMock(), MagicMock())
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
     source_url = "http://localhost:8080/some-file-name.jpg"
 
     # when
     push_embedder.embed_file(source_url, "some-file-name.jpg")
 
     # then
-    azure_computer_vision_mock.return_value.vectorize_image.assert_called_once_with(
-        source_url
+    requests_get_mock.assert_called_once_with(source_url, timeout=30)
+    azure_computer_vision_mock.return_value.vectorize_image_bytes.assert_called_once_with(
+        b"fake_image_data"
     )
 
 
@@ -207,6 +220,9 @@ def test_embed_file_advanced_image_processing_uses_vision_model_for_captioning(
     # given
     env_helper_mock = MagicMock()
     env_helper_mock.AZURE_OPENAI_VISION_MODEL = "gpt-4.1"
+    env_helper_mock.ADVANCED_IMAGE_PROCESSING_MAX_DIMENSION = 1024
+    env_helper_mock.ADVANCED_IMAGE_PROCESSING_CONCURRENCY = 2
+    env_helper_mock.EMBEDDING_CACHE_BACKEND = "none"
     push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
     source_url = "http://localhost:8080/some-file-name.jpg"
 
@@ -238,9 +254,10 @@ def test_embed_file_advanced_image_processing_stores_embeddings_in_search_index(
     llm_helper_mock,
     azure_computer_vision_mock,
     azure_search_helper_mock: MagicMock,
+    env_helper_mock,
 ):
     # given
-    push_embedder = PushEmbedder(MagicMock(), MagicMock())
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
     storage_container = "some-container"
     file_name = "some-file-name.jpg"
     host_path = (
@@ -248,7 +265,7 @@ def test_embed_file_advanced_image_processing_stores_embeddings_in_search_index(
     )
     source_url = f"{host_path}?some-query=param"
     image_embeddings = [1.0, 2.0, 3.0]
-    azure_computer_vision_mock.return_value.vectorize_image.return_value = (
+    azure_computer_vision_mock.return_value.vectorize_image_bytes.return_value = (
         image_embeddings
     )
 
@@ -259,8 +276,8 @@ def test_embed_file_advanced_image_processing_stores_embeddings_in_search_index(
     hash_key = hashlib.sha1(f"{host_path}_1".encode("utf-8")).hexdigest()
     expected_id = f"doc_{hash_key}"
 
-    llm_helper_mock.generate_embeddings.assert_called_once_with(
-        "This is a caption for an image"
+    llm_helper_mock.embed_batch.assert_called_once_with(
+        ["This is a caption for an image"]
     )
 
     azure_search_helper_mock.return_value.get_search_client.return_value.upload_documents.assert_called_once_with(
@@ -285,10 +302,10 @@ def test_embed_file_advanced_image_processing_stores_embeddings_in_search_index(
 
 
 def test_embed_file_advanced_image_processing_raises_exception_on_failure(
-    azure_search_helper_mock,
+    azure_search_helper_mock, env_helper_mock
 ):
     # given
-    push_embedder = PushEmbedder(MagicMock(), MagicMock())
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
 
     successful_indexing_result = MagicMock()
     successful_indexing_result.succeeded = True
@@ -302,11 +319,110 @@ def test_embed_file_advanced_image_processing_raises_exception_on_failure(
     # when + then
     with pytest.raises(Exception):
         push_embedder.embed_file(
-            "some-url",
+            "http://localhost:8080/some-file-name.jpg",
             "some-file-name.jpg",
         )
 
 
+def test_embed_file_advanced_image_processing_captions_while_vectorizing_image(
+    llm_helper_mock,
+    azure_computer_vision_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    # Each call waits for the other, so they only complete if they run concurrently
+    barrier = threading.Barrier(2, timeout=5)
+    caption_response = llm_helper_mock.get_chat_completion.return_value
+    llm_helper_mock.get_chat_completion.side_effect = lambda *args: (
+        barrier.wait(),
+        caption_response,
+    )[1]
+    azure_computer_vision_mock.return_value.vectorize_image_bytes.side_effect = (
+        lambda image: (barrier.wait(), [1.0])[1]
+    )
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file(
+        "http://localhost:8080/some-file-name.jpg", "some-file-name.jpg"
+    )
+
+    # then
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    uploaded = search_client.upload_documents.call_args[0][0]
+    assert uploaded[0]["content"] == "This is a caption for an image"
+    assert uploaded[0]["image_vector"] == [1.0]
+
+
+def test_embed_file_advanced_image_processing_downscales_image_once(
+    llm_helper_mock,
+    azure_computer_vision_mock,
+    env_helper_mock,
+    requests_get_mock,
+):
+    # given
+    image = io.BytesIO()
+    Image.new("RGB", (4000, 2000)).save(image, format="PNG")
+    requests_get_mock.return_value.content = image.getvalue()
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file(
+        "http://localhost:8080/some-file-name.jpg", "some-file-name.jpg"
+    )
+
+    # then
+    requests_get_mock.assert_called_once()
+    vectorized = (
+        azure_computer_vision_mock.return_value.vectorize_image_bytes.call_args[0][0]
+    )
+    with Image.open(io.BytesIO(vectorized)) as downscaled:
+        assert downscaled.size == (1024, 512)
+    messages = llm_helper_mock.get_chat_completion.call_args[0][0]
+    assert messages[1]["content"][1]["image_url"]["url"] == (
+        "data:image/jpeg;base64," + base64.b64encode(vectorized).decode("utf-8")
+    )
+
+
+def test_embed_file_advanced_image_processing_reuses_analysis_of_duplicate_images(
+    llm_helper_mock,
+    azure_computer_vision_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+    tmp_path,
+):
+    # given
+    azure_computer_vision_mock.return_value.model_version = "2023-04-15"
+    azure_computer_vision_mock.return_value.vectorize_image_bytes.return_value = [
+        1.0,
+        2.0,
+    ]
+    image_analysis_cache = ImageAnalysisCache(
+        SqliteEmbeddingCacheBackend(str(tmp_path / "cache.sqlite3"), 10)
+    )
+    with patch(
+        "backend.batch.utilities.helpers.embedders.push_embedder.ImageAnalysisCache.create",
+        return_value=image_analysis_cache,
+    ):
+        push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("http://localhost:8080/logo.jpg", "logo.jpg")
+    push_embedder.embed_file("http://localhost:8080/logo-copy.jpg", "logo-copy.jpg")
+
+    # then
+    llm_helper_mock.get_chat_completion.assert_called_once()
+    azure_computer_vision_mock.return_value.vectorize_image_bytes.assert_called_once()
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    documents = [call[0][0][0] for call in search_client.upload_documents.call_args_list]
+    assert [document["content"] for document in documents] == [
+        "This is a caption for an image"
+    ] * 2
+    assert [document["image_vector"] for document in documents] == [[1.0, 2.0]] * 2
+    assert image_analysis_cache.stats() == {"hits": 2, "misses": 2}
+
+
 def test_embed_file_use_advanced_image_processing_does_not_vectorize_image_if_unsupported(
     azure_computer_vision_mock,
     mock_config_helper,
@@ -330,10 +446,35 @@ def test_embed_file_use_advanced_image_processing_does_not_vectorize_image_if_un
     push_embedder.embed_file(source_url, "some-file-name.txt")
 
     # then
-    azure_computer_vision_mock.return_value.vectorize_image.assert_not_called()
+    azure_computer_vision_mock.return_value.vectorize_image_bytes.assert_not_called()
     azure_search_helper_mock.return_value.get_search_client.assert_called_once()
 
 
+def test_embed_file_marks_blob_with_properties_read_before_loading(
+    document_loading_mock, env_helper_mock
+):
+    # given
+    blob_client = MagicMock()
+    properties = MagicMock()
+    calls = []
+    blob_client.get_blob_properties.side_effect = lambda file_name: (
+        calls.append("get_blob_properties") or properties
+    )
+    document_loading_mock.return_value.load.side_effect = (
+        lambda source_url, loading: calls.append("load") or []
+    )
+    embedder = PushEmbedder(blob_client, env_helper_mock)
+
+    # when
+    embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    assert calls[:2] == ["get_blob_properties", "load"]
+    blob_client.mark_embeddings_added.assert_called_once_with(
+        "some-file-name.pdf", properties
+    )
+
+
 def test_embed_file_loads_documents(document_loading_mock, env_helper_mock):
     # given
     push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
@@ -369,6 +510,23 @@ def test_embed_file_chunks_documents(
     )
 
 
+def test_embed_documents_chunks_loaded_documents(
+    document_loading_mock, document_chunking_mock, env_helper_mock
+):
+    # given
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+    documents = [SourceDocument(content="fetched content", source="some-url")]
+
+    # when
+    push_embedder.embed_documents("some-url", "some-file-name.pdf", documents)
+
+    # then
+    document_loading_mock.return_value.load.assert_not_called()
+    document_chunking_mock.return_value.chunk.assert_called_once_with(
+        documents, CHUNKING_SETTINGS
+    )
+
+
 def test_embed_file_chunks_documents_upper_case(
     document_loading_mock, document_chunking_mock, env_helper_mock
 ):
@@ -400,9 +558,10 @@ def test_embed_file_generates_embeddings_for_documents(
     )
 
     # then
-    llm_helper_mock.generate_embeddings.assert_has_calls(
-        [call("some content"), call("some other content")]
+    llm_helper_mock.embed_batch.assert_called_once_with(
+        ["some content", "some other content"]
     )
+    llm_helper_mock.generate_embeddings.assert_not_called()
 
 
 def test_embed_file_stores_documents_in_search_index(
@@ -427,7 +586,7 @@ def test_embed_file_stores_documents_in_search_index(
             {
                 AZURE_SEARCH_FIELDS_ID: expected_chunked_documents[0].id,
                 AZURE_SEARCH_CONTENT_COLUMN: expected_chunked_documents[0].content,
-                AZURE_SEARCH_CONTENT_VECTOR_COLUMN: llm_helper_mock.generate_embeddings.return_value,
+                AZURE_SEARCH_CONTENT_VECTOR_COLUMN: [123],
                 AZURE_SEARCH_FIELDS_METADATA: json.dumps(
                     {
                         AZURE_SEARCH_FIELDS_ID: expected_chunked_documents[0].id,
@@ -441,6 +600,7 @@ def test_embed_file_stores_documents_in_search_index(
                         ].offset,
                         "page_number": expected_chunked_documents[0].page_number,
                         "chunk_id": expected_chunked_documents[0].chunk_id,
+                        "embedding_model": AZURE_OPENAI_EMBEDDING_MODEL,
                     }
                 ),
                 AZURE_SEARCH_TITLE_COLUMN: expected_chunked_documents[0].title,
@@ -451,7 +611,7 @@ def test_embed_file_stores_documents_in_search_index(
             {
                 AZURE_SEARCH_FIELDS_ID: expected_chunked_documents[1].id,
                 AZURE_SEARCH_CONTENT_COLUMN: expected_chunked_documents[1].content,
-                AZURE_SEARCH_CONTENT_VECTOR_COLUMN: llm_helper_mock.generate_embeddings.return_value,
+                AZURE_SEARCH_CONTENT_VECTOR_COLUMN: [123],
                 AZURE_SEARCH_FIELDS_METADATA: json.dumps(
                     {
                         AZURE_SEARCH_FIELDS_ID: expected_chunked_documents[1].id,
@@ -465,6 +625,7 @@ def test_embed_file_stores_documents_in_search_index(
                         ].offset,
                         "page_number": expected_chunked_documents[1].page_number,
                         "chunk_id": expected_chunked_documents[1].chunk_id,
+                        "embedding_model": AZURE_OPENAI_EMBEDDING_MODEL,
                     }
                 ),
                 AZURE_SEARCH_TITLE_COLUMN: expected_chunked_documents[1].title,
@@ -501,10 +662,10 @@ def test_embed_file_stores_documents_in_search_index_in_batches(
 
 
 def test_embed_file_raises_exception_on_failure(
-    azure_search_helper_mock,
+    azure_search_helper_mock, env_helper_mock
 ):
     # given
-    push_embedder = PushEmbedder(MagicMock(), MagicMock())
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
 
     successful_indexing_result = MagicMock(succeeded=True)
     failed_indexing_result = MagicMock(succeeded=False)
@@ -519,3 +680,292 @@ def test_embed_file_raises_exception_on_failure(
             "some-url",
             "some-file-name.pdf",
         )
+
+
+def indexed_document(
+    document: SourceDocument, embedding_model: str = AZURE_OPENAI_EMBEDDING_MODEL
+) -> dict:
+    """Builds the search result for a chunk indexed with the given embedding model."""
+    metadata = {
+        AZURE_SEARCH_FIELDS_ID: document.id,
+        AZURE_SEARCH_SOURCE_COLUMN: document.source,
+        AZURE_SEARCH_TITLE_COLUMN: document.title,
+        AZURE_SEARCH_CHUNK_COLUMN: document.chunk,
+        AZURE_SEARCH_OFFSET_COLUMN: document.offset,
+        "page_number": document.page_number,
+        "chunk_id": document.chunk_id,
+        "embedding_model": embedding_model,
+    }
+    return {
+        AZURE_SEARCH_FIELDS_ID: document.id,
+        AZURE_SEARCH_CONTENT_COLUMN: document.content,
+        AZURE_SEARCH_FIELDS_METADATA: json.dumps(metadata),
+        AZURE_SEARCH_TITLE_COLUMN: document.title,
+        AZURE_SEARCH_SOURCE_COLUMN: document.source,
+        AZURE_SEARCH_CHUNK_COLUMN: document.chunk,
+        AZURE_SEARCH_OFFSET_COLUMN: document.offset,
+    }
+
+
+def test_embed_file_only_uploads_changed_documents(
+    document_chunking_mock,
+    llm_helper_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    chunks = document_chunking_mock.return_value.chunk.return_value
+    outdated_chunk = indexed_document(chunks[1])
+    outdated_chunk[AZURE_SEARCH_CONTENT_COLUMN] = "some outdated content"
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    search_client.search.return_value = [indexed_document(chunks[0]), outdated_chunk]
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file(
+        "https://example.com/some-file-name.pdf?query", "some-file-name.pdf"
+    )
+
+    # then
+    search_client.search.assert_called_once_with(
+        "*",
+        filter=f"{AZURE_SEARCH_SOURCE_COLUMN} eq 'https://example.com/some-file-name.pdf'",
+        select=[
+            AZURE_SEARCH_FIELDS_ID,
+            AZURE_SEARCH_CONTENT_COLUMN,
+            AZURE_SEARCH_FIELDS_METADATA,
+            AZURE_SEARCH_TITLE_COLUMN,
+            AZURE_SEARCH_SOURCE_COLUMN,
+            AZURE_SEARCH_CHUNK_COLUMN,
+            AZURE_SEARCH_OFFSET_COLUMN,
+        ],
+    )
+    llm_helper_mock.embed_batch.assert_called_once_with(["some other content"])
+    uploaded_documents = search_client.upload_documents.call_args[0][0]
+    assert [d[AZURE_SEARCH_FIELDS_ID] for d in uploaded_documents] == [
+        "some other id"
+    ]
+    search_client.delete_documents.assert_not_called()
+
+
+def test_embed_file_uploads_documents_whose_metadata_changed(
+    document_chunking_mock,
+    llm_helper_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    chunks = document_chunking_mock.return_value.chunk.return_value
+    moved_chunk = indexed_document(chunks[1])
+    moved_chunk[AZURE_SEARCH_OFFSET_COLUMN] = 0
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    search_client.search.return_value = [indexed_document(chunks[0]), moved_chunk]
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    llm_helper_mock.embed_batch.assert_called_once_with(["some other content"])
+
+
+def test_embed_file_uploads_all_documents_when_embedding_model_changed(
+    document_chunking_mock,
+    llm_helper_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    chunks = document_chunking_mock.return_value.chunk.return_value
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    search_client.search.return_value = [
+        indexed_document(chunk, embedding_model="old-embedding-model")
+        for chunk in chunks
+    ]
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    llm_helper_mock.embed_batch.assert_called_once_with(
+        ["some content", "some other content"]
+    )
+
+
+def test_embed_file_deletes_stale_documents(
+    document_chunking_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    chunks = document_chunking_mock.return_value.chunk.return_value
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    search_client.search.return_value = [
+        indexed_document(chunks[0]),
+        {AZURE_SEARCH_FIELDS_ID: "some stale id", AZURE_SEARCH_CONTENT_COLUMN: "old"},
+    ]
+    search_client.delete_documents.return_value = [MagicMock(succeeded=True)]
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    search_client.delete_documents.assert_called_once_with(
+        [{AZURE_SEARCH_FIELDS_ID: "some stale id"}]
+    )
+
+
+def test_embed_file_deletes_stale_documents_when_document_has_no_chunks(
+    document_chunking_mock,
+    llm_helper_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    document_chunking_mock.return_value.chunk.return_value = []
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    search_client.search.return_value = [
+        {AZURE_SEARCH_FIELDS_ID: "some stale id", AZURE_SEARCH_CONTENT_COLUMN: "old"},
+    ]
+    search_client.delete_documents.return_value = [MagicMock(succeeded=True)]
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    llm_helper_mock.embed_batch.assert_not_called()
+    search_client.delete_documents.assert_called_once_with(
+        [{AZURE_SEARCH_FIELDS_ID: "some stale id"}]
+    )
+
+
+def test_embed_file_diffs_chunks_as_they_are_chunked(
+    document_chunking_mock,
+    llm_helper_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    env_helper_mock.AZURE_OPENAI_EMBEDDING_BATCH_SIZE = 1
+    env_helper_mock.EMBEDDING_PIPELINE_CONCURRENCY = 1
+    env_helper_mock.EMBEDDING_PIPELINE_QUEUE_DEPTH = 1
+    chunks = document_chunking_mock.return_value.chunk.return_value
+    pulled = []
+
+    def chunk(documents, chunking):
+        for document in chunks:
+            pulled.append(document.id)
+            yield document
+
+    document_chunking_mock.return_value.chunk.side_effect = chunk
+    embedded_after = []
+    llm_helper_mock.embed_batch.side_effect = lambda texts: (
+        embedded_after.append(list(pulled)) or [[123] for _ in texts]
+    )
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    assert embedded_after[0] == [chunks[0].id]
+
+
+def test_embed_file_uploads_all_documents_when_incremental_indexing_disabled(
+    llm_helper_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    env_helper_mock.AZURE_SEARCH_INCREMENTAL_INDEXING = False
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    search_client.search.assert_not_called()
+    search_client.delete_documents.assert_not_called()
+    llm_helper_mock.embed_batch.assert_called_once_with(
+        ["some content", "some other content"]
+    )
+
+
+def test_embed_file_embeds_documents_in_parallel_batches(
+    llm_helper_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    env_helper_mock.AZURE_OPENAI_EMBEDDING_BATCH_SIZE = 1
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    assert sorted(c.args[0] for c in llm_helper_mock.embed_batch.call_args_list) == [
+        ["some content"],
+        ["some other content"],
+    ]
+    # Both embedded chunks fit in one upload batch
+    search_client.upload_documents.assert_called_once()
+    uploaded_documents = search_client.upload_documents.call_args[0][0]
+    assert sorted(d[AZURE_SEARCH_FIELDS_ID] for d in uploaded_documents) == [
+        "some id",
+        "some other id",
+    ]
+
+
+def test_embed_file_uploads_full_batches_while_embedding(
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    env_helper_mock.AZURE_OPENAI_EMBEDDING_BATCH_SIZE = 1
+    env_helper_mock.AZURE_SEARCH_DOC_UPLOAD_BATCH_SIZE = 1
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when
+    push_embedder.embed_file("some-url", "some-file-name.pdf")
+
+    # then
+    assert search_client.upload_documents.call_count == 2
+
+
+def test_embed_file_raises_exception_when_embedding_fails(
+    llm_helper_mock,
+    azure_search_helper_mock: MagicMock,
+    env_helper_mock,
+):
+    # given
+    llm_helper_mock.embed_batch.side_effect = Exception("Some embedding error")
+    search_client = azure_search_helper_mock.return_value.get_search_client.return_value
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+
+    # when + then
+    with pytest.raises(Exception, match="Some embedding error"):
+        push_embedder.embed_file("some-url", "some-file-name.pdf")
+    search_client.upload_documents.assert_not_called()
+
+
+def test_image_executor_threads_exit_once_embedder_is_dropped(env_helper_mock):
+    # given
+    push_embedder = PushEmbedder(MagicMock(), env_helper_mock)
+    push_embedder.image_executor.submit(lambda: None).result()
+    threads = list(push_embedder.image_executor._threads)
+
+    # when
+    del push_embedder
+    gc.collect()
+
+    # then
+    for thread in threads:
+        thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in threads)
@@ -0,0 +1,78 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.batch.utilities.helpers.search_index_cache import (
+    MISSING_INDEX_TTL,
+    SearchIndexCache,
+)
+
+SERVICE = "https://example.search.windows.net"
+INDEX = "example-index"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    SearchIndexCache.clear()
+    yield
+    SearchIndexCache.clear()
+
+
+@pytest.fixture
+def monotonic_mock():
+    with patch(
+        "backend.batch.utilities.helpers.search_index_cache.time.monotonic",
+        return_value=1000.0,
+    ) as mock:
+        yield mock
+
+
+def test_exists_checks_once_within_ttl():
+    # given
+    check = MagicMock(return_value=True)
+
+    # when
+    results = [SearchIndexCache.exists(SERVICE, INDEX, 300.0, check) for _ in range(3)]
+
+    # then
+    assert results == [True, True, True]
+    check.assert_called_once_with()
+
+
+def test_exists_checks_again_when_expired(monotonic_mock: MagicMock):
+    # given
+    check = MagicMock(return_value=True)
+    SearchIndexCache.exists(SERVICE, INDEX, 300.0, check)
+
+    # when
+    monotonic_mock.return_value += 301.0
+    SearchIndexCache.exists(SERVICE, INDEX, 300.0, check)
+
+    # then
+    assert check.call_count == 2
+
+
+def test_missing_indexes_are_cached_for_a_shorter_time(monotonic_mock: MagicMock):
+    # given
+    SearchIndexCache.set(SERVICE, INDEX, False, 300.0)
+
+    # when
+    monotonic_mock.return_value += MISSING_INDEX_TTL + 1
+
+    # then
+    assert SearchIndexCache.get(SERVICE, INDEX) is None
+
+
+def test_set_and_invalidate_override_cached_state():
+    # given
+    check = MagicMock(return_value=False)
+    assert SearchIndexCache.exists(SERVICE, INDEX, 300.0, check) is False
+
+    # when
+    SearchIndexCache.set(SERVICE, INDEX, True, 300.0)
+
+    # then
+    assert SearchIndexCache.exists(SERVICE, INDEX, 300.0, check) is True
+    SearchIndexCache.invalidate(SERVICE, INDEX)
+    assert SearchIndexCache.get(SERVICE, INDEX) is None
+    assert SearchIndexCache.get("https://other.search.windows.net", INDEX) is None
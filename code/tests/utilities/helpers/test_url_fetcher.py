@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Response
+
+from backend.batch.utilities.helpers.url_fetcher import UrlFetcher, canonicalize_url
+
+
+@pytest.fixture
+def threaded_httpserver():
+    server = HTTPServer(threaded=True)
+    server.start()
+    yield server
+    server.clear()
+    server.stop()
+
+
+def fetch_all(url_fetcher: UrlFetcher, urls):
+    async def collect():
+        return [result async for result in url_fetcher.fetch_all(urls)]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("https://example.com", "https://example.com/"),
+        (
+            " HTTPS://Example.COM:443/Path?b=2&a=1#section ",
+            "https://example.com/Path?b=2&a=1",
+        ),
+        ("http://example.com:80/", "http://example.com/"),
+        ("http://example.com:8080/", "http://example.com:8080/"),
+        ("http://[::1]:8080/page", "http://[::1]:8080/page"),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize(
+    "url", ["", "example.com/page", "ftp://example.com/", "https://"]
+)
+def test_canonicalize_url_raises_for_invalid_urls(url):
+    with pytest.raises(ValueError):
+        canonicalize_url(url)
+
+
+def test_fetch_all_returns_content_and_errors(threaded_httpserver: HTTPServer):
+    # given
+    threaded_httpserver.expect_request("/page").respond_with_data("<p>content</p>")
+    threaded_httpserver.expect_request("/missing").respond_with_data("", status=404)
+    urls = [
+        threaded_httpserver.url_for("/page"),
+        threaded_httpserver.url_for("/missing"),
+    ]
+
+    # when
+    results = fetch_all(UrlFetcher(4, 2, 5.0), urls)
+
+    # then
+    assert sorted(results) == sorted(
+        [(urls[0], b"<p>content</p>", None), (urls[1], None, "HTTP 404")]
+    )
+
+
+def test_fetch_all_limits_concurrency_per_host(threaded_httpserver: HTTPServer):
+    # given
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def handler(request):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.1)
+        with lock:
+            in_flight[0] -= 1
+        return Response("content")
+
+    threaded_httpserver.expect_request("/page").respond_with_handler(handler)
+    urls = [threaded_httpserver.url_for(f"/page?i={i}") for i in range(8)]
+
+    # when
+    results = fetch_all(UrlFetcher(16, 2, 5.0), urls)
+
+    # then
+    assert len(results) == 8
+    assert all(error is None for _, _, error in results)
+    assert in_flight[1] == 2
+
+
+def test_fetch_all_times_out_slow_urls(threaded_httpserver: HTTPServer):
+    # given
+    def handler(request):
+        time.sleep(1)
+        return Response("content")
+
+    threaded_httpserver.expect_request("/slow").respond_with_handler(handler)
+
+    # when
+    results = fetch_all(UrlFetcher(4, 2, 0.2), [threaded_httpserver.url_for("/slow")])
+
+    # then
+    assert results[0][1] is None
+    assert results[0][2].startswith("ReadTimeout")
@@ -0,0 +1,89 @@
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from docx import Document
+
+from backend.batch.utilities.document_loading.word_document import (
+    WordDocumentLoading,
+)
+
+DOCUMENT_URL = "https://example.com/sample_document.docx"
+
+
+def create_docx() -> bytes:
+    document = Document()
+    document.add_paragraph("Introduction text")
+    document.add_heading("First section", level=1)
+    document.add_paragraph("First <paragraph>")
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "Merged & header"
+    table.cell(1, 0).text = "a"
+    table.cell(1, 1).text = "b"
+    document.add_heading("Second section", level=2)
+    document.add_paragraph("Second paragraph")
+    file = BytesIO()
+    document.save(file)
+    return file.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def requests_mock():
+    with patch(
+        "backend.batch.utilities.document_loading.word_document.requests"
+    ) as mock:
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.iter_content.return_value = [create_docx()]
+        mock.get.return_value = response
+        yield mock
+
+
+def test_load_streams_document_download(requests_mock: MagicMock):
+    # when
+    WordDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    requests_mock.get.assert_called_once_with(DOCUMENT_URL, stream=True)
+
+
+def test_load_returns_document_per_section():
+    # when
+    documents = WordDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    assert [document.content for document in documents] == [
+        "<p>Introduction text</p>\n",
+        "<h1>First section</h1>\n"
+        "<p>First <paragraph></p>\n"
+        "<table><tr><td colSpan=2>Merged &amp; header</td></tr>"
+        "<tr><td>a</td><td>b</td></tr></table>\n",
+        "<h2>Second section</h2>\n<p>Second paragraph</p>\n",
+    ]
+    assert all(document.source == DOCUMENT_URL for document in documents)
+
+
+def test_load_keeps_offsets_of_sections():
+    # when
+    documents = WordDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    full_document_content = "".join(document.content for document in documents)
+    for document in documents:
+        assert full_document_content.startswith(document.content, document.offset)
+
+
+def test_load_returns_empty_document_when_there_is_no_content(
+    requests_mock: MagicMock,
+):
+    # given
+    file = BytesIO()
+    Document().save(file)
+    requests_mock.get.return_value.iter_content.return_value = [file.getvalue()]
+
+    # when
+    documents = WordDocumentLoading().load(DOCUMENT_URL)
+
+    # then
+    assert len(documents) == 1
+    assert documents[0].content == ""
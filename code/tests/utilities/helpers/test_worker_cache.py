@@ -0,0 +1,157 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.batch.utilities.helpers import worker_cache as worker_cache_module
+from backend.batch.utilities.helpers.worker_cache import WorkerCache
+
+
+@pytest.fixture(autouse=True)
+def env_helper_mock():
+    with patch("backend.batch.utilities.helpers.worker_cache.EnvHelper") as mock:
+        env_helper = mock.return_value
+        env_helper.WORKER_CACHE_ENABLED = True
+        env_helper.WORKER_CACHE_CONFIG_CHECK_INTERVAL = 0.0
+        env_helper.LOAD_CONFIG_FROM_BLOB_STORAGE = True
+        yield env_helper
+
+
+@pytest.fixture(autouse=True)
+def azure_blob_storage_client_mock():
+    with patch(
+        "backend.batch.utilities.helpers.worker_cache.AzureBlobStorageClient"
+    ) as mock:
+        mock.return_value.get_file_etag.return_value = "etag-1"
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def embedder_factory_mock():
+    with patch("backend.batch.utilities.helpers.worker_cache.EmbedderFactory") as mock:
+        mock.create.side_effect = lambda env_helper, blob_client: MagicMock()
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def config_helper_mock():
+    with patch("backend.batch.utilities.helpers.worker_cache.ConfigHelper") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def clear_instance():
+    WorkerCache.clear_instance()
+    yield
+    WorkerCache.clear_instance()
+
+
+def test_worker_cache_is_a_singleton():
+    assert WorkerCache() is WorkerCache()
+
+
+def test_get_embedder_reuses_the_embedder_and_blob_client(
+    azure_blob_storage_client_mock: MagicMock, embedder_factory_mock: MagicMock
+):
+    # given
+    worker_cache = WorkerCache()
+
+    # when
+    first_embedder = worker_cache.get_embedder()
+    second_embedder = worker_cache.get_embedder()
+
+    # then
+    assert first_embedder is second_embedder
+    azure_blob_storage_client_mock.assert_called_once_with()
+    embedder_factory_mock.create.assert_called_once_with(
+        worker_cache.env_helper, azure_blob_storage_client_mock.return_value
+    )
+    assert worker_cache.get_stats()["misses"] == 2
+    assert worker_cache.get_stats()["hits"] > 0
+
+
+def test_get_embedder_rebuilds_everything_when_the_active_config_changes(
+    azure_blob_storage_client_mock: MagicMock,
+    embedder_factory_mock: MagicMock,
+    config_helper_mock: MagicMock,
+):
+    # given
+    worker_cache = WorkerCache()
+    first_embedder = worker_cache.get_embedder()
+    azure_blob_storage_client_mock.return_value.get_file_etag.return_value = "etag-2"
+
+    # when
+    second_embedder = worker_cache.get_embedder()
+
+    # then
+    assert first_embedder is not second_embedder
+    assert embedder_factory_mock.create.call_count == 2
+    # An invocation still holding the old embedder can keep using it
+    assert first_embedder.mock_calls == []
+    config_helper_mock.get_active_config_or_default.cache_clear.assert_called_once()
+    azure_blob_storage_client_mock.return_value.get_file_etag.assert_called_with(
+        "active.json", container_name="config"
+    )
+    assert worker_cache.get_stats()["invalidations"] == 1
+
+
+def test_get_embedder_checks_the_config_at_most_once_per_interval(
+    env_helper_mock: MagicMock, azure_blob_storage_client_mock: MagicMock
+):
+    # given
+    env_helper_mock.WORKER_CACHE_CONFIG_CHECK_INTERVAL = 60.0
+    worker_cache = WorkerCache()
+
+    # when
+    for _ in range(3):
+        worker_cache.get_embedder()
+
+    # then
+    azure_blob_storage_client_mock.return_value.get_file_etag.assert_called_once()
+
+
+def test_get_embedder_rebuilds_everything_when_expired(
+    embedder_factory_mock: MagicMock,
+):
+    # given
+    worker_cache = WorkerCache()
+    worker_cache.get_embedder()
+    worker_cache._built_at -= worker_cache_module.MAX_AGE_SECONDS + 1
+
+    # when
+    worker_cache.get_embedder()
+
+    # then
+    assert embedder_factory_mock.create.call_count == 2
+
+
+def test_get_embedder_builds_every_time_when_disabled(
+    env_helper_mock: MagicMock,
+    azure_blob_storage_client_mock: MagicMock,
+    embedder_factory_mock: MagicMock,
+):
+    # given
+    env_helper_mock.WORKER_CACHE_ENABLED = False
+    worker_cache = WorkerCache()
+
+    # when
+    worker_cache.get_embedder()
+    worker_cache.get_embedder()
+
+    # then
+    assert embedder_factory_mock.create.call_count == 2
+    azure_blob_storage_client_mock.return_value.get_file_etag.assert_not_called()
+
+
+def test_take_setup_seconds_saved_returns_time_saved_since_last_call():
+    # given
+    worker_cache = WorkerCache()
+    worker_cache.get_embedder()
+    worker_cache._setup_seconds = {"blob_client": 0.5, "embedder": 2.0}
+    worker_cache.take_setup_seconds_saved()
+
+    # when
+    worker_cache.get_embedder()
+
+    # then
+    assert worker_cache.take_setup_seconds_saved() == pytest.approx(2.5)
+    assert worker_cache.take_setup_seconds_saved() == 0.0
@@ -3,6 +3,7 @@ from unittest.mock import ANY, MagicMock, patch
 from backend.batch.utilities.integrated_vectorization.azure_search_index import (
     AzureSearchIndex,
 )
+from backend.batch.utilities.helpers.search_index_cache import SearchIndexCache
 from azure.search.documents.indexes.models import (
     VectorSearch,
     SemanticSearch,
@@ -25,6 +26,10 @@ def env_helper_mock():
         env_helper.AZURE_SEARCH_KEY = AZURE_SEARCH_KEY
         env_helper.AZURE_SEARCH_SERVICE = AZURE_SEARCH_SERVICE
         env_helper.AZURE_SEARCH_INDEX = AZURE_SEARCH_INDEX
+        env_helper.AZURE_SEARCH_INDEX_METADATA_CACHE_TTL = 300.0
+        env_helper.AZURE_SEARCH_HNSW_M = 8
+        env_helper.AZURE_SEARCH_HNSW_EF_CONSTRUCTION = 600
+        env_helper.AZURE_SEARCH_HNSW_EF_SEARCH = 800
 
         yield env_helper
 
@@ -75,6 +80,22 @@ def test_create_or_update_index_keys(
     search_index_client_mock.return_value.create_or_update_index.assert_called_once()
 
 
+def test_create_or_update_index_marks_index_as_existing(
+    env_helper_mock: MagicMock,
+    llm_helper_mock: MagicMock,
+):
+    # given
+    SearchIndexCache.clear()
+    azure_search_iv_index_helper = AzureSearchIndex(env_helper_mock, llm_helper_mock)
+
+    # when
+    azure_search_iv_index_helper.create_or_update_index()
+
+    # then
+    assert SearchIndexCache.get(AZURE_SEARCH_SERVICE, AZURE_SEARCH_INDEX) is True
+    SearchIndexCache.clear()
+
+
 def test_create_or_update_index_rbac(
     env_helper_mock: MagicMock,
     llm_helper_mock: MagicMock,
@@ -93,3 +114,20 @@ def test_create_or_update_index_rbac(
     assert result.fields == ANY
     assert result.vector_search is not None
     search_index_client_mock.return_value.create_or_update_index.assert_called_once()
+
+
+def test_get_vector_search_config_uses_hnsw_parameters(
+    env_helper_mock: MagicMock,
+    llm_helper_mock: MagicMock,
+):
+    # given
+    azure_search_iv_index_helper = AzureSearchIndex(env_helper_mock, llm_helper_mock)
+
+    # when
+    vector_search = azure_search_iv_index_helper.get_vector_search_config()
+
+    # then
+    hnsw_parameters = vector_search.algorithms[0].parameters
+    assert hnsw_parameters.m == 8
+    assert hnsw_parameters.ef_construction == 600
+    assert hnsw_parameters.ef_search == 800
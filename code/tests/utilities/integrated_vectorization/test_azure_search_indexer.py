@@ -127,6 +127,64 @@ def test_run_indexer(
     )
 
 
+def test_create_or_update_indexer_runs_indexer_without_reset(
+    env_helper_mock: MagicMock,
+    search_indexer_client_mock: MagicMock,
+    search_indexer_mock: MagicMock,
+):
+    # given
+    azure_search_indexer = AzureSearchIndexer(env_helper_mock)
+
+    # when
+    azure_search_indexer.create_or_update_indexer("indexer_name", "skillset_name")
+
+    # then
+    azure_search_indexer.indexer_client.run_indexer.assert_called_once_with(
+        "indexer_name"
+    )
+    azure_search_indexer.indexer_client.reset_indexer.assert_not_called()
+
+
+def test_create_or_update_indexer_with_definition_and_without_run(
+    env_helper_mock: MagicMock,
+    search_indexer_client_mock: MagicMock,
+    search_indexer_mock: MagicMock,
+):
+    # given
+    indexer = MagicMock()
+    azure_search_indexer = AzureSearchIndexer(env_helper_mock)
+
+    # when
+    azure_search_indexer.create_or_update_indexer(
+        "indexer_name", "skillset_name", indexer=indexer, run=False
+    )
+
+    # then
+    azure_search_indexer.indexer_client.create_or_update_indexer.assert_called_once_with(
+        indexer
+    )
+    search_indexer_mock.assert_not_called()
+    azure_search_indexer.indexer_client.run_indexer.assert_not_called()
+
+
+def test_run_indexer_without_reset(
+    env_helper_mock: MagicMock,
+    search_indexer_client_mock: MagicMock,
+    search_indexer_mock: MagicMock,
+):
+    # given
+    azure_search_indexer = AzureSearchIndexer(env_helper_mock)
+
+    # when
+    azure_search_indexer.run_indexer("indexer_name", reset=False)
+
+    # then
+    azure_search_indexer.indexer_client.reset_indexer.assert_not_called()
+    azure_search_indexer.indexer_client.run_indexer.assert_called_once_with(
+        "indexer_name"
+    )
+
+
 def test_indexer_exists(
     env_helper_mock: MagicMock,
     search_indexer_client_mock: MagicMock,
@@ -0,0 +1,142 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.search.documents.indexes.models import (
+    SearchIndexerDataContainer,
+    SearchIndexerDataSourceConnection,
+)
+
+from backend.batch.utilities.integrated_vectorization.provisioning_fingerprints import (
+    FINGERPRINTS_FILE_NAME,
+    ProvisioningFingerprints,
+    fingerprint,
+)
+
+DESIRED = {"datasource": "fingerprint-1", "skillset": "fingerprint-2"}
+
+
+@pytest.fixture(autouse=True)
+def clear_fingerprints():
+    ProvisioningFingerprints.clear()
+    yield
+    ProvisioningFingerprints.clear()
+
+
+@pytest.fixture(autouse=True)
+def azure_blob_storage_client_mock():
+    with patch(
+        "backend.batch.utilities.integrated_vectorization.provisioning_fingerprints.AzureBlobStorageClient"
+    ) as mock:
+        mock.return_value.file_exists.return_value = True
+        mock.return_value.download_file.return_value = json.dumps(DESIRED)
+        yield mock
+
+
+def create_datasource(connection_string: str):
+    return SearchIndexerDataSourceConnection(
+        name="datasource",
+        type="azureblob",
+        connection_string=connection_string,
+        container=SearchIndexerDataContainer(name="documents"),
+    )
+
+
+def test_fingerprint_depends_only_on_the_definition():
+    assert fingerprint(create_datasource("key-1")) == fingerprint(
+        create_datasource("key-1")
+    )
+    assert fingerprint(create_datasource("key-1")) != fingerprint(
+        create_datasource("key-2")
+    )
+    assert "key-1" not in fingerprint(create_datasource("key-1"))
+
+
+def test_get_changed_returns_nothing_when_unchanged(
+    azure_blob_storage_client_mock: MagicMock,
+):
+    # when
+    results = [ProvisioningFingerprints.get_changed(DESIRED) for _ in range(3)]
+
+    # then
+    assert results == [{}, {}, {}]
+    azure_blob_storage_client_mock.assert_called_once_with(container_name="config")
+    azure_blob_storage_client_mock.return_value.download_file.assert_called_once_with(
+        FINGERPRINTS_FILE_NAME
+    )
+
+
+def test_get_changed_returns_changed_resources_with_previous_fingerprints():
+    # when
+    changed = ProvisioningFingerprints.get_changed(
+        {"datasource": "fingerprint-1", "skillset": "fingerprint-3", "index": "new"}
+    )
+
+    # then
+    assert changed == {"skillset": "fingerprint-2", "index": None}
+
+
+def test_get_changed_reloads_fingerprints_provisioned_by_another_worker(
+    azure_blob_storage_client_mock: MagicMock,
+):
+    # given
+    ProvisioningFingerprints.get_changed(DESIRED)
+    desired = {**DESIRED, "skillset": "fingerprint-3"}
+    azure_blob_storage_client_mock.return_value.download_file.return_value = json.dumps(
+        desired
+    )
+
+    # when
+    changed = ProvisioningFingerprints.get_changed(desired)
+
+    # then
+    assert changed == {}
+    assert azure_blob_storage_client_mock.return_value.download_file.call_count == 2
+
+
+def test_get_changed_returns_every_resource_when_forced(
+    azure_blob_storage_client_mock: MagicMock,
+):
+    # given
+    ProvisioningFingerprints.get_changed(DESIRED)
+
+    # when
+    changed = ProvisioningFingerprints.get_changed(DESIRED, force=True)
+
+    # then
+    assert changed == DESIRED
+    assert azure_blob_storage_client_mock.return_value.download_file.call_count == 2
+
+
+def test_get_changed_treats_missing_fingerprints_as_unknown(
+    azure_blob_storage_client_mock: MagicMock,
+):
+    # given
+    azure_blob_storage_client_mock.return_value.file_exists.return_value = False
+
+    # when
+    changed = ProvisioningFingerprints.get_changed(DESIRED)
+
+    # then
+    assert changed == {"datasource": None, "skillset": None}
+
+
+def test_set_provisioned_saves_fingerprints(
+    azure_blob_storage_client_mock: MagicMock,
+):
+    # given
+    ProvisioningFingerprints.get_changed(DESIRED)
+
+    # when
+    ProvisioningFingerprints.set_provisioned({"skillset": "fingerprint-3"})
+
+    # then
+    azure_blob_storage_client_mock.return_value.upload_file.assert_called_once_with(
+        json.dumps({**DESIRED, "skillset": "fingerprint-3"}, indent=2),
+        FINGERPRINTS_FILE_NAME,
+        content_type="application/json",
+    )
+    assert (
+        ProvisioningFingerprints.get_changed({**DESIRED, "skillset": "fingerprint-3"})
+        == {}
+    )
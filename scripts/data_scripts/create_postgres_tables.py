@@ -60,7 +60,7 @@ cursor.execute("DROP TABLE IF EXISTS vector_store;")
 conn.commit()
 
 table_create_command = """CREATE TABLE IF NOT EXISTS vector_store(
-    id text,
+    id text PRIMARY KEY,
     title text,
     chunk integer,
     chunk_id text,
@@ -79,6 +79,7 @@ conn.commit()
 cursor.execute(
     "CREATE INDEX vector_store_content_vector_idx ON vector_store USING hnsw (content_vector vector_cosine_ops);"
 )
+cursor.execute("CREATE INDEX vector_store_source_idx ON vector_store (source);")
 conn.commit()
 
 